@@ -0,0 +1,92 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from depreciation_stats import NEW_BIKE_YEARS, listing_cells, model_fits, has_new_bike_data
+
+CURRENT_YEAR = 2025
+
+def synthetic_listings(rows, makes=40, models_per_make=15, seed=0):
+    """Make, Model, Age and Price shaped like the cleaned listings: every model loses value at its own rate."""
+    rng = np.random.default_rng(seed)
+    model = rng.integers(0, makes * models_per_make, rows)
+    age = rng.integers(0, 25, rows)
+    new_price = 4000 + (model * 37) % 20000
+    rate = 200 + (model * 53) % 900
+    price = np.maximum(new_price - rate * age + rng.normal(0, 800, rows), 500).round()
+    return pd.DataFrame({
+        "Make": [f"Make {m}" for m in model // models_per_make],
+        "Model": [f"Model {m}" for m in model],
+        "Year": CURRENT_YEAR - age,
+        "Age": age,
+        "Price": price,
+    })
+
+def fit_loop(df):
+    """The per-model approach: one statsmodels OLS per (Make, Model) group."""
+    results = []
+    for (make, model), group in df.groupby(['Make', 'Model']):
+        if len(group) > 1:
+            reg_model = sm.OLS(group['Price'], sm.add_constant(group[['Age']])).fit()
+            results.append({'Make': make, 'Model': model, 'Depreciation Score': reg_model.params['Age'],
+                            'R-squared': reg_model.rsquared})
+    return pd.DataFrame(results)
+
+def new_models_apply(df):
+    """The per-model lambda: does each model have a 2024 or 2025 bike?"""
+    return df.groupby('Model').apply(lambda x: any(x['Year'].isin(NEW_BIKE_YEARS)), include_groups=False)
+
+def grouped_fit(df):
+    """The incremental path (see depreciation_stats): sum the listings into cells, fit every model from its sums."""
+    return model_fits(listing_cells(df), CURRENT_YEAR)
+
+def grouped_any(df):
+    """The incremental path's new-bike check, from the same cells."""
+    return has_new_bike_data(listing_cells(df))
+
+def benchmark(df, repeat=3):
+    """Best time over `repeat` runs of each approach for both steps, plus whether they agree."""
+    runs = [
+        ("OLS loop", lambda: fit_loop(df)),
+        ("grouped OLS", lambda: grouped_fit(df)),
+        ("apply", lambda: new_models_apply(df)),
+        ("grouped any", lambda: grouped_any(df)),
+    ]
+    results, outputs = {}, {}
+    for name, run in runs:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[name] = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best
+
+    loop, grouped = outputs["OLS loop"], outputs["grouped OLS"]
+    agree = (
+        loop[['Make', 'Model']].equals(grouped[['Make', 'Model']])
+        and np.allclose(loop['Depreciation Score'], grouped['Depreciation Score'], rtol=1e-9, atol=1e-6)
+        and np.allclose(loop['R-squared'], grouped['R-squared'], rtol=1e-9, atol=1e-9, equal_nan=True)
+        and outputs["apply"].equals(outputs["grouped any"])
+    )
+    return results, agree
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-model depreciation fits on a synthetic frame.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Listings in the synthetic frame.")
+    parser.add_argument("--makes", type=int, default=40, help="Makes in the synthetic frame.")
+    parser.add_argument("--models-per-make", type=int, default=15, help="Models per make.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per approach; the best time is reported.")
+    args = parser.parse_args()
+
+    df = synthetic_listings(args.rows, args.makes, args.models_per_make)
+    print(f"📚 {len(df):,} listings, {df['Model'].nunique():,} models")
+
+    results, agree = benchmark(df, args.repeat)
+    if not agree:
+        print("❌ The approaches disagree")
+    for baseline, name in [("OLS loop", "grouped OLS"), ("apply", "grouped any")]:
+        for label in (baseline, name):
+            seconds = results[label]
+            print(f"{label:>12}: {seconds:.3f}s = {len(df) / seconds:,.0f} rows/s ({results[baseline] / seconds:.1f}x {baseline})")
@@ -0,0 +1,66 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from merge import parse_seller, SELLER_COLUMNS
+
+TOWNS = ["Macclesfield", "Stoke-on-Trent", "Bristol", "Milton Keynes", "Southampton", "Leeds", "Newport Pagnell"]
+
+def synthetic_sellers(rows, dealers=2000, seed=0):
+    """A Seller column shaped like the scraped one: dealer blurb, listing specs, reviews and location."""
+    rng = np.random.default_rng(seed)
+    dealer = rng.integers(0, dealers, rows)
+    mileage = rng.integers(0, 60, rows) * 1000
+    year = rng.integers(2005, 2026, rows)
+    towns = np.array(TOWNS)[dealer % len(TOWNS)]
+    reviews = dealer * 7 % 9000 + 1
+    score = (dealer % 11 + 40) / 10
+    distance = dealer * 13 % 400
+    sellers = [
+        f"Dealer {d} - See all {d % 900 + 1} bikesMileage{m:,} milesYear and plate{y} ({y % 100:02d} reg)"
+        f"Seller reviews{s:.1f} ({r:,} reviews)Dealer location{t}({km} miles)"
+        for d, m, y, s, r, t, km in zip(dealer, mileage, year, score, reviews, towns, distance)
+    ]
+    return pd.DataFrame({"Seller": sellers})
+
+def parse_seller_chained(df):
+    """The per-field approach: one str.extract (and clean-up) per column over every row."""
+    df[SELLER_COLUMNS["town"]] = df["Seller"].str.extract(r"Dealer location(.*?)\(")[0].str.strip()
+    df[SELLER_COLUMNS["distance"]] = df["Seller"].str.extract(r"\(([\d,]+) miles\)")[0].str.replace(",", "", regex=False).astype(float)
+    df[SELLER_COLUMNS["score"]] = df["Seller"].str.extract(r"Seller reviews(\d+(?:\.\d+)?)")[0].astype(float)
+    df[SELLER_COLUMNS["count"]] = df["Seller"].str.extract(r"\(([\d,]+) reviews?\)")[0].str.replace(",", "", regex=False).astype(float)
+    return df
+
+def benchmark(df, repeat=3):
+    """Best time over `repeat` runs of each approach, plus whether they agree."""
+    results = {}
+    outputs = {}
+    for name, parse in [("chained", parse_seller_chained), ("single pass", parse_seller)]:
+        best = None
+        for _ in range(repeat):
+            frame = df.copy()
+            start = time.perf_counter()
+            outputs[name] = parse(frame)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best
+    columns = list(SELLER_COLUMNS.values())
+    agree = outputs["chained"][columns].equals(outputs["single pass"][columns])
+    return results, agree
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Seller blob parsing on a synthetic frame.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic frame.")
+    parser.add_argument("--dealers", type=int, default=2000, help="Distinct dealers in the synthetic frame.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per approach; the best time is reported.")
+    args = parser.parse_args()
+
+    df = synthetic_sellers(args.rows, args.dealers)
+    print(f"📚 {len(df):,} rows, {df['Seller'].nunique():,} distinct Seller values")
+
+    results, agree = benchmark(df, args.repeat)
+    if not agree:
+        print("❌ The two approaches disagree")
+    baseline = results["chained"]
+    for name, seconds in results.items():
+        print(f"{name:>12}: {seconds:.3f}s = {len(df) / seconds:,.0f} rows/s ({baseline / seconds:.1f}x chained)")
@@ -0,0 +1,191 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from grouped_ols import group_codes, fit_from_moments
+
+# Resamples drawn at once are capped so that resamples x rows stays around this many values
+BATCH_VALUES = 2_000_000
+
+# Models with fewer listings than this get no interval of their own: every resample of two
+# listings gives one of just two slopes, which would make the least trustworthy scores look
+# certain. They still count towards their brand's interval, as they do towards its score
+MIN_INTERVAL_ROWS = 3
+
+def prepare_groups(df, by, x, y):
+    """
+    Rows of df sorted by group, ready for resampling.
+
+    x and y are centred on their group means: slopes do not change, and resampled sums of
+    squares and products stay small enough to be taken from raw sums without losing precision.
+
+    :return: (group keys as in group_codes, arrays dict with the sorted x, y and group codes
+        and every group's first row, size and x and y means).
+    """
+    by_columns = [by] if isinstance(by, str) else list(by)
+    df = df[by_columns + [x, y]].dropna(subset=[x, y])
+    codes, keys = group_codes(df, by)
+    valid = codes >= 0
+    order = np.argsort(codes[valid], kind="stable")
+    codes = codes[valid][order]
+    sizes = np.bincount(codes, minlength=len(keys))
+    xs = df[x].to_numpy(dtype="float64")[valid][order]
+    ys = df[y].to_numpy(dtype="float64")[valid][order]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_means = np.bincount(codes, xs, len(keys)) / sizes
+        y_means = np.bincount(codes, ys, len(keys)) / sizes
+    arrays = {
+        "x": xs - x_means[codes],
+        "y": ys - y_means[codes],
+        "codes": codes,
+        "starts": np.concatenate([[0], np.cumsum(sizes)[:-1]]),
+        "sizes": sizes,
+        "x_means": x_means,
+        "y_means": y_means,
+    }
+    return keys, arrays
+
+def resample_slopes(arrays, resamples, seed):
+    """
+    Slope of y on x in every group for `resamples` bootstrap resamples.
+
+    Each resample redraws every group's rows with replacement (same size as the group). All
+    groups, and a batch of resamples at a time, are drawn as one index matrix and fitted from
+    their sums, taken with np.bincount over (resample, group) cells. The slope is taken the way
+    the point estimate takes it (see grouped_ols.fit_from_moments), so a resample whose x never
+    changes gets mean(y) / x like a model whose listings all have the same age.
+
+    :return: Array of shape (resamples, groups).
+    """
+    rng = np.random.default_rng(seed)
+    x, y, codes = arrays["x"], arrays["y"], arrays["codes"]
+    starts, sizes = arrays["starts"], arrays["sizes"]
+    rows, groups = len(x), len(sizes)
+    row_starts, row_sizes = starts[codes], sizes[codes]
+    x_means, y_means = arrays["x_means"], arrays["y_means"]
+
+    slopes = np.empty((resamples, groups))
+    per_batch = max(1, BATCH_VALUES // max(rows, 1))
+    for first in range(0, resamples, per_batch):
+        batch = min(per_batch, resamples - first)
+        picks = row_starts + (rng.random((batch, rows)) * row_sizes).astype(np.int64)
+        xs, ys = x[picks].ravel(), y[picks].ravel()
+        cells = (np.arange(batch)[:, None] * groups + codes).ravel()
+        n = np.tile(sizes, batch).astype("float64")
+        # The rows are centred on their group's means: add them back for the resample's means
+        x_mean, y_mean = np.tile(x_means, batch), np.tile(y_means, batch)
+
+        cell_count = batch * groups
+        sum_x = np.bincount(cells, xs, cell_count)
+        sum_y = np.bincount(cells, ys, cell_count)
+        sum_xx = np.bincount(cells, xs * xs, cell_count)
+        sum_xy = np.bincount(cells, xs * ys, cell_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sxx = sum_xx - sum_x * sum_x / n
+            sxy = sum_xy - sum_x * sum_y / n
+            # Below rounding noise of the sums: every resampled x is the same. R² is not needed,
+            # so no sum of squares of y is taken
+            _, slope, _ = fit_from_moments(n, x_mean + sum_x / n, y_mean + sum_y / n, sxx, sxy, np.zeros_like(sxx),
+                                           8 * np.finfo("float64").eps * sum_xx)
+        slopes[first:first + batch] = slope.reshape(batch, groups)
+    return slopes
+
+# Arrays as seen by a worker process (set once per worker by _init_worker)
+_worker_arrays = None
+
+def _init_worker(arrays):
+    global _worker_arrays
+    _worker_arrays = arrays
+
+def _resample_chunk(job):
+    resamples, seed = job
+    return resample_slopes(_worker_arrays, resamples, seed)
+
+def bootstrap_slopes(df, by, x, y, resamples=1000, workers=1, seed=0):
+    """
+    Bootstrap the slope of y on x for every group of df.
+
+    The resamples are split into chunks, each with its own random stream, and the chunks are
+    fitted on `workers` processes; the result does not depend on the number of workers.
+
+    :param df: DataFrame with the `by`, `x` and `y` columns; rows with missing values are ignored.
+    :param by: Column name or list of column names to group by.
+    :param resamples: Number of bootstrap resamples.
+    :param workers: Number of processes fitting resamples (1 = this process only).
+    :param seed: Seed of the random streams, for reproducible intervals.
+    :return: (group keys in groupby order with their number of Rows, array of slopes of shape
+        (resamples, groups)).
+    """
+    keys, arrays = prepare_groups(df, by, x, y)
+    chunk = max(1, -(-resamples // 16))
+    counts = [min(chunk, resamples - first) for first in range(0, resamples, chunk)]
+    jobs = list(zip(counts, np.random.SeedSequence(seed).spawn(len(counts))))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arrays,)) as executor:
+            parts = list(executor.map(_resample_chunk, jobs))
+    else:
+        parts = [resample_slopes(arrays, count, seed) for count, seed in jobs]
+    keys = keys.assign(Rows=arrays["sizes"])
+    return keys, np.concatenate(parts) if parts else np.empty((0, len(keys)))
+
+def group_means(samples, codes, groups):
+    """
+    Average the columns of `samples` (resamples x items) into `groups` groups, per resample.
+
+    :param codes: Group of every column; NaN samples are left out of their group's mean.
+    :return: Array of shape (resamples, groups).
+    """
+    resamples = samples.shape[0]
+    cells = (np.arange(resamples)[:, None] * groups + np.asarray(codes)).ravel()
+    values = samples.ravel()
+    known = ~np.isnan(values)
+    totals = np.bincount(cells[known], values[known], resamples * groups)
+    counts = np.bincount(cells[known], minlength=resamples * groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (totals / counts).reshape(resamples, groups)
+
+def confidence_intervals(samples, level=0.95):
+    """
+    Percentile intervals of bootstrap samples (resamples x items).
+
+    :return: (lower bounds, upper bounds), NaN for items without any valid resample.
+    """
+    tail = 100 * (1 - level) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        low, high = np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+    return low, high
+
+def add_depreciation_intervals(listings, model_df, brand_results, current_year, resamples=1000, level=0.95,
+                               workers=1, seed=0):
+    """
+    Add bootstrap confidence intervals (CI Low, CI High) to the depreciation tables.
+
+    Model intervals come from refitting Price on Age on resampled listings of each model, and
+    the model table also gets its number of Listings; models with fewer than MIN_INTERVAL_ROWS
+    listings get no interval. Brand intervals come from averaging the resampled slopes of all the
+    brand's models, the way its score averages their point slopes.
+
+    :param listings: Make, Model, Year and Price of every listing.
+    :param model_df: Model-level table (Make, Model, Depreciation Score, ...).
+    :param brand_results: Brand-level table (Make, Depreciation Score).
+    :return: (model_df, brand_results) with the interval columns added.
+    """
+    listings = listings.assign(Age=current_year - listings['Year'].astype('float64'))
+    keys, slopes = bootstrap_slopes(listings, ['Make', 'Model'], 'Age', 'Price', resamples, workers, seed)
+
+    fitted = pd.MultiIndex.from_frame(keys[['Make', 'Model']].astype(str))
+    columns = fitted.get_indexer(pd.MultiIndex.from_frame(model_df[['Make', 'Model']].astype(str)))
+    if (columns < 0).any():
+        raise ValueError("Every model in model_df needs its listings in `listings`")
+    listing_counts = keys['Rows'].to_numpy()[columns]
+    model_samples = slopes[:, columns]
+    low, high = confidence_intervals(np.where(listing_counts < MIN_INTERVAL_ROWS, np.nan, model_samples), level)
+    model_df = model_df.assign(**{'Listings': listing_counts, 'CI Low': low, 'CI High': high})
+
+    brands = pd.Index(brand_results['Make'].astype(str))
+    brand_samples = group_means(model_samples, brands.get_indexer(model_df['Make'].astype(str)), len(brands))
+    low, high = confidence_intervals(brand_samples, level)
+    brand_results = brand_results.assign(**{'CI Low': low, 'CI High': high})
+    return model_df, brand_results
@@ -2,8 +2,44 @@ import os
 import pandas as pd
 from glob import glob
 import re
+import storage
+import listing_db
 
-def dealerships(input_folder, output_folder):
+def summarise_dealerships(df):
+    """
+    Build the dealership summary (Dealership, Bike Count) of one raw snapshot.
+
+    :param df: Raw snapshot DataFrame with a 'Dealership Name' column.
+    :return: One row per dealership, largest first.
+    """
+    # Extract Dealership name and bike count
+    dealership = df['Dealership Name'].str.split(" - ").str[0]
+    bike_count = df['Dealership Name'].str.extract(r'See all (\d+) bikes')[0].astype(float)
+
+    # Create a dealership summary DataFrame
+    df_dealership_summary = pd.DataFrame({'Dealership': dealership, 'Bike Count': bike_count}).drop_duplicates()
+    return df_dealership_summary.sort_values(by='Bike Count', ascending=False)
+
+def save_dealership_summary(df_dealership_summary, output_folder, file_date, storage_root=None, db_file=None):
+    """
+    Save one day's dealership summary as dealership_summary_<date>.csv (and to the Parquet store
+    and listings database if given).
+    """
+    # Define the output file path
+    summary_file = os.path.join(output_folder, f"dealership_summary_{file_date}.csv")
+
+    # Save dealership summary to the output folder
+    df_dealership_summary.to_csv(summary_file, index=False)
+    print(f"✅ Dealership summary saved at: {summary_file}")
+
+    if storage_root:
+        storage.write_partitions(df_dealership_summary.assign(**{'Date Collected': file_date}),
+                                 storage_root, storage.DEALERSHIPS, partition_cols=['Date Collected'])
+
+    if db_file:
+        listing_db.load_dealerships(db_file, df_dealership_summary, file_date)
+
+def dealerships(input_folder, output_folder, storage_root=None, workers=1, db_file=None, files=None):
     """
     Processes all CSV files in the given input folder, extracts dealership bike counts,
     and saves a summary for each file with a matching date in the output folder.
@@ -11,53 +47,62 @@ def dealerships(input_folder, output_folder):
     Parameters:
     - input_folder (str): Path to the folder containing raw CSV files.
     - output_folder (str): Path to the folder where summary files will be saved.
+    - storage_root (str, optional): Parquet storage root. When given, only the listing columns the
+      summary needs are read, day by day, from its raw dataset instead of the CSV files, and the
+      summaries are also written to its dealerships dataset.
+    - workers (int, optional): Number of processes summarising files in parallel (see ingest.ingest).
+    - db_file (str, optional): Listings database (see listing_db) to also load the summaries into.
+    - files (list, optional): Only summarise these raw CSV files instead of every file in input_folder.
     """
 
     # Ensure the output directory exists
     os.makedirs(output_folder, exist_ok=True)
 
-    # Find all CSV files recursively in the input folder
-    file_paths = glob(os.path.join(input_folder, "**", "*.csv"), recursive=True)
+    if workers > 1 and files is None:
+        import ingest
+        ingest.ingest(input_folder, [ingest.DealershipStage(output_folder, storage_root, db_file)], storage_root, workers)
+        return
+
+    if files is not None:
+        file_paths = list(files)
+    elif storage_root:
+        file_paths = storage.partition_dates(storage_root, storage.RAW)
+    else:
+        # Find all CSV files recursively in the input folder
+        file_paths = glob(os.path.join(input_folder, "**", "*.csv"), recursive=True)
     
     # Process each file separately
     for file in file_paths:
         print(f"Processing: {os.path.basename(file)}")
         
         try:
-            # Extract date from filename (assuming format: autotrader_data_YYYY-MM-DD.csv)
-            match = re.search(r'autotrader_data_(\d{4}-\d{2}-\d{2})\.csv', file)
-            if match:
-                file_date = match.group(1)
+            if storage_root and files is None:
+                # Stored snapshots are partitioned by date: read just this day's dealership column
+                file_date = file
+                df = storage.read_partitions(storage_root, storage.RAW, columns=['Dealership Name'], dates=[file_date])
             else:
-                print(f"Skipping {os.path.basename(file)} - Unable to extract date from filename")
-                continue
+                # Extract date from filename (assuming format: autotrader_data_YYYY-MM-DD.csv)
+                match = re.search(r'autotrader_data_(\d{4}-\d{2}-\d{2})\.csv', file)
+                if match:
+                    file_date = match.group(1)
+                else:
+                    print(f"Skipping {os.path.basename(file)} - Unable to extract date from filename")
+                    continue
 
-            # Load file into a DataFrame
-            df = pd.read_csv(file, delimiter="\t")  # Adjust delimiter if needed
+                # Load file into a DataFrame
+                df = pd.read_csv(file, delimiter="\t")  # Adjust delimiter if needed
 
-            # Ensure at least required columns exist
-            if df.shape[1] < 3 or 'Dealership Name' not in df.columns:
-                print(f"Skipping {os.path.basename(file)} - Missing required columns")
-                continue
+                # Ensure at least required columns exist
+                if df.shape[1] < 3 or 'Dealership Name' not in df.columns:
+                    print(f"Skipping {os.path.basename(file)} - Missing required columns")
+                    continue
 
             # Drop duplicates across all columns
             df = df.drop_duplicates()
             print(os.path.basename(file), "has ", len(df), "entries after deduplication")
 
-            # Extract Dealership name and bike count
-            df['Dealership'] = df['Dealership Name'].str.split(" - ").str[0]
-            df['Bike Count'] = df['Dealership Name'].str.extract(r'See all (\d+) bikes')[0].astype(float)
-
-            # Create a dealership summary DataFrame
-            df_dealership_summary = df[['Dealership', 'Bike Count']].drop_duplicates()
-            df_dealership_summary = df_dealership_summary.sort_values(by='Bike Count', ascending=False)
-
-            # Define the output file path
-            summary_file = os.path.join(output_folder, f"dealership_summary_{file_date}.csv")
-
-            # Save dealership summary to the output folder
-            df_dealership_summary.to_csv(summary_file, index=False)
-            print(f"✅ Dealership summary saved at: {summary_file}")
+            df_dealership_summary = summarise_dealerships(df)
+            save_dealership_summary(df_dealership_summary, output_folder, file_date, storage_root, db_file)
 
         except Exception as e:
             print(f"❌ Error processing {file}: {e}")
@@ -1,77 +1,69 @@
-import pandas as pd
-import statsmodels.api as sm
+import os
+import argparse
 from datetime import datetime
-
-# Load the dataset
-file_path = "/Users/monkiky/Desktop/motos_collect/data2plot/cleaned_autotrader_data.csv"
-df = pd.read_csv(file_path)
-
-# Keep only necessary columns
-df = df[['Make', 'Model', 'Year', 'Price']]
-
-# Remove rows with missing values in the required columns
-df = df.dropna(subset=['Make', 'Model', 'Year', 'Price'])
-
-# Convert Year to integer
-df['Year'] = df['Year'].astype(int)
-
-# Get current year
-current_year = datetime.now().year
-
-# Compute the age of the motorcycle
-df['Age'] = current_year - df['Year']
-
-# Step 1: Identify models without data for 2024 or 2025 (consider these as new)
-models_without_new_bike_data = df.groupby('Model').apply(
-    lambda x: not any(x['Year'].isin([2024, 2025]))  # Check if there are no new bikes (Year 2024 or 2025)
-).loc[lambda x: x].index.tolist()
-
-print(f"Models without new bike data (2024 or 2025): {models_without_new_bike_data}")
-
-# Step 2: Calculate depreciation for all models, including those without new data
-model_results = []
-for (make, model), group in df.groupby(['Make', 'Model']):
-    # Check if there's enough data for this model (at least 2 entries for regression)
-    if len(group) > 1:
-        X = group[['Age']]
-        y = group['Price']
-        
-        X = sm.add_constant(X)  # Add constant term for intercept
-        reg_model = sm.OLS(y, X).fit()  # Ordinary Least Squares (OLS) Regression
-        
-        depreciation_rate = reg_model.params['Age']  # Slope (Price drop per year)
-        r_squared = reg_model.rsquared  # Model fit quality
-
-        # Store model-level results
-        model_results.append({
-            'Make': make,
-            'Model': model,
-            'Depreciation Score': depreciation_rate,
-            'R-squared': r_squared
-        })
-
-# Convert model-level results to DataFrame
-model_df = pd.DataFrame(model_results)
-
-# Sort by Depreciation Score (ascending order: lowest depreciation first)
-model_df = model_df.sort_values(by='Depreciation Score', ascending=True)
-
-# Step 3: Remove models that don't have data for 2024 or 2025 bikes
-model_df = model_df[~model_df['Model'].isin(models_without_new_bike_data)]
-
-# Step 4: Calculate brand-level average depreciation (using the models left after removing those without new bike data)
-brand_results = model_df.groupby('Make')['Depreciation Score'].mean().reset_index()
-
-# Sort by Average Depreciation (ascending order: lowest depreciation first)
-brand_results = brand_results.sort_values(by='Depreciation Score', ascending=True)
-
-# Save the sorted model-level results to CSV
-output_model_path = "/Users/monkiky/Desktop/motos_collect/data2plot/depreciation_by_model.csv"
-model_df.to_csv(output_model_path, index=False)
-
-# Save the sorted brand-level results to CSV
-output_brand_path = "/Users/monkiky/Desktop/motos_collect/data2plot/depreciation_by_brand.csv"
-brand_results.to_csv(output_brand_path, index=False)
-
-print(f"Model-level depreciation sorted and saved to {output_model_path}")
-print(f"Brand-level depreciation sorted and saved to {output_brand_path}")
+import depreciation_stats
+
+# Default locations, relative to the repository
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_DB_FILE = os.path.join(REPO_ROOT, "data2plot", "listings.db")
+DEFAULT_OUTPUT_FOLDER = os.path.join(REPO_ROOT, "data2plot")
+
+def depreciation_analysis(db_file, output_folder, bootstrap=0, level=0.95, workers=1, rebuild=False):
+    """
+    Rank models and brands by depreciation and save depreciation_by_model.csv and depreciation_by_brand.csv.
+
+    :param db_file: Listings database (see listing_db).
+    :param output_folder: Folder the two CSV files are written to.
+    :param bootstrap: Bootstrap resamples for confidence intervals on every score (0 = none).
+    :param level: Confidence level of the intervals.
+    :param workers: Processes fitting bootstrap resamples.
+    :param rebuild: Recount the stored regression sums from every day instead of adding new days.
+    :return: (path of the model-level CSV, path of the brand-level CSV).
+    """
+    # Add the snapshot days not counted yet to the stored regression sums (only their rows are read)
+    depreciation_stats.update_statistics(db_file, rebuild)
+
+    # Get current year
+    current_year = datetime.now().year
+
+    # Fit Price on Age (current year - Year) for every model from the stored sums: the slope is the
+    # price drop per year and R-squared the fit quality. Models without data for 2024 or 2025 bikes
+    # are removed, and each brand gets the average depreciation of its remaining models; both tables
+    # are sorted by Depreciation Score (ascending order: lowest depreciation first)
+    model_df, brand_results, models_without_new_bike_data = depreciation_stats.depreciation_tables(db_file, current_year)
+
+    print(f"Models without new bike data (2024 or 2025): {models_without_new_bike_data}")
+
+    if bootstrap > 0:
+        # Scores from a handful of listings (R-squared of 1.0 on two points) get wide intervals
+        import listing_db
+        import bootstrap_ci
+        listings = listing_db.query_listings(db_file, ['Make', 'Model', 'Year', 'Price'], complete=True)
+        model_df, brand_results = bootstrap_ci.add_depreciation_intervals(
+            listings, model_df, brand_results, current_year, bootstrap, level, workers)
+        print(f"Bootstrap intervals ({level:.0%}) from {bootstrap} resamples added")
+
+    # Save the sorted model-level results to CSV
+    output_model_path = os.path.join(output_folder, "depreciation_by_model.csv")
+    model_df.to_csv(output_model_path, index=False)
+
+    # Save the sorted brand-level results to CSV
+    output_brand_path = os.path.join(output_folder, "depreciation_by_brand.csv")
+    brand_results.to_csv(output_brand_path, index=False)
+
+    print(f"Model-level depreciation sorted and saved to {output_model_path}")
+    print(f"Brand-level depreciation sorted and saved to {output_brand_path}")
+    return output_model_path, output_brand_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank models and brands by depreciation.")
+    parser.add_argument("--db-file", default=DEFAULT_DB_FILE, help="Listings database (see listing_db).")
+    parser.add_argument("--output-folder", default=DEFAULT_OUTPUT_FOLDER, help="Folder the CSV files are written to.")
+    parser.add_argument("--bootstrap", type=int, default=0,
+                        help="Bootstrap resamples for confidence intervals on every score (0 = none).")
+    parser.add_argument("--level", type=float, default=0.95, help="Confidence level of the intervals.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes fitting bootstrap resamples.")
+    parser.add_argument("--rebuild", action="store_true", help="Recount the stored regression sums from every day.")
+    args = parser.parse_args()
+
+    depreciation_analysis(args.db_file, args.output_folder, args.bootstrap, args.level, args.workers, args.rebuild)
@@ -0,0 +1,154 @@
+import argparse
+from contextlib import closing
+from datetime import datetime
+import pandas as pd
+import listing_db
+from grouped_ols import fit_from_sums
+
+# Tables kept next to the listings in the listings database
+CELLS = "depreciation_cells"  # Rows, ΣPrice and ΣPrice² per (Make, Model, Year)
+CELL_DATES = "depreciation_dates"  # snapshot dates already added to the cells, with their number of listings
+
+# Bikes from these years count as new: models without any are left out of the results
+NEW_BIKE_YEARS = [2024, 2025]
+
+def connect(db_file):
+    """Open the listings database with the depreciation tables created."""
+    conn = listing_db.connect(db_file)
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS {CELLS} (Make TEXT, Model TEXT, Year INTEGER, Rows INTEGER, '
+        f'"Price Sum" REAL, "Price Square Sum" REAL, PRIMARY KEY (Make, Model, Year))')
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {CELL_DATES} (Date TEXT PRIMARY KEY, Rows INTEGER)")
+    # Tables from before the day sizes were kept: their days have no Rows, so they are all recounted
+    listing_db.add_missing_columns(conn, CELL_DATES, {"Rows": "INTEGER"})
+    conn.commit()
+    return conn
+
+def day_cells(db_file, date):
+    """One day's complete listings summed into (Make, Model, Year) cells."""
+    return listing_cells(listing_db.query_listings(db_file, ['Make', 'Model', 'Year', 'Price'], dates=[date], complete=True))
+
+def listing_cells(df):
+    """Listings (Make, Model, Year and Price) summed into (Make, Model, Year) cells: Rows, Price Sum and Price Square Sum."""
+    price = df['Price'].astype('float64')
+    df = df.assign(**{'Price Square': price * price, 'Price': price})
+    cells = df.groupby(['Make', 'Model', 'Year'], observed=True).agg(
+        Rows=('Price', 'size'), **{'Price Sum': ('Price', 'sum'), 'Price Square Sum': ('Price Square', 'sum')})
+    return cells.reset_index()
+
+def update_statistics(db_file, rebuild=False):
+    """
+    Add every snapshot day not yet counted to the depreciation cells.
+
+    The cells hold the regression sums per (Make, Model, Year), so a daily run reads only the
+    new day's rows. Keying by year rather than age keeps them valid as the calendar moves on:
+    the age sums are derived from them for whatever the current year is (see group_sums).
+
+    A day whose number of stored listings changed after it was counted (a snapshot merged
+    again) cannot be taken back out of the sums, so every day is then recounted.
+
+    :param db_file: Listings database (see listing_db).
+    :param rebuild: Drop the cells and recount every day in the listings table.
+    """
+    with closing(connect(db_file)) as conn:
+        counts = listing_db.rows_per_date(conn)
+        done = dict(conn.execute(f"SELECT Date, Rows FROM {CELL_DATES}"))
+        changed = sorted(date for date, rows in done.items() if counts.get(date) != rows)
+        if changed and not rebuild:
+            print(f"⚠️ Listings of {', '.join(changed)} changed since they were counted; recounting every day")
+            rebuild = True
+        if rebuild:
+            with conn:
+                conn.execute(f"DELETE FROM {CELLS}")
+                conn.execute(f"DELETE FROM {CELL_DATES}")
+            done = {}
+
+        for date, rows in counts.items():
+            if date in done:
+                continue
+            cells = day_cells(db_file, date)
+            with conn:
+                conn.executemany(
+                    f'INSERT INTO {CELLS} VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (Make, Model, Year) DO UPDATE SET '
+                    f'Rows = Rows + excluded.Rows, "Price Sum" = "Price Sum" + excluded."Price Sum", '
+                    f'"Price Square Sum" = "Price Square Sum" + excluded."Price Square Sum"',
+                    zip(cells['Make'].astype(str), cells['Model'].astype(str), cells['Year'].astype(int).tolist(),
+                        cells['Rows'].tolist(), cells['Price Sum'].tolist(), cells['Price Square Sum'].tolist()))
+                conn.execute(f"INSERT INTO {CELL_DATES} VALUES (?, ?)", (date, rows))
+            print(f"✅ {date}: {int(cells['Rows'].sum())} listings added to {len(cells)} depreciation cells")
+
+def load_cells(db_file):
+    with closing(connect(db_file)) as conn:
+        return pd.read_sql_query(f"SELECT * FROM {CELLS}", conn)
+
+def group_sums(cells, by, current_year):
+    """
+    Regression sums of Price on Age (= current_year - Year) per group of cells.
+
+    :param cells: load_cells() frame.
+    :param by: Columns to group by, e.g. ['Make', 'Model'] or ['Make'].
+    :return: One row per group: n, ΣAge, ΣPrice, ΣAge², ΣAge·Price and ΣPrice².
+    """
+    age = current_year - cells['Year'].astype('float64')
+    sums = pd.DataFrame({
+        'n': cells['Rows'],
+        'ΣAge': cells['Rows'] * age,
+        'ΣPrice': cells['Price Sum'],
+        'ΣAge²': cells['Rows'] * age * age,
+        'ΣAge·Price': age * cells['Price Sum'],
+        'ΣPrice²': cells['Price Square Sum'],
+    })
+    return sums.groupby([cells[column] for column in by]).sum().reset_index()
+
+def model_fits(cells, current_year):
+    """
+    Price on Age fit of every (Make, Model) with at least 2 listings, from its cells.
+
+    :return: One row per model: Make, Model, Depreciation Score (the slope) and R-squared.
+    """
+    sums = group_sums(cells, ['Make', 'Model'], current_year)
+    _, slope, r_squared = fit_from_sums(sums['n'], sums['ΣAge'], sums['ΣPrice'], sums['ΣAge²'],
+                                        sums['ΣAge·Price'], sums['ΣPrice²'])
+    model_df = pd.DataFrame({'Make': sums['Make'], 'Model': sums['Model'],
+                             'Depreciation Score': slope, 'R-squared': r_squared})
+    return model_df[sums['n'].to_numpy() > 1].reset_index(drop=True)
+
+def has_new_bike_data(cells):
+    """Whether each Model has at least one bike from NEW_BIKE_YEARS (boolean Series indexed by Model)."""
+    return cells['Year'].isin(NEW_BIKE_YEARS).groupby(cells['Model']).any()
+
+def depreciation_tables(db_file, current_year=None):
+    """
+    Model- and brand-level depreciation from the stored cells, without reading any listings.
+
+    Same results as fitting Price on Age for every model over all stored listings: the model
+    table holds the slope (Depreciation Score) and R-squared of every model with at least 2
+    listings and at least one new bike (NEW_BIKE_YEARS), lowest depreciation first; the brand
+    table the average score of its models.
+
+    :return: (model-level DataFrame, brand-level DataFrame, models without new bike data).
+    """
+    current_year = current_year or datetime.now().year
+    cells = load_cells(db_file)
+
+    model_df = model_fits(cells, current_year)
+
+    has_new_bikes = has_new_bike_data(cells)
+    models_without_new_bike_data = has_new_bikes[~has_new_bikes].index.tolist()
+
+    model_df = model_df.sort_values(by='Depreciation Score', ascending=True)
+    model_df = model_df[~model_df['Model'].isin(models_without_new_bike_data)]
+
+    brand_results = model_df.groupby('Make')['Depreciation Score'].mean().reset_index()
+    brand_results = brand_results.sort_values(by='Depreciation Score', ascending=True)
+    return model_df, brand_results, models_without_new_bike_data
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the depreciation statistics from new snapshot days.")
+    parser.add_argument("db_file", help="Listings database (see listing_db).")
+    parser.add_argument("--rebuild", action="store_true", help="Recount every stored day.")
+    args = parser.parse_args()
+
+    update_statistics(args.db_file, args.rebuild)
+    model_df, brand_results, _ = depreciation_tables(args.db_file)
+    print(brand_results.to_string(index=False))
@@ -0,0 +1,48 @@
+import numpy as np
+
+def group_codes(df, by):
+    """
+    Number the groups of df by the `by` columns.
+
+    :return: (one group code per row, DataFrame with the `by` values of every group in code
+        order, sorted like groupby sorts them). Rows with a missing key get code -1.
+    """
+    grouped = df.groupby(by, sort=True, observed=True, dropna=True)
+    codes = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[[by] if isinstance(by, str) else list(by)]
+    return codes, keys
+
+def fit_from_moments(n, mean_x, mean_y, sxx, sxy, syy, x_tolerance=0.0):
+    """
+    Intercept, slope and R² of y on x from per-group means and centred sums (arrays, one entry per group).
+
+    Matches statsmodels' sm.OLS(y, sm.add_constant(x)) per group, including its handling of a
+    group where x never changes (sxx at most `x_tolerance`): add_constant then leaves the
+    constant out, so the slope is mean(y) / x (0 if x is 0) and R² is 0. R² is NaN where y never
+    changes (statsmodels returns -inf or NaN there, depending on rounding).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        constant_x = sxx <= x_tolerance
+        slope = np.where(constant_x, np.where(mean_x != 0, mean_y / mean_x, 0.0), sxy / sxx)
+        intercept = mean_y - slope * mean_x
+        r_squared = np.where(constant_x, 0.0, sxy * sxy / (sxx * syy))
+        r_squared = np.where(syy > 0, r_squared, np.nan)
+    return intercept, slope, r_squared
+
+def fit_from_sums(n, sum_x, sum_y, sum_xx, sum_xy, sum_yy):
+    """
+    Intercept, slope and R² of y on x from per-group sufficient statistics: n, Σx, Σy, Σx², Σxy and Σy².
+
+    Gives the same fit as statsmodels on the rows the sums were taken over, without the rows.
+    """
+    n = np.asarray(n, dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.asarray(sum_x, dtype="float64") / n
+        mean_y = np.asarray(sum_y, dtype="float64") / n
+        sxx = np.asarray(sum_xx, dtype="float64") - n * mean_x * mean_x
+        sxy = np.asarray(sum_xy, dtype="float64") - n * mean_x * mean_y
+        syy = np.maximum(np.asarray(sum_yy, dtype="float64") - n * mean_y * mean_y, 0.0)
+    # Taking means out of raw sums leaves rounding noise of the order of the sums themselves
+    x_tolerance = 8 * np.finfo("float64").eps * np.asarray(sum_xx, dtype="float64")
+    y_noise = 8 * np.finfo("float64").eps * np.asarray(sum_yy, dtype="float64")
+    return fit_from_moments(n, mean_x, mean_y, sxx, sxy, np.where(syy > y_noise, syy, 0.0), x_tolerance)
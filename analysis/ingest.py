@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import merge
+import make_model
+import dealerships
+
+class Stage:
+    """
+    One consumer of the ingestion pipeline.
+
+    process() is called once per raw snapshot with the snapshot's name, its collection date
+    (None if the name does not carry one) and its deduplicated raw rows, and returns whatever
+    the stage needs from it. It may run in a worker process, so it must not rely on state
+    built up from other snapshots, and it must copy the DataFrame before changing it (every
+    stage gets the same one). collect() then receives each result in the parent process, in
+    snapshot order, and finish() is called once after the last snapshot with the list of
+    snapshots read. `outputs` are files the pipeline must never read back as input.
+    """
+    outputs = ()
+
+    def process(self, name, date, df):
+        raise NotImplementedError
+
+    def collect(self, name, date, result):
+        pass
+
+    def finish(self, sources):
+        pass
+
+class ListingsStage(Stage):
+    """Clean every snapshot and write the cleaned listings table (see merge.save_cleaned)."""
+
+    def __init__(self, output_file, storage_root=None, db_file=None):
+        self.output_file = output_file
+        self.storage_root = storage_root
+        self.db_file = db_file
+        self.outputs = (output_file,)
+        self.all_data = []
+
+    def process(self, name, date, df):
+        return merge.clean_snapshot(df.copy())
+
+    def collect(self, name, date, result):
+        # Titles a worker process resolved, so this process saves them with its cache
+        make_model.remember(result['Name'], result['Make'], result['Model'])
+        self.all_data.append(result)
+
+    def finish(self, sources):
+        merge.save_cleaned(self.all_data, self.output_file, self.storage_root, sources, self.db_file)
+        make_model.save_cache()
+
+class DealershipStage(Stage):
+    """Write dealership_summary_<date>.csv for every dated snapshot (see dealerships.summarise_dealerships)."""
+
+    def __init__(self, output_folder, storage_root=None, db_file=None):
+        self.output_folder = output_folder
+        self.storage_root = storage_root
+        self.db_file = db_file
+        os.makedirs(output_folder, exist_ok=True)
+
+    def process(self, name, date, df):
+        if date is None:
+            print(f"Skipping {name} - Unable to extract date from filename")
+            return None
+        if 'Dealership Name' not in df.columns:
+            print(f"Skipping {name} - Missing required columns")
+            return None
+        return dealerships.summarise_dealerships(df)
+
+    def collect(self, name, date, result):
+        if result is not None:
+            dealerships.save_dealership_summary(result, self.output_folder, date, self.storage_root, self.db_file)
+
+# Stages as seen by a worker process (set once per worker by _init_worker)
+_worker_stages = None
+
+def _init_worker(stages):
+    global _worker_stages
+    _worker_stages = stages
+
+def _process_snapshot(source, stages=None):
+    """
+    Load and deduplicate one snapshot and run every stage's process() on it.
+
+    :return: (date, one result per stage, error message or None per stage), or (None, None, error)
+        if the snapshot itself could not be read.
+    """
+    stages = stages if stages is not None else _worker_stages
+    name, load = source
+    print(f"Processing: {name}")
+
+    try:
+        # Load snapshot into a DataFrame
+        df = load()
+    except Exception as e:
+        return None, None, f"❌ Error reading {name}: {e}"
+
+    # Ensure at least required columns exist
+    if df.shape[1] < 3:
+        return None, None, f"Skipping {name} - Less than 3 columns"
+
+    # Drop duplicates across all columns
+    df = df.drop_duplicates()
+    print(name, "has ", len(df), "entries after deduplication")
+
+    date = merge.snapshot_date(name)
+    results, errors = [], []
+    for stage in stages:
+        try:
+            results.append(stage.process(name, date, df))
+            errors.append(None)
+        except Exception as e:
+            results.append(None)
+            errors.append(f"❌ Error in {type(stage).__name__} for {name}: {e}")
+    return date, results, errors
+
+def ingest(data_folder, stages, storage_root=None, workers=1):
+    """
+    Read every raw snapshot once and hand it to each stage.
+
+    Each snapshot is loaded and deduplicated a single time, however many stages consume it.
+    With workers > 1, snapshots are loaded and processed on that many cores at once and their
+    results are collected in the original order. A snapshot that cannot be read, or a stage
+    that fails on one, is reported and does not stop the rest.
+
+    :param data_folder: The folder containing the raw CSV files.
+    :param stages: Stage instances, called in order for every snapshot.
+    :param storage_root: Optional Parquet storage root to read the raw snapshots from instead.
+    :param workers: Number of processes loading and processing snapshots (1 = this process only).
+    """
+    exclude = [path for stage in stages for path in stage.outputs]
+    sources = merge.find_sources(data_folder, storage_root, exclude)
+    jobs = [(name, load) for name, load, _ in sources]
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(stages,))
+        outcomes = executor.map(_process_snapshot, jobs)
+    else:
+        executor = None
+        outcomes = (_process_snapshot(job, stages) for job in jobs)
+
+    failed = []
+    try:
+        for (name, _), (date, results, errors) in zip(jobs, outcomes):
+            if results is None:
+                print(errors)
+                failed.append(name)
+                continue
+
+            for stage, result, error in zip(stages, results, errors):
+                if error:
+                    print(error)
+                    failed.append(name)
+                    continue
+                stage.collect(name, date, result)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    for stage in stages:
+        stage.finish(sources)
+
+    if failed:
+        print(f"⚠️ Finished with problems in: {', '.join(sorted(set(failed)))}")
+    else:
+        print("✅ All files processed successfully!")
+    return failed
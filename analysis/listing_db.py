@@ -0,0 +1,190 @@
+import os
+import argparse
+import sqlite3
+from contextlib import closing
+from glob import glob
+import pandas as pd
+import schema
+
+# Tables in the listings database
+LISTINGS = "listings"        # cleaned listings, one row per listing and day
+DEALERSHIPS = "dealerships"  # per-day dealership bike counts
+
+DEALERSHIP_COLUMNS = {"Dealership": "TEXT", "Date": "TEXT", "Bike Count": "INTEGER"}
+
+# Indexes backing the dashboard and depreciation queries: (name, table, columns)
+INDEXES = [
+    ("idx_listings_make_date", LISTINGS, ["Make", "Date Collected"]),
+    ("idx_listings_date", LISTINGS, ["Date Collected"]),
+    ("idx_listings_mileage", LISTINGS, ["Mileage"]),
+    ("idx_listings_year", LISTINGS, ["Year"]),
+    ("idx_dealerships_name_date", DEALERSHIPS, ["Dealership", "Date"]),
+]
+
+def _sql_type(dtype):
+    if dtype.startswith("UInt") or dtype.startswith("Int"):
+        return "INTEGER"
+    if dtype.startswith("Float"):
+        return "REAL"
+    return "TEXT"
+
+# Listings columns follow the cleaned schema; dates are stored as "YYYY-MM-DD" text
+LISTING_COLUMNS = {column: _sql_type(dtype) for column, dtype in schema.CLEANED_DTYPES.items()}
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+def _like(text):
+    """A LIKE pattern matching `text` anywhere, with % and _ taken literally (case-insensitive, as str.contains(case=False))."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def connect(db_file):
+    """Open the database, creating its tables and indexes if they do not exist yet."""
+    conn = sqlite3.connect(db_file)
+    for table, columns in [(LISTINGS, LISTING_COLUMNS), (DEALERSHIPS, DEALERSHIP_COLUMNS)]:
+        definition = ", ".join(f"{_quote(column)} {sql_type}" for column, sql_type in columns.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+    for name, table, columns in INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(_quote(c) for c in columns)})")
+    conn.commit()
+    return conn
+
+def add_missing_columns(conn, table, columns):
+    """Add the columns ({name: SQL type}) that a table created by an older version does not have yet."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, sql_type in columns.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(column)} {sql_type}")
+
+def _rows(df, columns):
+    """Rows of df as plain Python values in table column order; missing columns and values become NULL."""
+    df = df.reindex(columns=list(columns))
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime("%Y-%m-%d")
+    df = df.astype(object)
+    df = df.where(pd.notna(df), None)
+    return df.itertuples(index=False, name=None)
+
+def _insert(conn, table, columns, df):
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(f"INSERT INTO {table} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders})",
+                     _rows(df, columns))
+
+def load_listings(db_file, df, replace=True):
+    """
+    Store cleaned listings.
+
+    :param db_file: Database file (created if missing).
+    :param df: Cleaned listings, typed or not; columns outside schema.CLEANED_DTYPES are ignored.
+    :param replace: Replace every stored listing (a full merge) rather than add to them.
+    """
+    with closing(connect(db_file)) as conn, conn:
+        if replace:
+            conn.execute(f"DELETE FROM {LISTINGS}")
+        _insert(conn, LISTINGS, LISTING_COLUMNS, df)
+
+def load_dealerships(db_file, df, date):
+    """Store one day's dealership summary (Dealership, Bike Count), replacing what that day held before."""
+    with closing(connect(db_file)) as conn, conn:
+        conn.execute(f"DELETE FROM {DEALERSHIPS} WHERE Date = ?", (date,))
+        _insert(conn, DEALERSHIPS, DEALERSHIP_COLUMNS, df.assign(Date=date))
+
+def rows_per_date(conn):
+    """Number of stored listings per collection date, oldest first (a cheap fingerprint of each day)."""
+    return dict(conn.execute(
+        f'SELECT "Date Collected", COUNT(*) FROM {LISTINGS} WHERE "Date Collected" IS NOT NULL GROUP BY 1 ORDER BY 1'))
+
+def _query(db_file, sql, params=(), dtypes=schema.CLEANED_DTYPES):
+    with closing(sqlite3.connect(db_file)) as conn:
+        df = pd.read_sql_query(sql, conn, params=list(params))
+    return schema.apply_schema(df, dtypes)
+
+def query_listings(db_file, columns=None, make=None, years=None, mileages=None, dates=None, complete=False):
+    """
+    Load the listings matching every filter given; filtering happens in the database.
+
+    :param db_file: Database file.
+    :param columns: Columns to load (all of them if None).
+    :param make: Text the make must contain, ignoring case.
+    :param years: (min, max) year of manufacture, inclusive.
+    :param mileages: (min, max) mileage, inclusive.
+    :param dates: Collection dates ("YYYY-MM-DD") to load.
+    :param complete: Skip listings with a missing value in any of the loaded columns.
+    :return: DataFrame in the compact types of schema.CLEANED_DTYPES.
+    """
+    columns = list(columns or LISTING_COLUMNS)
+    conditions, params = [], []
+    if make:
+        conditions.append("Make LIKE ? ESCAPE '\\'")
+        params.append(_like(make))
+    for column, bounds in [("Year", years), ("Mileage", mileages)]:
+        if bounds is not None:
+            conditions.append(f"{column} BETWEEN ? AND ?")
+            params.extend(bounds)
+    if dates is not None:
+        dates = list(dates)
+        conditions.append(f'"Date Collected" IN ({", ".join("?" for _ in dates)})')
+        params.extend(dates)
+    if complete:
+        conditions.extend(f"{_quote(column)} IS NOT NULL" for column in columns)
+
+    sql = f"SELECT {', '.join(_quote(c) for c in columns)} FROM {LISTINGS}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return _query(db_file, sql, params)
+
+def count_by_make(db_file, make=None):
+    """Number of listings per make and collection date, as (Make, Date Collected, Bike Count)."""
+    sql = f'SELECT Make, "Date Collected", COUNT(*) AS "Bike Count" FROM {LISTINGS} WHERE Make IS NOT NULL'
+    params = []
+    if make:
+        sql += " AND Make LIKE ? ESCAPE '\\'"
+        params.append(_like(make))
+    sql += ' GROUP BY Make, "Date Collected" ORDER BY Make, "Date Collected"'
+    return _query(db_file, sql, params)
+
+def dealership_counts(db_file, dealership=None, max_count=None):
+    """
+    Bike count per dealership and day, as (Dealership, Date, Bike Count).
+
+    A dealership listed with several counts on one day gets the largest. Dealerships whose count
+    is above `max_count` that day are left out (summaries occasionally pick up site-wide totals).
+    """
+    sql = f'SELECT Dealership, Date, MAX("Bike Count") AS "Bike Count" FROM {DEALERSHIPS} WHERE "Bike Count" IS NOT NULL'
+    params = []
+    if dealership:
+        sql += " AND Dealership LIKE ? ESCAPE '\\'"
+        params.append(_like(dealership))
+    sql += " GROUP BY Dealership, Date"
+    if max_count is not None:
+        sql += ' HAVING MAX("Bike Count") <= ?'
+        params.append(max_count)
+    sql += " ORDER BY Dealership, Date"
+    return _query(db_file, sql, params, schema.DEALERSHIP_DTYPES)
+
+def build_from_csv(db_file, cleaned_file, dealership_folder):
+    """
+    (Re)build the database from the cleaned listings CSV and the dealership_summary_<date>.csv files.
+
+    :param db_file: Database file to write.
+    :param cleaned_file: Cleaned listings CSV written by merge.
+    :param dealership_folder: Folder with the dealership summaries written by dealerships.
+    """
+    load_listings(db_file, schema.read_cleaned_csv(cleaned_file))
+    print(f"✅ Listings loaded from {cleaned_file}")
+
+    for file in sorted(glob(os.path.join(dealership_folder, "dealership_summary_*.csv"))):
+        date = os.path.basename(file).split("_")[-1].split(".")[0]
+        load_dealerships(db_file, pd.read_csv(file), date)
+    print(f"✅ Dealership summaries loaded from {dealership_folder}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the listings database from the cleaned CSV files.")
+    parser.add_argument("db_file", help="Database file to write.")
+    parser.add_argument("cleaned_file", help="Cleaned listings CSV written by merge.")
+    parser.add_argument("dealership_folder", help="Folder with the dealership_summary_<date>.csv files.")
+    args = parser.parse_args()
+
+    build_from_csv(args.db_file, args.cleaned_file, args.dealership_folder)
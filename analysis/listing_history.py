@@ -0,0 +1,277 @@
+import os
+import json
+import argparse
+from contextlib import closing
+import numpy as np
+import pandas as pd
+import listing_db
+
+# Tables kept next to the listings in the listings database
+HISTORY = "listing_history"      # one row per tracked listing
+PRICE_CHANGES = "price_changes"  # one row per price change of a tracked listing
+HISTORY_DATES = "history_dates"  # snapshot dates already folded into the history, with their number of listings
+                                 # and whether the day's crawl was a full sweep
+
+HISTORY_COLUMNS = {
+    "Listing ID": "INTEGER PRIMARY KEY",
+    "Identity Key": "INTEGER",
+    "Make": "TEXT",
+    "Model": "TEXT",
+    "Year": "INTEGER",
+    "Dealer": "TEXT",
+    "First Seen": "TEXT",
+    "Last Seen": "TEXT",
+    "Days Seen": "INTEGER",
+    "First Price": "INTEGER",
+    "Last Price": "INTEGER",
+    "Min Price": "INTEGER",
+    "Price Changes": "INTEGER",
+    "First Mileage": "INTEGER",
+    "Last Mileage": "INTEGER",
+}
+PRICE_CHANGE_COLUMNS = {"Listing ID": "INTEGER", "Date": "TEXT", "Old Price": "INTEGER", "New Price": "INTEGER"}
+
+# A listing is the same bike on another day if these match exactly...
+KEY_COLUMNS = ["Make", "Model", "Year", "Dealer"]
+# ...and its mileage moved by at most this many miles (test rides, corrected adverts)
+MILEAGE_TOLERANCE = 500
+# A listing missing for more than this many days is considered gone (sold or withdrawn). Days are
+# counted up to the latest full-sweep crawl: incremental crawls do not fetch every page, so a
+# listing missing from them may still be for sale
+MAX_GAP_DAYS = 3
+
+def connect(db_file):
+    """Open the listings database with the history tables created."""
+    conn = listing_db.connect(db_file)
+    for table, columns in [(HISTORY, HISTORY_COLUMNS), (PRICE_CHANGES, PRICE_CHANGE_COLUMNS)]:
+        definition = ", ".join(f'"{column}" {sql_type}' for column, sql_type in columns.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {HISTORY_DATES} (Date TEXT PRIMARY KEY, Rows INTEGER, "Full Sweep" INTEGER)')
+    listing_db.add_missing_columns(conn, HISTORY_DATES, {"Rows": "INTEGER", "Full Sweep": "INTEGER DEFAULT 1"})
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_history_last_seen ON {HISTORY} ("Last Seen")')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_price_changes_listing ON {PRICE_CHANGES} ("Listing ID")')
+    conn.commit()
+    return conn
+
+def partial_days(crawl_modes_file):
+    """Dates whose crawl was not a full sweep, from the crawl_modes.json collect_all.py writes (none without one)."""
+    if not crawl_modes_file or not os.path.exists(crawl_modes_file):
+        return set()
+    with open(crawl_modes_file) as modes_file:
+        return {date for date, full_sweep in json.load(modes_file).items() if not full_sweep}
+
+def market_start(conn, date, max_gap_days=MAX_GAP_DAYS):
+    """
+    Earliest "Last Seen" of a listing still on the market on `date`: `max_gap_days` before the latest
+    full-sweep day up to `date`. Before the first full sweep nothing has gone.
+    """
+    latest_sweep = conn.execute(
+        f'SELECT MAX(Date) FROM {HISTORY_DATES} WHERE "Full Sweep" = 1 AND Date <= ?', (date,)).fetchone()[0]
+    if latest_sweep is None:
+        return ""
+    return (pd.Timestamp(latest_sweep) - pd.Timedelta(days=max_gap_days)).strftime("%Y-%m-%d")
+
+def identity_keys(df):
+    """
+    64-bit hash of the exact part of a listing's identity (make, model, year and dealer).
+
+    Joining on this one integer column is what lets a whole day be matched against the
+    previous ones in a single hash join.
+    """
+    keys = df[KEY_COLUMNS].astype(str)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy().view("int64")
+
+def day_listings(db_file, date):
+    """One day's listings with the columns tracking needs, one row per distinct advert."""
+    df = listing_db.query_listings(db_file, ["Make", "Model", "Year", "Mileage", "Price", "Dealership Name"], dates=[date])
+    # "Dealer - See all 1008 bikes": the count changes from day to day, the dealer does not
+    df["Dealer"] = df["Dealership Name"].astype(str).str.split(" - ").str[0]
+    df.loc[df["Dealership Name"].isna(), "Dealer"] = ""
+    df = df.drop(columns="Dealership Name").drop_duplicates().reset_index(drop=True)
+    df["Identity Key"] = identity_keys(df)
+    return df
+
+def match_listings(today, active, tolerance=MILEAGE_TOLERANCE):
+    """
+    Pair today's listings with tracked ones.
+
+    Candidates come from a hash join on the identity key; a pair is kept if the mileages are
+    within `tolerance` of each other (or both unknown). Each side is used at most once, closest
+    mileage (then closest price) first.
+
+    :param today: day_listings() frame.
+    :param active: Tracked listings still on the market ("Listing ID", "Identity Key", "Last Mileage", "Last Price").
+    :return: Series of matched Listing IDs indexed like `today` (missing where unmatched).
+    """
+    candidates = today[["Identity Key", "Mileage", "Price"]].reset_index(names="row").merge(
+        active[["Listing ID", "Identity Key", "Last Mileage", "Last Price"]], on="Identity Key")
+
+    mileage = candidates["Mileage"].astype("float64")
+    last_mileage = candidates["Last Mileage"].astype("float64")
+    candidates["distance"] = (mileage - last_mileage).abs()
+    candidates.loc[mileage.isna() & last_mileage.isna(), "distance"] = 0
+    candidates["price_distance"] = (candidates["Price"].astype("float64") - candidates["Last Price"].astype("float64")).abs()
+    candidates = candidates[candidates["distance"] <= tolerance].sort_values(["distance", "price_distance"], kind="stable")
+
+    matched = pd.Series(pd.NA, index=today.index, dtype="Int64")
+    while len(candidates):
+        # Best remaining candidate for every row, then best row for every listing
+        best = candidates.drop_duplicates("row").drop_duplicates("Listing ID")
+        matched.loc[best["row"].to_numpy()] = best["Listing ID"].to_numpy()
+        candidates = candidates[~candidates["row"].isin(best["row"]) & ~candidates["Listing ID"].isin(best["Listing ID"])]
+    return matched
+
+def new_listing_ids(today, date):
+    """IDs for listings seen for the first time: a hash of their identity, first day and position that day."""
+    seeds = pd.DataFrame({
+        "key": today["Identity Key"].to_numpy(),
+        "date": date,
+        "mileage": today["Mileage"].astype("float64").to_numpy(),
+        "position": np.arange(len(today)),
+    })
+    return pd.util.hash_pandas_object(seeds, index=False).to_numpy().view("int64")
+
+def _none(values):
+    """Column values as plain Python objects, missing values as None (for sqlite3)."""
+    values = pd.Series(values).astype(object)
+    return values.where(pd.notna(values), None).tolist()
+
+def update_day(conn, db_file, date, rows, tolerance=MILEAGE_TOLERANCE, max_gap_days=MAX_GAP_DAYS, full_sweep=True):
+    """
+    Fold one day's listings into the history: extend the listings seen again, record their
+    price changes and start tracking the new ones. Only the listings still on the market are
+    read back, so the cost depends on the size of one day, not on the length of the history.
+    `rows` is the day's number of stored listings and `full_sweep` whether its crawl was a full
+    sweep, both recorded with the day (see market_start). The day itself is recorded after its
+    listings are matched, so they are matched against the listings on the market at the
+    previous full sweep, not just the last `max_gap_days` days.
+
+    :return: (listings seen again, new listings, price changes).
+    """
+    today = day_listings(db_file, date)
+    window_start = market_start(conn, date, max_gap_days)
+    active = pd.read_sql_query(
+        f'SELECT "Listing ID", "Identity Key", "Days Seen", "Last Price", "Min Price", "Price Changes", "Last Mileage" '
+        f'FROM {HISTORY} WHERE "Last Seen" >= ? AND "Last Seen" < ?', conn, params=[window_start, date])
+
+    today["Listing ID"] = match_listings(today, active, tolerance)
+    seen = today[today["Listing ID"].notna()].merge(active, on=["Listing ID", "Identity Key"])
+    new = today[today["Listing ID"].isna()].copy()
+
+    price = seen["Price"].astype("float64")
+    previous_price = seen["Last Price"].astype("float64")
+    changed = price.notna() & previous_price.notna() & (price != previous_price)
+    min_price = np.fmin(seen["Min Price"].astype("float64"), price)
+
+    conn.executemany(
+        f'UPDATE {HISTORY} SET "Last Seen" = ?, "Days Seen" = "Days Seen" + 1, "Last Price" = ?, "Min Price" = ?, '
+        f'"Price Changes" = "Price Changes" + ?, "Last Mileage" = ? WHERE "Listing ID" = ?',
+        zip([date] * len(seen), _none(seen["Price"].fillna(seen["Last Price"])), _none(min_price),
+            changed.astype(int).tolist(), _none(seen["Mileage"].fillna(seen["Last Mileage"])), seen["Listing ID"].astype(int).tolist()))
+    conn.executemany(
+        f'INSERT INTO {PRICE_CHANGES} VALUES (?, ?, ?, ?)',
+        zip(seen.loc[changed, "Listing ID"].astype(int).tolist(), [date] * int(changed.sum()),
+            _none(seen.loc[changed, "Last Price"]), _none(seen.loc[changed, "Price"])))
+
+    new["Listing ID"] = new_listing_ids(new, date)
+    conn.executemany(
+        f'INSERT INTO {HISTORY} VALUES ({", ".join("?" for _ in HISTORY_COLUMNS)})',
+        zip(new["Listing ID"].tolist(), new["Identity Key"].tolist(), _none(new["Make"]), _none(new["Model"]),
+            _none(new["Year"]), new["Dealer"].tolist(), [date] * len(new), [date] * len(new), [1] * len(new),
+            _none(new["Price"]), _none(new["Price"]), _none(new["Price"]), [0] * len(new),
+            _none(new["Mileage"]), _none(new["Mileage"])))
+    conn.execute(f"INSERT INTO {HISTORY_DATES} VALUES (?, ?, ?)", (date, rows, int(full_sweep)))
+    return len(seen), len(new), int(changed.sum())
+
+def update_history(db_file, tolerance=MILEAGE_TOLERANCE, max_gap_days=MAX_GAP_DAYS, rebuild=False, partial=()):
+    """
+    Bring the listing history up to date with the listings table, one snapshot day at a time.
+
+    Days already folded in are skipped, so a daily run only processes the new day. Days have to
+    arrive in order: a day older than the latest one processed is reported and left out unless
+    the history is rebuilt. A day whose listings or crawl mode changed after it was folded in (a
+    snapshot merged again) rebuilds the history.
+
+    :param db_file: Listings database (see listing_db).
+    :param tolerance: Largest mileage change still considered the same listing.
+    :param max_gap_days: Days a listing may be missing from the snapshots and still be the same listing.
+    :param rebuild: Drop the history and rebuild it from every day in the listings table.
+    :param partial: Dates whose crawl was incremental (see partial_days); every other day is a full sweep.
+    """
+    partial = set(partial)
+    with closing(connect(db_file)) as conn:
+        counts = listing_db.rows_per_date(conn)
+        done = {date: (rows, full_sweep) for date, rows, full_sweep
+                in conn.execute(f'SELECT Date, Rows, "Full Sweep" FROM {HISTORY_DATES}')}
+        changed = sorted(date for date, state in done.items() if state != (counts.get(date), int(date not in partial)))
+        if changed and not rebuild:
+            print(f"⚠️ Listings of {', '.join(changed)} changed since they were tracked; rebuilding the history")
+            rebuild = True
+        if rebuild:
+            with conn:
+                for table in (HISTORY, PRICE_CHANGES, HISTORY_DATES):
+                    conn.execute(f"DELETE FROM {table}")
+            done = {}
+
+        latest = max(done) if done else None
+        for date, rows in counts.items():
+            if date in done:
+                continue
+            if latest and date < latest:
+                print(f"⚠️ Skipping {date}: older than the latest tracked day ({latest}); rebuild the history to include it")
+                continue
+            with conn:
+                seen, new, changes = update_day(conn, db_file, date, rows, tolerance, max_gap_days, date not in partial)
+            latest = date
+            print(f"✅ {date}: {seen} listings seen again, {new} new, {changes} price changes")
+
+def market_summary(db_file, by="Make", as_of=None, max_gap_days=MAX_GAP_DAYS):
+    """
+    Days on market, price drops and sell-through per group of tracked listings.
+
+    A listing counts as gone (sold or withdrawn) once it has been missing for more than
+    `max_gap_days` before the latest full-sweep day up to `as_of` (the latest tracked day by
+    default); see market_start.
+
+    :param by: History column(s) to group by, e.g. "Make" or ["Make", "Model"].
+    :return: One row per group: Listings, Gone, Sell-through, Median Days on Market (of gone
+        listings), Price Drop Share and Median Price Drop % (of listings that dropped).
+    """
+    with closing(connect(db_file)) as conn:
+        history = pd.read_sql_query(f"SELECT * FROM {HISTORY}", conn)
+        if as_of is None:
+            as_of = conn.execute(f"SELECT MAX(Date) FROM {HISTORY_DATES}").fetchone()[0]
+        start = market_start(conn, as_of, max_gap_days) if as_of else ""
+
+    if history.empty:
+        return pd.DataFrame()
+    first_seen = pd.to_datetime(history["First Seen"])
+    last_seen = pd.to_datetime(history["Last Seen"])
+    history["Gone"] = history["Last Seen"] < start
+    history["Days on Market"] = ((last_seen - first_seen).dt.days + 1).where(history["Gone"])
+    history["Dropped"] = history["Min Price"] < history["First Price"]
+    history["Price Drop %"] = (100 * (1 - history["Min Price"] / history["First Price"])).where(history["Dropped"])
+
+    summary = history.groupby(by).agg(**{
+        "Listings": ("Listing ID", "size"),
+        "Gone": ("Gone", "sum"),
+        "Median Days on Market": ("Days on Market", "median"),
+        "Price Drop Share": ("Dropped", "mean"),
+        "Median Price Drop %": ("Price Drop %", "median"),
+    })
+    summary.insert(2, "Sell-through", summary["Gone"] / summary["Listings"])
+    return summary.reset_index().sort_values("Listings", ascending=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track listings across snapshot days in the listings database.")
+    parser.add_argument("db_file", help="Listings database (see listing_db).")
+    parser.add_argument("--tolerance", type=int, default=MILEAGE_TOLERANCE, help="Largest mileage change for the same listing.")
+    parser.add_argument("--max-gap-days", type=int, default=MAX_GAP_DAYS, help="Days a listing may be missing and come back.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the history from every stored day.")
+    parser.add_argument("--crawl-modes", help="crawl_modes.json written by collect_all.py, marking incremental crawl days.")
+    parser.add_argument("--summary", default="Make", help="Column to summarise the history by ('' for none).")
+    args = parser.parse_args()
+
+    update_history(args.db_file, args.tolerance, args.max_gap_days, args.rebuild, partial_days(args.crawl_modes))
+    if args.summary:
+        print(market_summary(args.db_file, args.summary, max_gap_days=args.max_gap_days).to_string(index=False))
@@ -1,18 +1,91 @@
-import dealerships
+import os
+import argparse
 import merge
+import ingest
+import make_model
+import listing_history
+import depreciation_analysis
+from pipeline import Stage, run_pipeline
+
+# Default locations, relative to the repository
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_RAW_FOLDER = os.path.join(REPO_ROOT, "autotrader_raw_data")
+DEFAULT_OUTPUT_FOLDER = os.path.join(REPO_ROOT, "data2plot")
+
+def build_stages(raw_folder, output_folder, workers=1, bootstrap=0, level=0.95):
+    """
+    The analysis as pipeline stages (see pipeline.run_pipeline).
+
+    ingest reads each raw snapshot once for both the dealership summaries and the listings;
+    history and depreciation read the listings database it fills, so they rerun whenever it does.
+
+    :param raw_folder: Folder containing the raw CSV files.
+    :param output_folder: Folder the cleaned data, database and results are written to.
+    :param workers: Number of processes reading snapshots and fitting bootstrap resamples.
+    :param bootstrap: Bootstrap resamples for depreciation confidence intervals (0 = none).
+    :param level: Confidence level of the depreciation intervals.
+    """
+    dealership_folder = os.path.join(output_folder, "Dealerships")
+    cleaned_file = os.path.join(output_folder, "cleaned_autotrader_data.csv")
+    db_file = os.path.join(output_folder, "listings.db")
+    model_file = os.path.join(output_folder, "depreciation_by_model.csv")
+    brand_file = os.path.join(output_folder, "depreciation_by_brand.csv")
+    make_model_cache = os.path.join(output_folder, ".make_model_cache.json")
+    # Written by scraping/collect_all.py: which days were incremental crawls
+    crawl_modes_file = os.path.join(raw_folder, "crawl_modes.json")
+
+    def raw_files():
+        return sorted(paths[0] for _, _, paths in merge.find_sources(raw_folder, exclude=[cleaned_file]))
+
+    def run_ingest(changed, full):
+        # Loaded before any worker process starts; the titles resolved this run are saved at the end
+        make_model.use_cache_file(make_model_cache)
+        summaries = ingest.DealershipStage(dealership_folder, db_file=db_file)
+        if full:
+            # Start over: the incremental state describes an output that is about to be replaced
+            for path in (cleaned_file, *merge._incremental_state_paths(cleaned_file)):
+                if os.path.exists(path):
+                    os.remove(path)
+            ingest.ingest(raw_folder, [summaries, ingest.ListingsStage(cleaned_file, db_file=db_file)], workers=workers)
+        else:
+            # Summaries are per day, so only the snapshots merged again need summarising again
+            merge.merge_incremental(raw_folder, cleaned_file, db_file=db_file, stages=[summaries])
+
+    def crawl_modes():
+        return [crawl_modes_file] if os.path.exists(crawl_modes_file) else []
+
+    def run_history(changed, full):
+        listing_history.update_history(db_file, rebuild=full, partial=listing_history.partial_days(crawl_modes_file))
+
+    def run_depreciation(changed, full):
+        depreciation_analysis.depreciation_analysis(db_file, output_folder, bootstrap, level, workers=workers, rebuild=full)
+
+    return [
+        Stage("ingest", run_ingest, inputs=raw_files,
+              modules=["merge.py", "ingest.py", "make_model.py", "dealerships.py"],
+              outputs=[dealership_folder, cleaned_file, db_file]),
+        Stage("history", run_history, inputs=crawl_modes, deps=["ingest"],
+              modules=["listing_history.py"], outputs=[db_file]),
+        Stage("depreciation", run_depreciation, deps=["ingest"],
+              modules=["depreciation_analysis.py", "depreciation_stats.py", "grouped_ols.py", "bootstrap_ci.py"],
+              outputs=[model_file, brand_file], params={"bootstrap": bootstrap, "level": level}),
+    ]
 
 if __name__ == "__main__":
-    print()
-    print("######## Analysing dealerships ############# ")
-    input_folder = "/Users/monkiky/Desktop/motos_collect/autotrader_raw_data/"
-    output_folder = "/Users/monkiky/Desktop/motos_collect/data2plot/Dealerships/"
-    dealerships.dealerships(input_folder, output_folder)
-    print()
-
-    print("######## Analysing motorbikes ######## ")
-    # Define your folder path and output file name
-    data_folder = "/Users/monkiky/Desktop/motos_collect/autotrader_raw_data/"
-    output_filename = "/Users/monkiky/Desktop/motos_collect/data2plot/cleaned_autotrader_data.csv"
-
-    # Call the function to process the data
-    merge.merge(data_folder, output_filename)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the analysis, skipping the stages whose inputs and code are unchanged.")
+    parser.add_argument("--raw-folder", default=DEFAULT_RAW_FOLDER, help="Folder containing the raw CSV files.")
+    parser.add_argument("--output-folder", default=DEFAULT_OUTPUT_FOLDER,
+                        help="Folder the cleaned data, database and results are written to.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes reading snapshots and fitting bootstrap resamples.")
+    parser.add_argument("--bootstrap", type=int, default=0,
+                        help="Bootstrap resamples for depreciation confidence intervals (0 = none).")
+    parser.add_argument("--level", type=float, default=0.95, help="Confidence level of the depreciation intervals.")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="Rerun these stages in full (every stage if none are named).")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_folder, exist_ok=True)
+    stages = build_stages(args.raw_folder, args.output_folder, args.workers, args.bootstrap, args.level)
+    force = ["all"] if args.force == [] else args.force or []
+    run_pipeline(stages, os.path.join(args.output_folder, ".pipeline_cache.json"), force)
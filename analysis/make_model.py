@@ -0,0 +1,197 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+# Title prefixes that the first word alone would split wrongly or that name a model more than one
+# way, as (prefix, Make, Model prefix). The longest prefix a title starts with (ignoring case) gives
+# its Make, and the Model prefix is put in front of the rest of the title. Titles matching none of
+# them keep the first word as their Make and the rest of the title, the model's name, as their Model.
+CATALOGUE = [
+    # Makes of more than one word
+    ("Royal Enfield", "Royal Enfield", ""),
+    ("Royal Alloy", "Royal Alloy", ""),
+    ("Moto Guzzi", "Moto Guzzi", ""),
+    ("Moto Morini", "Moto Morini", ""),
+    ("Moto Parilla", "Moto Parilla", ""),
+    ("MV Agusta", "MV Agusta", ""),
+    ("Gas Gas", "Gas Gas", ""),
+    ("FB Mondial", "FB Mondial", ""),
+    ("Super Soco", "Super Soco", ""),
+    ("Herald Motor Co", "Herald", ""),
+    # The same make written another way
+    ("Bluroc Motorcycles", "Bluroc", ""),
+    ("Bullit Motorcycles", "Bullit", ""),
+    ("Mash Motorcycles", "Mash", ""),
+    ("SWM Motorcycles", "SWM", ""),
+    ("Benda Moto", "Benda", ""),
+    ("WK Bikes", "WK", ""),
+    ("Sym", "SYM", ""),
+    ("CF Moto", "CFMOTO", ""),
+    ("GasGas", "Gas Gas", ""),
+    ("Harley Davidson", "Harley-Davidson", ""),
+    # Models sold under their own name
+    ("Vespa", "Piaggio", "Vespa"),
+    # Models written more than one way (letter case is already ignored): the usual spelling
+    ("BMW F 800ST", "BMW", "F 800 ST"),
+    ("BMW K1200", "BMW", "K 1200"),
+    ("BMW K1200R", "BMW", "K 1200 R"),
+    ("BMW K1200RS", "BMW", "K 1200 RS"),
+    ("BMW K1200S", "BMW", "K 1200 S"),
+    ("BMW K1300", "BMW", "K 1300"),
+    ("BMW R1100", "BMW", "R 1100"),
+    ("BMW R1150", "BMW", "R 1150"),
+    ("Fantic XEF250", "Fantic", "XEF 250"),
+    ("Gas Gas EC 250F", "Gas Gas", "EC250F"),
+    ("Gas Gas EC 300", "Gas Gas", "EC300"),
+    ("Gas Gas EC 350F", "Gas Gas", "EC350F"),
+    ("Gas Gas ES 700", "Gas Gas", "ES700"),
+    ("Gas Gas SM 700", "Gas Gas", "SM700"),
+    ("Honda GL1800 Goldwing", "Honda", "GL1800 Gold Wing"),
+    ("Honda VTR1000", "Honda", "VTR 1000"),
+    ("Honda XL1000V", "Honda", "XL1000 V"),
+    ("Neco Alexone", "Neco", "Alex One"),
+    ("Peugeot Streetzone", "Peugeot", "Street Zone"),
+    ("Royal Alloy GP125", "Royal Alloy", "GP 125"),
+    ("Suzuki RV125 VanVan", "Suzuki", "RV125 VanVan"),
+    ("Yamaha PW 50", "Yamaha", "PW50"),
+    ("Yamaha Tracer", "Yamaha", "Tracer"),
+    ("Yamaha TTR50", "Yamaha", "TT-R50"),
+    ("Yamaha TTR110", "Yamaha", "TT-R110"),
+    ("Yamaha TTR125", "Yamaha", "TT-R125"),
+]
+
+# Resolved titles are kept here between runs (see use_cache_file and save_cache); None keeps them in memory only
+CACHE_FILE = None
+
+def build_trie(catalogue):
+    """
+    Token trie of the catalogue: nested dicts keyed by lower-case word, where the entry ending
+    at a node is stored under the None key as (Make, Model prefix).
+    """
+    trie = {}
+    for prefix, make, model in catalogue:
+        node = trie
+        for token in prefix.lower().split():
+            node = node.setdefault(token, {})
+        node[None] = (make, model)
+    return trie
+
+TRIE = build_trie(CATALOGUE)
+# Cached titles are only valid for the catalogue and code they were resolved with: the key is
+# the content hash of this file, which holds both
+with open(os.path.abspath(__file__), "rb") as _source:
+    CACHE_KEY = hashlib.sha256(_source.read()).hexdigest()
+
+def resolve_title(title, trie=TRIE):
+    """
+    Make and Model of one listing title, e.g. "Royal Enfield Bullet 350" -> ("Royal Enfield", "Bullet 350").
+
+    :return: (Make, Model); Model is None for a title that is only a make.
+    """
+    tokens = title.split(" ")
+    node, match, used = trie, None, 0
+    for count, token in enumerate(tokens, 1):
+        node = node.get(token.lower())
+        if node is None:
+            break
+        if None in node:
+            match, used = node[None], count
+
+    if match is None:
+        make, model = tokens[0], ""
+        used = 1
+    else:
+        make, model = match
+    rest = " ".join(tokens[used:])
+    model = f"{model} {rest}" if model and rest else model or rest
+    return make, model or None
+
+_cache = None
+_unsaved = False  # titles resolved since the cache was loaded or saved
+
+def use_cache_file(path):
+    """
+    Keep resolved titles in `path` between runs (None: in memory only), e.g. next to the pipeline's
+    outputs, and load the titles already stored there.
+
+    Worker processes started after this (with the fork start method) begin with these titles,
+    others with none; either way only the process calling save_cache writes the file.
+    """
+    global CACHE_FILE
+    CACHE_FILE = path
+    _load_cache()
+
+def _load_cache():
+    global _cache, _unsaved
+    _cache, _unsaved = {}, False
+    if CACHE_FILE and os.path.exists(CACHE_FILE):
+        try:
+            with open(CACHE_FILE) as cache_file:
+                stored = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if stored.get("key") == CACHE_KEY:
+            _cache = {title: tuple(parts) for title, parts in stored["titles"].items()}
+
+def save_cache():
+    """Write the titles resolved this run to CACHE_FILE, once per run (nothing to do if none are new)."""
+    global _unsaved
+    if not (CACHE_FILE and _unsaved):
+        return
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(CACHE_FILE)), exist_ok=True)
+        # Written next to the cache, then renamed: an interrupted save never leaves a half-written cache
+        tmp_path = f"{CACHE_FILE}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump({"key": CACHE_KEY, "titles": _cache}, cache_file)
+        os.replace(tmp_path, CACHE_FILE)
+        _unsaved = False
+    except OSError as e:
+        print(f"⚠️ Could not save the make/model cache: {e}")
+
+def remember(names, makes, models):
+    """
+    Add titles resolved in another process (e.g. an ingest worker) to this process's cache, so
+    save_cache keeps them too.
+
+    :param names: Series of listing titles, with their resolved `makes` and `models` (aligned Series).
+    """
+    global _unsaved
+    if _cache is None:
+        _load_cache()
+    resolved = pd.DataFrame({'Name': names, 'Make': makes, 'Model': models}).dropna(subset=['Name', 'Make'])
+    resolved = resolved.drop_duplicates('Name')
+    resolved = resolved[~resolved['Name'].astype(str).isin(_cache)]
+    for name, make, model in resolved.itertuples(index=False):
+        _cache[str(name)] = (make, model if isinstance(model, str) else None)
+    _unsaved = _unsaved or len(resolved) > 0
+
+def resolve(names):
+    """
+    Make and Model of every title in `names`.
+
+    Each distinct title is resolved once (see resolve_title) and the results are mapped back to
+    the rows by code, so the cost follows the number of distinct titles, not rows. Resolved
+    titles are cached in memory, so a title seen in an earlier snapshot costs a lookup, and
+    save_cache keeps them in CACHE_FILE for later runs.
+
+    :param names: Series of listing titles.
+    :return: (Make Series, Model Series) aligned with `names`; NaN where the title is missing.
+    """
+    global _unsaved
+    if _cache is None:
+        _load_cache()
+    codes, titles = pd.factorize(names)
+    titles = titles.astype(str).tolist()
+
+    new_titles = [title for title in titles if title not in _cache]
+    for title in new_titles:
+        _cache[title] = resolve_title(title)
+    _unsaved = _unsaved or bool(new_titles)
+
+    # Code -1 (missing title) is not in the index, so those rows come out as NaN
+    parts = pd.DataFrame([_cache[title] for title in titles], columns=['Make', 'Model'], dtype=object)
+    parts = parts.reindex(codes)
+    return (pd.Series(parts['Make'].to_numpy(), index=names.index, name='Make'),
+            pd.Series(parts['Model'].to_numpy(), index=names.index, name='Model'))
@@ -1,86 +1,547 @@
 import os
+import json
+import shutil
+import hashlib
+import numpy as np
 import pandas as pd
 from glob import glob
 import re
 from datetime import datetime
+from functools import partial
+import schema
+import storage
+import listing_db
+import make_model
 
-def merge(data_folder: str, output_filename: str = "cleaned_autotrader_data.csv"):
+# Columns that are numbers once a snapshot is cleaned
+NUMERIC_COLUMNS = ['Price', 'Year', 'Mileage', 'Engine', 'Owner', 'Min Mileage', 'Max Mileage']
+
+# Everything the Seller blob tells us besides the dealership name, in one pass over the part
+# after "Seller reviews": "5.0 (6215 reviews)Dealer locationMacclesfield(168 miles)"
+SELLER_PATTERN = re.compile(
+    r'^(?:\s*(?P<score>\d+(?:\.\d+)?)\s*\((?P<count>[\d,]+)\s*reviews?\))?'
+    r'(?:.*?Dealer location\s*(?P<town>.*?)\s*\((?P<distance>[\d,]+)\s*miles?\))?',
+    re.DOTALL,
+)
+SELLER_COLUMNS = {'town': 'Dealer Town', 'distance': 'Dealer Distance', 'score': 'Review Score', 'count': 'Review Count'}
+
+def parse_seller(df):
     """
-    Process the raw data from CSV files within the specified folder, clean it, and save the result.
+    Add dealer town, distance (miles), review score and review count parsed from the Seller blob.
+
+    Everything after "Seller reviews" is the same for every listing of a dealer, so that tail is
+    cut off first, the distinct tails are factorised and SELLER_PATTERN runs once per
+    distinct tail; the parsed parts are then mapped back to the rows by code.
+
+    :param df: DataFrame with a 'Seller' column.
+    :return: The same DataFrame with the SELLER_COLUMNS added.
+    """
+    # A plain loop over the values beats str.split here: no lists are built per row
+    tails = [seller.rpartition("Seller reviews")[2] if isinstance(seller, str) else None
+             for seller in df['Seller'].to_numpy(dtype=object)]
+    codes, uniques = pd.factorize(pd.Series(tails, dtype=object))
+    parts = pd.Series(uniques, dtype=object).str.extract(SELLER_PATTERN)
+    for group in ('distance', 'score', 'count'):
+        parts[group] = pd.to_numeric(parts[group].str.replace(",", "", regex=False), errors='coerce').astype("float64")
+
+    # Code -1 (missing Seller) is not in the index, so those rows come out as NaN
+    parts = parts.reindex(codes)
+    for group, column in SELLER_COLUMNS.items():
+        df[column] = parts[group].to_numpy()
+    return df
+
+def clean_raw(df):
+    """
+    Turn the text columns of a raw snapshot (e.g. "£8,183", "4,932 miles") into numbers.
+
+    :param df: DataFrame read from a raw (untyped) snapshot file.
+    :return: The same DataFrame with Mileage, Price, Owner, Year and Engine as numbers.
+    """
+    if 'Mileage' in df.columns:
+        df['Mileage'] = df['Mileage'].astype(str).str.extract(r'(\d+[,.]?\d*)')[0]
+        df['Mileage'] = df['Mileage'].str.replace(",", "", regex=True).astype(float)
+
+    if 'Price' in df.columns:
+        df['Price'] = df['Price'].astype(str).str.replace("£", "", regex=False)
+        df['Price'] = df['Price'].str.replace(",", "", regex=False).astype(float)
+
+    if 'Owner' in df.columns:
+        df['Owner'] = df['Owner'].astype(str).str.extract(r'(\d+)')[0]
+        df['Owner'] = pd.to_numeric(df['Owner'], errors='coerce')
+
+    if 'Year' in df.columns:
+        df['Year'] = df['Year'].astype(str).str.extract(r'(\d{4})')[0]
+        df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+
+    if 'Engine' in df.columns:
+        df['Engine'] = df['Engine'].astype(str).str.extract(r'(\d+)')[0]
+        df['Engine'] = pd.to_numeric(df['Engine'], errors='coerce')
+
+    return df
+
+def find_sources(data_folder, storage_root=None, exclude=()):
+    """
+    List the raw snapshots to merge.
 
     :param data_folder: The folder containing the raw CSV files.
-    :param output_filename: The name of the cleaned CSV file to be saved. Defaults to "cleaned_autotrader_data.csv".
+    :param storage_root: Optional Parquet storage root to read snapshots from instead, one per date.
+    :param exclude: Paths to leave out (e.g. the cleaned output, which may live in data_folder).
+    :return: List of (name, load function, files the snapshot is stored in).
     """
+    if storage_root:
+        # One snapshot per collection date stored in the raw dataset
+        raw_path = storage.dataset_path(storage_root, storage.RAW)
+        return [
+            (f"{date} (parquet)", partial(storage.read_partitions, storage_root, storage.RAW, dates=[date]),
+             sorted(glob(os.path.join(raw_path, f"Date Collected={date}", "**", "*.parquet"), recursive=True)))
+            for date in storage.partition_dates(storage_root, storage.RAW)
+        ]
 
     # Find all CSV files recursively
+    excluded = {os.path.abspath(path) for path in exclude}
     file_paths = glob(os.path.join(data_folder, "**", "*.csv"), recursive=True)
+    return [
+        (os.path.basename(file), partial(storage.read_snapshot_csv, file), [file])
+        for file in file_paths if os.path.abspath(file) not in excluded
+    ]
 
-    # List to store dealership summary
-    dealership_data = []
+# autotrader_data_YYYY-MM-DD.csv, or "YYYY-MM-DD (parquet)" for snapshots read from the store
+SNAPSHOT_DATE = re.compile(r'^(?:autotrader_data_)?(\d{4}-\d{2}-\d{2})(?:\.csv| \(parquet\))$')
 
-    # List to store data from all files
-    all_data = []
+def snapshot_date(name):
+    """Collection date of a snapshot from its name (see find_sources), or None."""
+    match = SNAPSHOT_DATE.match(name)
+    return match.group(1) if match else None
 
-    # Process each file
-    for file in file_paths:
-        print(f"Processing: {os.path.basename(file)}")
-        
-        try:
-            # Load file into a DataFrame
-            df = pd.read_csv(file, delimiter="\t")  # Adjust delimiter if needed
+def read_snapshot(name, load):
+    """
+    Load one raw snapshot and drop its duplicate rows.
+
+    :param name: Snapshot name, for messages.
+    :param load: Function returning the snapshot as a DataFrame.
+    :return: Deduplicated raw DataFrame, or None if the snapshot is unusable.
+    """
+    # Load snapshot into a DataFrame
+    df = load()
+
+    # Ensure at least required columns exist
+    if df.shape[1] < 3:
+        print(f"Skipping {name} - Less than 3 columns")
+        return None
+
+    # Drop duplicates across all columns
+    df = df.drop_duplicates()
+    print(name, "has ", len(df))
+    return df
+
+def process_snapshot(name, load):
+    """
+    Load one raw snapshot and clean it.
+
+    :param name: Snapshot name, for messages.
+    :param load: Function returning the snapshot as a DataFrame.
+    :return: Cleaned DataFrame, or None if the snapshot is unusable.
+    """
+    df = read_snapshot(name, load)
+    return None if df is None else clean_snapshot(df)
+
+def is_typed(df):
+    """
+    Whether a snapshot was written with parsed numbers: it has a Plate column with values in it.
 
-            # Ensure at least required columns exist
-            if df.shape[1] < 3:
-                print(f"Skipping {file} - Less than 3 columns")
-                continue
+    Every day read back from the Parquet store has a Plate column, as the dataset has one schema
+    for all of them; it is empty on days stored from older raw-text files.
+    """
+    return 'Plate' in df.columns and df['Plate'].notna().any()
 
-            # Drop duplicates across all columns
-            df = df.drop_duplicates()
-            print(os.path.basename(file), "has ", len(df))
+def clean_snapshot(df):
+    """
+    Clean a deduplicated raw snapshot and add Make and Model.
 
-            # Cleaning and transforming data
-            if 'Mileage' in df.columns:
-                df['Mileage'] = df['Mileage'].astype(str).str.extract(r'(\d+[,.]?\d*)')[0]
-                df['Mileage'] = df['Mileage'].str.replace(",", "", regex=True).astype(float)
+    :param df: Raw snapshot DataFrame (modified in place for raw files).
+    :return: Cleaned DataFrame.
+    """
+    # Typed snapshots already hold numbers: no text cleaning needed
+    if not is_typed(df):
+        df = clean_raw(df)
+    df = df.drop(columns=[column for column in df.columns if column.startswith("Raw ")])
 
-            if 'Price' in df.columns:
-                df['Price'] = df['Price'].astype(str).str.replace("£", "", regex=False)
-                df['Price'] = df['Price'].str.replace(",", "", regex=False).astype(float)
+    # Snapshots read back from the Parquet store hold every column as text
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns and not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], errors='coerce')
 
-            if 'Owner' in df.columns:
-                df['Owner'] = df['Owner'].astype(str).str.extract(r'(\d+)')[0]
-                df['Owner'] = pd.to_numeric(df['Owner'], errors='coerce')
+    # Extract 'Make' and 'Model' (multi-word makes such as "Royal Enfield" are kept whole)
+    df['Make'], df['Model'] = make_model.resolve(df['Name'])
 
-            if 'Year' in df.columns:
-                df['Year'] = df['Year'].astype(str).str.extract(r'(\d{4})')[0]
-                df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+    if 'Seller' in df.columns:
+        df = parse_seller(df)
+    return df
 
-            # Extract 'Make' and 'Model'
-            df[['Make', 'Model']] = df['Name'].str.split(" ", n=1, expand=True)
+def cleaned_columns(snapshot_columns):
+    """Columns clean_snapshot produces from a snapshot with these columns, in order."""
+    columns = [column for column in snapshot_columns if not column.startswith("Raw ")]
+    columns += ['Make', 'Model']
+    if 'Seller' in columns:
+        columns += list(SELLER_COLUMNS.values())
+    return columns
+
+def merge(data_folder: str, output_filename: str = "cleaned_autotrader_data.csv", storage_root: str = None,
+          incremental: bool = False, workers: int = 1, streaming: bool = False, chunksize: int = 50000,
+          db_file: str = None):
+    """
+    Process the raw data from CSV files within the specified folder, clean it, and save the result.
+
+    :param data_folder: The folder containing the raw CSV files.
+    :param output_filename: The name of the cleaned CSV file to be saved. Defaults to "cleaned_autotrader_data.csv".
+    :param storage_root: Optional Parquet storage root. When given, snapshots are read day by day from its
+        raw dataset instead of the CSV files, and the cleaned data is also written to its cleaned dataset.
+    :param incremental: Only clean snapshots that are new or changed since the last run and append their
+        unseen rows to the existing output (see merge_incremental).
+    :param workers: Number of processes cleaning snapshots in parallel (see ingest.ingest).
+    :param streaming: Read snapshots in chunks and write the output as it goes, so memory stays
+        bounded by `chunksize` instead of the size of the history (see merge_streaming).
+    :param chunksize: Rows per chunk in streaming mode.
+    :param db_file: Optional listings database (see listing_db) to also load the cleaned data into.
+    """
+    output_file = os.path.join(data_folder, output_filename)
+    if incremental:
+        return merge_incremental(data_folder, output_file, storage_root, db_file)
+    if streaming:
+        return merge_streaming(data_folder, output_file, storage_root, chunksize, db_file)
+    if workers > 1:
+        import ingest
+        ingest.ingest(data_folder, [ingest.ListingsStage(output_file, storage_root, db_file)], storage_root, workers)
+        return
 
-            # Append processed data
-            all_data.append(df)
+    sources = find_sources(data_folder, storage_root, exclude=[output_file])
+
+    # List to store data from all files
+    all_data = []
+
+    # Process each snapshot
+    for name, load, _ in sources:
+        print(f"Processing: {name}")
+        
+        try:
+            df = process_snapshot(name, load)
+            if df is not None:
+                # Append processed data
+                all_data.append(df)
 
         except Exception as e:
-            print(f"Error processing {file}: {e}")
+            print(f"Error processing {name}: {e}")
+
+    save_cleaned(all_data, output_file, storage_root, sources, db_file)
+    make_model.save_cache()
 
+def save_cleaned(all_data, output_file, storage_root=None, sources=(), db_file=None):
+    """
+    Concatenate cleaned snapshots, drop duplicates and write the cleaned dataset.
+
+    :param all_data: Cleaned DataFrames, one per snapshot.
+    :param output_file: Path of the cleaned CSV file.
+    :param storage_root: Optional Parquet storage root to also write the cleaned dataset to.
+    :param sources: The (name, load, paths) snapshots the data came from, recorded for incremental runs.
+    :param db_file: Optional listings database to also load the cleaned data into.
+    """
     # Merge all cleaned data
     if all_data:
         df_unique = pd.concat(all_data, ignore_index=True).drop_duplicates()
 
-        # Merge all dealership data
-        if dealership_data:
-            df_dealership_summary = pd.concat(dealership_data, ignore_index=True).drop_duplicates()
-        else:
-            df_dealership_summary = pd.DataFrame(columns=['Dealership', 'Bike Count'])
-
-        # Sort by Bike Count
-        df_dealership_summary = df_dealership_summary.sort_values(by='Bike Count', ascending=False)
+        # Compact types (see schema.CLEANED_DTYPES), so readers get the same types back
+        compact = schema.apply_schema(df_unique)
+        schema.memory_report("Cleaned listings", df_unique, compact)
+        df_unique = compact
 
         # Save full cleaned data
-        output_file = os.path.join(data_folder, output_filename)
         df_unique.to_csv(output_file, index=False)
         print(f"✅ Data cleaning complete! Cleaned data saved at: {output_file}")
 
+        if storage_root:
+            storage.write_partitions(df_unique, storage_root, storage.CLEANED)
+            print(f"✅ Cleaned data stored in: {storage.dataset_path(storage_root, storage.CLEANED)}")
+
+        if db_file:
+            listing_db.load_listings(db_file, df_unique)
+            print(f"✅ Cleaned data loaded into: {db_file}")
+
+        # A full merge is a fresh starting point for incremental runs
+        manifest_path, index_path = _incremental_state_paths(output_file)
+        save_manifest(manifest_path, {name: file_signature(paths) for name, _, paths in sources})
+        save_row_index(index_path, row_hashes(df_unique))
+
     else:
         print("⚠️ No valid data found in CSV files.")
+
+def _incremental_state_paths(output_file):
+    """Manifest and row-hash index kept next to the cleaned output."""
+    return f"{output_file}.manifest.json", f"{output_file}.rows.bin"
+
+def file_signature(paths, previous=None):
+    """
+    Size, modification time and content hash of the files a snapshot is stored in.
+
+    The content hash is only recomputed when size or mtime differ from `previous`,
+    so unchanged snapshots cost one stat per file.
+    """
+    size = sum(os.path.getsize(path) for path in paths)
+    mtime = max((os.path.getmtime(path) for path in paths), default=0.0)
+    if previous and previous["size"] == size and previous["mtime"] == mtime:
+        return previous
+
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as snapshot_file:
+            for block in iter(lambda: snapshot_file.read(1 << 20), b""):
+                digest.update(block)
+    return {"paths": list(paths), "size": size, "mtime": mtime, "sha256": digest.hexdigest()}
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as manifest_file:
+        return json.load(manifest_file)
+
+def save_manifest(path, manifest):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    os.replace(tmp_path, path)
+
+def row_hashes(df):
+    """
+    64-bit hash of every row, stable across a CSV round trip.
+
+    Numbers are hashed as floats and everything as text, so a row hashes the same whether
+    it was just cleaned or read back from the output file.
+    """
+    frame = df.copy()
+    for column in frame.columns:
+        if pd.api.types.is_numeric_dtype(frame[column]):
+            frame[column] = frame[column].astype("float64")
+    text = frame.astype(str).where(frame.notna(), "")
+    return pd.util.hash_pandas_object(text, index=False).to_numpy(dtype="uint64")
+
+def load_row_index(path):
+    if not os.path.exists(path):
+        return None
+    return DigestSet(np.fromfile(path, dtype="uint64"))
+
+def save_row_index(path, hashes):
+    tmp_path = f"{path}.tmp"
+    np.sort(hashes).tofile(tmp_path)
+    os.replace(tmp_path, path)
+
+def merge_incremental(data_folder: str, output_file: str, storage_root: str = None, db_file: str = None,
+                      stages=()):
+    """
+    Clean only the snapshots that are new or changed since the last run, and append their new rows.
+
+    A manifest next to the output records every processed snapshot (paths, size, mtime and content
+    hash); snapshots that match it are skipped without being read. Duplicates are dropped against an
+    index of the hashes of every row already in the output instead of re-concatenating the history.
+    Rows of a snapshot that changed are added if unseen; rows that disappeared from it are kept.
+
+    :param data_folder: The folder containing the raw CSV files.
+    :param output_file: Path of the cleaned CSV file.
+    :param storage_root: Optional Parquet storage root (see merge).
+    :param db_file: Optional listings database (see merge).
+    :param stages: Other consumers of the raw snapshots (see ingest.Stage), handed every new or
+        changed snapshot this run reads, so it is read once for all of them.
+    """
+    manifest_path, index_path = _incremental_state_paths(output_file)
+    manifest = load_manifest(manifest_path)
+    seen = load_row_index(index_path)
+
+    if not os.path.exists(output_file):
+        manifest, seen, header = {}, DigestSet(), None
+    else:
+        header = list(pd.read_csv(output_file, nrows=0).columns)
+        if seen is None:
+            # First incremental run over an existing output: index what is already there
+            seen = DigestSet(row_hashes(pd.read_csv(output_file, dtype={"Plate": str})))
+
+    new_data, read = [], []
+    exclude = [output_file] + [path for stage in stages for path in stage.outputs]
+    for name, load, paths in find_sources(data_folder, storage_root, exclude=exclude):
+        signature = file_signature(paths, manifest.get(name))
+        if manifest.get(name, {}).get("sha256") == signature["sha256"]:
+            manifest[name] = signature
+            continue
+
+        print(f"Processing: {name}")
+        try:
+            df = read_snapshot(name, load)
+            if df is not None:
+                date = snapshot_date(name)
+                for stage in stages:
+                    try:
+                        stage.collect(name, date, stage.process(name, date, df))
+                    except Exception as e:
+                        print(f"❌ Error in {type(stage).__name__} for {name}: {e}")
+                df = clean_snapshot(df)
+        except Exception as e:
+            print(f"Error processing {name}: {e}")
+            continue
+        if df is not None:
+            new_data.append(df)
+        read.append((name, load, paths))
+        manifest[name] = signature
+
+    for stage in stages:
+        stage.finish(read)
+    make_model.save_cache()
+
+    if not new_data:
+        save_manifest(manifest_path, manifest)
+        print("✅ Cleaned data is up to date.")
+        return
+
+    df_new = pd.concat(new_data, ignore_index=True)
+    columns = list(df_new.columns) if header is None else list(dict.fromkeys(header + list(df_new.columns)))
+    if header is not None and columns != header:
+        # New columns: rewrite the output once with the wider header (which changes every row's hash)
+        df_existing = pd.read_csv(output_file, dtype={"Plate": str}).reindex(columns=columns)
+        df_existing.to_csv(output_file, index=False)
+        seen = DigestSet(row_hashes(df_existing))
+    df_new = schema.apply_schema(df_new.reindex(columns=columns))
+
+    # Keep rows whose hash is neither in the output nor earlier in this batch
+    keep = seen.add_new(row_hashes(df_new))
+    df_new = df_new[keep]
+
+    df_new.to_csv(output_file, mode="a", index=False, header=not os.path.exists(output_file))
+    save_row_index(index_path, seen.to_array())
+    save_manifest(manifest_path, manifest)
+    print(f"✅ {len(df_new)} new rows appended to: {output_file}")
+
+    if storage_root and len(df_new):
+        # Rewrite only the days that gained rows
+        dates = sorted(df_new["Date Collected"].astype(str).unique())
+        df_days = pd.concat([storage.read_partitions(storage_root, storage.CLEANED, dates=dates), df_new], ignore_index=True)
+        storage.write_partitions(df_days, storage_root, storage.CLEANED)
+
+    if db_file and len(df_new):
+        listing_db.load_listings(db_file, df_new, replace=False)
+
+class DigestSet:
+    """
+    Set of 64-bit row digests stored as sorted NumPy runs, 8 bytes per row.
+
+    New digests become a sorted run; runs are merged once there are more than `max_runs`,
+    so lookups stay a handful of vectorised binary searches.
+
+    :param hashes: Digests the set starts with, e.g. a saved row index (see load_row_index).
+    """
+
+    def __init__(self, hashes=(), max_runs=8):
+        hashes = np.unique(np.asarray(hashes, dtype="uint64"))
+        self.runs = [hashes] if len(hashes) else []
+        self.max_runs = max_runs
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes):
+        """Boolean mask of the digests already in the set."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == hashes
+        return found
+
+    def add_new(self, hashes):
+        """Add the digests and return a mask of the ones that were not already in the set (first occurrence only)."""
+        hashes = np.asarray(hashes, dtype="uint64")
+        _, first = np.unique(hashes, return_index=True)
+        new = np.zeros(len(hashes), dtype=bool)
+        new[first] = True
+        new &= ~self.contains(hashes)
+        if new.any():
+            self.runs.append(np.sort(hashes[new]))
+            if len(self.runs) > self.max_runs:
+                self.runs = [np.sort(np.concatenate(self.runs))]
+        return new
+
+    def to_array(self):
+        return np.concatenate(self.runs) if self.runs else np.empty(0, dtype="uint64")
+
+def _snapshot_chunks(name, paths, storage_root, chunksize):
+    """Yield a snapshot's rows chunksize rows at a time."""
+    if storage_root:
+        date = name.split(" ")[0]
+        yield from storage.iter_partitions(storage_root, storage.RAW, dates=[date], batch_rows=chunksize)
+    else:
+        yield from pd.read_csv(paths[0], delimiter="\t", dtype={"Plate": str}, chunksize=chunksize)
+
+def _snapshot_columns(paths, storage_root):
+    if storage_root:
+        return storage.dataset_columns(storage_root, storage.RAW)
+    return list(pd.read_csv(paths[0], delimiter="\t", nrows=0).columns)
+
+def merge_streaming(data_folder: str, output_file: str, storage_root: str = None, chunksize: int = 50000,
+                    db_file: str = None):
+    """
+    Merge the snapshots chunk by chunk, holding at most one chunk in memory.
+
+    Every chunk is cleaned, checked against a DigestSet of the rows written so far and its new rows
+    are appended to the output straight away. Memory use is the chunk plus 8 bytes per distinct row,
+    whatever the length of the history. Gives the same rows as merge, in the same order.
+
+    :param data_folder: The folder containing the raw CSV files.
+    :param output_file: Path of the cleaned CSV file.
+    :param storage_root: Optional Parquet storage root (see merge).
+    :param chunksize: Rows read per chunk.
+    :param db_file: Optional listings database (see merge).
+    """
+    sources = find_sources(data_folder, storage_root, exclude=[output_file])
+
+    # The output header has to be known before the first chunk is written
+    columns = []
+    for name, _, paths in sources:
+        snapshot_columns = _snapshot_columns(paths, storage_root)
+        if len(snapshot_columns) < 3:
+            continue
+        columns.extend(column for column in cleaned_columns(snapshot_columns) if column not in columns)
+
+    if not columns:
+        print("⚠️ No valid data found in CSV files.")
+        return
+
+    if storage_root:
+        shutil.rmtree(storage.dataset_path(storage_root, storage.CLEANED), ignore_errors=True)
+    if db_file:
+        listing_db.load_listings(db_file, pd.DataFrame(columns=columns))
+
+    seen = DigestSet()
+    rows_written = 0
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, "w", newline="") as output:
+        pd.DataFrame(columns=columns).to_csv(output, index=False)
+        for name, _, paths in sources:
+            print(f"Processing: {name}")
+            try:
+                for chunk in _snapshot_chunks(name, paths, storage_root, chunksize):
+                    if chunk.shape[1] < 3:
+                        print(f"Skipping {name} - Less than 3 columns")
+                        break
+                    chunk = schema.apply_schema(clean_snapshot(chunk).reindex(columns=columns))
+                    chunk = chunk[seen.add_new(row_hashes(chunk))]
+                    chunk.to_csv(output, index=False, header=False)
+                    rows_written += len(chunk)
+                    if storage_root:
+                        storage.append_partitions(chunk, storage_root, storage.CLEANED)
+                    if db_file:
+                        listing_db.load_listings(db_file, chunk, replace=False)
+            except Exception as e:
+                print(f"Error processing {name}: {e}")
+    os.replace(tmp_file, output_file)
+    print(f"✅ Data cleaning complete! {rows_written} rows saved at: {output_file}")
+    make_model.save_cache()
+
+    # Same starting point for incremental runs as a full merge
+    manifest_path, index_path = _incremental_state_paths(output_file)
+    save_manifest(manifest_path, {name: file_signature(paths) for name, _, paths in sources})
+    save_row_index(index_path, seen.to_array())
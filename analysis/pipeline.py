@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import merge
+
+# Every stage's code fingerprint includes these shared modules besides its own
+SHARED_MODULES = ["schema.py", "storage.py", "listing_db.py", "pipeline.py"]
+
+class Stage:
+    """
+    One step of the analysis pipeline.
+
+    run(changed, full) does the work: `changed` lists the input files that are new or changed
+    since the stage last ran, and `full` is True when everything has to be recomputed (first
+    run, changed code, missing outputs or a forced run). A stage whose inputs, code, parameters
+    and upstream stages are all unchanged, and whose outputs still exist, is skipped.
+
+    :param name: Stage name, unique within the pipeline.
+    :param run: Callable taking (changed, full).
+    :param inputs: Callable returning the input files to fingerprint, or None.
+    :param deps: Names of the stages this one reads the outputs of.
+    :param modules: Source files (in this folder) the stage's results depend on.
+    :param outputs: Files or folders the stage writes.
+    :param params: Run settings the stage's results depend on (JSON-serialisable dict), e.g.
+        the number of bootstrap resamples; changing one reruns the stage.
+    """
+
+    def __init__(self, name, run, inputs=None, deps=(), modules=(), outputs=(), params=None):
+        self.name = name
+        self.run = run
+        self.inputs = inputs or (lambda: [])
+        self.deps = list(deps)
+        self.modules = list(modules)
+        self.outputs = list(outputs)
+        self.params = dict(params or {})
+
+def code_fingerprint(modules):
+    """Content hash of the given source files of this folder (plus SHARED_MODULES)."""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for module in sorted(set(modules) | set(SHARED_MODULES)):
+        digest.update(module.encode())
+        with open(os.path.join(folder, module), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+def run_order(stages):
+    """Stages sorted so that every stage comes after the ones it depends on."""
+    by_name = {stage.name: stage for stage in stages}
+    ordered, visiting, done = [], set(), set()
+
+    def visit(stage):
+        if stage.name in done:
+            return
+        if stage.name in visiting:
+            raise ValueError(f"Pipeline stages depend on each other in a cycle through {stage.name}")
+        visiting.add(stage.name)
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+            visit(by_name[dep])
+        visiting.discard(stage.name)
+        done.add(stage.name)
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+def run_pipeline(stages, cache_file, force=()):
+    """
+    Run the stages in dependency order, skipping those whose fingerprint is unchanged.
+
+    A stage's fingerprint covers the content of its input files, its code (see code_fingerprint),
+    its parameters and the fingerprints its upstream stages last ran with, so a change anywhere
+    reruns exactly the stages downstream of it; a stage downstream of one that ran in full runs
+    in full too. Input files whose size and mtime are unchanged are not re-read (see
+    merge.file_signature), so checking an up-to-date pipeline costs one stat per input file.
+
+    :param stages: Stage instances.
+    :param cache_file: JSON file the fingerprints are kept in between runs.
+    :param force: Names of stages to rerun in full whatever their fingerprint ("all" for every stage).
+    :return: Names of the stages that ran.
+    """
+    cache = merge.load_manifest(cache_file)
+    ran, rebuilt = [], set()
+    for stage in run_order(stages):
+        start = time.perf_counter()
+        previous = cache.get(stage.name, {})
+        previous_inputs = previous.get("inputs", {})
+
+        code = code_fingerprint(stage.modules)
+        inputs = {path: merge.file_signature([path], previous_inputs.get(path)) for path in stage.inputs()}
+        upstream = {dep: cache.get(dep, {}).get("key") for dep in stage.deps}
+        key = hashlib.sha256(json.dumps(
+            [code, sorted((path, signature["sha256"]) for path, signature in inputs.items()), upstream, stage.params],
+            sort_keys=True).encode()).hexdigest()
+
+        outputs_exist = all(os.path.exists(path) for path in stage.outputs)
+        forced = stage.name in force or "all" in force
+        if key == previous.get("key") and outputs_exist and not forced:
+            # Keep refreshed mtimes, so the next run does not hash these files again
+            cache[stage.name] = dict(previous, inputs=inputs)
+            print(f"⏭️ {stage.name}: up to date")
+            continue
+
+        full = forced or code != previous.get("code") or not outputs_exist or bool(rebuilt & set(stage.deps))
+        changed = sorted(path for path, signature in inputs.items()
+                         if previous_inputs.get(path, {}).get("sha256") != signature["sha256"])
+        if full:
+            reason = "full run"
+        elif changed:
+            reason = f"{len(changed)} changed input(s)"
+        elif stage.params != previous.get("params", {}):
+            reason = "parameters changed"
+        else:
+            reason = f"upstream changed ({', '.join(stage.deps)})"
+        print(f"▶️ {stage.name}: {reason}")
+        stage.run(changed, full)
+
+        cache[stage.name] = {"key": key, "code": code, "inputs": inputs, "params": stage.params}
+        merge.save_manifest(cache_file, cache)
+        ran.append(stage.name)
+        if full:
+            rebuilt.add(stage.name)
+        print(f"✅ {stage.name} done in {time.perf_counter() - start:.2f}s")
+
+    merge.save_manifest(cache_file, cache)
+    return ran
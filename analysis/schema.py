@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# In-memory types of the cleaned listings table. Repeated text is categorical, whole numbers
+# use the smallest nullable integer that holds them and the collection date is a datetime.
+# Fractions stay 64-bit: a float32 4.9 is 4.900000095..., which would no longer hash like the
+# 4.9 read back from the CSV (see merge.row_hashes).
+CLEANED_DTYPES = {
+    "Name": "category",
+    "Price": "UInt32",
+    "Year": "UInt16",
+    "Plate": "category",
+    "Mileage": "UInt32",
+    "Engine": "UInt16",
+    "Owner": "UInt8",
+    "Dealership Name": "category",
+    "Seller": "category",
+    "Body Type": "category",
+    "Min Mileage": "UInt32",
+    "Max Mileage": "UInt32",
+    "Date Collected": "datetime64[ns]",
+    "Make": "category",
+    "Model": "category",
+    "Dealer Town": "category",
+    "Dealer Distance": "UInt16",
+    "Review Score": "Float64",
+    "Review Count": "UInt32",
+}
+
+# Per-day dealership summaries, as the dashboard queries them (see listing_db.dealership_counts)
+DEALERSHIP_DTYPES = {
+    "Dealership": "category",
+    "Bike Count": "UInt16",
+    "Date": "datetime64[ns]",
+}
+
+def _to_integer(values, dtype):
+    """Round to whole numbers; anything the dtype cannot hold becomes missing."""
+    values = pd.to_numeric(values, errors="coerce").astype("float64").round()
+    limits = np.iinfo(dtype.lower())
+    return values.where((values >= limits.min) & (values <= limits.max)).astype(dtype)
+
+def apply_schema(df, dtypes=CLEANED_DTYPES):
+    """
+    Convert every column listed in `dtypes` to its compact type; other columns are left as they are.
+
+    :param df: DataFrame to convert (not modified).
+    :param dtypes: Column name to dtype, e.g. CLEANED_DTYPES.
+    :return: Converted DataFrame.
+    """
+    df = df.copy()
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        if dtype.startswith("datetime"):
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+        elif dtype.startswith("UInt") or dtype.startswith("Int"):
+            df[column] = _to_integer(df[column], dtype)
+        elif dtype.startswith("Float"):
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def read_cleaned_csv(path, dtypes=CLEANED_DTYPES, **read_csv_args):
+    """
+    Read a cleaned CSV straight into the compact types.
+
+    Categorical columns are parsed as categories by read_csv itself, so the full-size
+    object columns never exist in memory.
+    """
+    categorical = {column: "category" for column, dtype in dtypes.items() if dtype == "category"}
+    df = pd.read_csv(path, dtype=categorical, **read_csv_args)
+    return apply_schema(df, dtypes)
+
+def memory_mb(df):
+    """Memory held by a DataFrame, strings included, in MB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def memory_report(label, before, after):
+    """Print the footprint of a frame before and after applying the schema."""
+    saved = 100 * (1 - memory_mb(after) / memory_mb(before)) if memory_mb(before) else 0.0
+    print(f"💾 {label}: {memory_mb(before):.1f} MB → {memory_mb(after):.1f} MB ({saved:.0f}% smaller, {len(after):,} rows)")
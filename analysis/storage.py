@@ -0,0 +1,179 @@
+import os
+import argparse
+import uuid
+import pandas as pd
+import pyarrow.dataset as ds
+from glob import glob
+
+# Datasets kept under a storage root
+RAW = "raw"                  # scraped snapshots, one row per listing
+CLEANED = "cleaned"          # merge output
+DEALERSHIPS = "dealerships"  # per-day dealership bike counts
+
+# Columns that are always stored as numbers, even in a batch where they are empty
+NUMERIC_COLUMNS = {"Price", "Year", "Mileage", "Engine", "Owner", "Min Mileage", "Max Mileage", "Bike Count"}
+
+# Every dataset is split into <root>/<dataset>/Date Collected=<date>/Body Type=<body type>/
+PARTITION_COLUMNS = ["Date Collected", "Body Type"]
+
+def read_snapshot_csv(file):
+    """Read a tab-separated snapshot file, keeping plates such as "05" as text."""
+    return pd.read_csv(file, delimiter="\t", dtype={"Plate": str})
+
+def dataset_path(root, name):
+    return os.path.join(root, name)
+
+def _normalize(df, partition_cols, as_text=False):
+    """
+    Give every day the same column types, so days written separately read back as one table.
+
+    Numbers are stored as float64 (a day with a missing value would otherwise be float and the
+    next one int) and everything else as strings. With as_text, every column is stored as a
+    string: raw snapshots mix "£8,183"-style text (older files) with parsed numbers (typed files).
+    """
+    df = df.copy()
+    for column in df.columns:
+        if column in partition_cols:
+            df[column] = df[column].astype(str)
+        elif as_text:
+            df[column] = df[column].astype("string")
+        elif column in NUMERIC_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+        elif pd.api.types.is_numeric_dtype(df[column]) and df[column].notna().any():
+            df[column] = df[column].astype("float64")
+        else:
+            # Includes columns that happen to be empty in this batch, e.g. Plate in older snapshots
+            df[column] = df[column].astype("string")
+    return df
+
+def write_partitions(df, root, name, partition_cols=PARTITION_COLUMNS):
+    """
+    Write a DataFrame into a Parquet dataset, partitioned by `partition_cols`.
+
+    Partitions present in df replace what was stored for them before; all others are left alone,
+    so writing one day (again) never touches the rest of the history.
+
+    :param df: Rows to store; must contain the partition columns.
+    :param root: Storage root folder.
+    :param name: Dataset name, e.g. RAW or CLEANED.
+    :param partition_cols: Columns that become directory levels.
+    """
+    if df.empty:
+        return
+    df = _normalize(df, partition_cols, as_text=name == RAW)
+    df.to_parquet(
+        dataset_path(root, name),
+        engine="pyarrow",
+        index=False,
+        partition_cols=list(partition_cols),
+        existing_data_behavior="delete_matching",
+    )
+
+def read_partitions(root, name, columns=None, dates=None, body_types=None, filters=None):
+    """
+    Read a Parquet dataset, loading only the columns and partitions asked for.
+
+    Column selection and the date/body type filters are pushed down to the Parquet reader, so
+    other columns are never decoded and other days' files are never opened.
+
+    :param root: Storage root folder.
+    :param name: Dataset name, e.g. RAW or CLEANED.
+    :param columns: Columns to load (all of them if None).
+    :param dates: Collection dates ("YYYY-MM-DD") to load (all if None).
+    :param body_types: Body types to load (all if None).
+    :param filters: Extra pyarrow filters, e.g. [("Year", ">=", 2020)].
+    :return: DataFrame (empty if the dataset does not exist yet).
+    """
+    path = dataset_path(root, name)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+
+    conditions = list(filters or [])
+    if dates is not None:
+        conditions.append(("Date Collected", "in", list(dates)))
+    if body_types is not None:
+        conditions.append(("Body Type", "in", list(body_types)))
+
+    df = pd.read_parquet(path, engine="pyarrow", columns=columns, filters=conditions or None)
+
+    # Partition values come back as categoricals; hand them back as plain strings
+    for column in PARTITION_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(str)
+    return df
+
+def iter_partitions(root, name, columns=None, dates=None, body_types=None, batch_rows=50000):
+    """
+    Like read_partitions, but yield the rows in DataFrames of at most `batch_rows` rows.
+
+    Only one batch is held in memory at a time, however large the selected partitions are.
+    """
+    path = dataset_path(root, name)
+    if not os.path.exists(path):
+        return
+
+    expression = None
+    if dates is not None:
+        expression = ds.field("Date Collected").isin(list(dates))
+    if body_types is not None:
+        condition = ds.field("Body Type").isin(list(body_types))
+        expression = condition if expression is None else expression & condition
+
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_rows):
+        df = batch.to_pandas()
+        for column in PARTITION_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype(str)
+        yield df
+
+def append_partitions(df, root, name, partition_cols=PARTITION_COLUMNS):
+    """
+    Add rows to a Parquet dataset without replacing what its partitions already hold.
+
+    Each call writes new files, so a dataset can be built up one chunk at a time.
+    """
+    if df.empty:
+        return
+    df = _normalize(df, partition_cols, as_text=name == RAW)
+    df.to_parquet(
+        dataset_path(root, name),
+        engine="pyarrow",
+        index=False,
+        partition_cols=list(partition_cols),
+        existing_data_behavior="overwrite_or_ignore",
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+    )
+
+def dataset_columns(root, name):
+    """Column names of a dataset, partition columns included, without reading any rows."""
+    return ds.dataset(dataset_path(root, name), format="parquet", partitioning="hive").schema.names
+
+def partition_dates(root, name):
+    """Collection dates stored in a dataset, oldest first."""
+    path = dataset_path(root, name)
+    if not os.path.exists(path):
+        return []
+    prefix = "Date Collected="
+    return sorted(entry[len(prefix):] for entry in os.listdir(path) if entry.startswith(prefix))
+
+def import_csv_snapshots(data_folder, root):
+    """
+    Copy every raw tab-separated snapshot under data_folder into the raw dataset.
+
+    :param data_folder: Folder with autotrader_data_<date>.csv files (searched recursively).
+    :param root: Storage root folder.
+    """
+    file_paths = sorted(glob(os.path.join(data_folder, "**", "autotrader_data_*.csv"), recursive=True))
+    for file in file_paths:
+        df = read_snapshot_csv(file)
+        write_partitions(df, root, RAW)
+        print(f"✅ Stored {os.path.basename(file)} ({len(df)} rows)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy raw CSV snapshots into the Parquet store.")
+    parser.add_argument("data_folder", help="Folder with the raw autotrader_data_<date>.csv files.")
+    parser.add_argument("storage_root", help="Parquet storage root.")
+    args = parser.parse_args()
+
+    import_csv_snapshots(args.data_folder, args.storage_root)
@@ -0,0 +1,31 @@
+import pandas as pd
+import listing_db
+import listing_history
+
+LISTINGS = 50
+
+def day(date, count):
+    """The first `count` of the same LISTINGS adverts, collected on `date`."""
+    return pd.DataFrame({
+        "Name": [f"Honda CB{i}" for i in range(count)],
+        "Make": "Honda",
+        "Model": [f"CB{i}" for i in range(count)],
+        "Year": 2019,
+        "Mileage": [1000 + 10 * i for i in range(count)],
+        "Price": [5000 + 100 * i for i in range(count)],
+        "Dealership Name": "Fixture Motorcycles - See all 50 bikes",
+        "Date Collected": date,
+    })
+
+def test_full_sweep_after_incremental_days_matches_every_listing(tmp_path):
+    # A full sweep, six incremental crawls that only re-fetch two adverts, then another full sweep
+    db_file = str(tmp_path / "listings.db")
+    dates = pd.date_range("2025-03-01", periods=8).strftime("%Y-%m-%d").tolist()
+    counts = [LISTINGS] + [2] * 6 + [LISTINGS]
+    listing_db.load_listings(db_file, pd.concat([day(date, count) for date, count in zip(dates, counts)]))
+
+    listing_history.update_history(db_file, partial=dates[1:-1])
+
+    summary = listing_history.market_summary(db_file)
+    assert summary["Listings"].sum() == LISTINGS
+    assert summary["Gone"].sum() == 0
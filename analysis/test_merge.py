@@ -0,0 +1,75 @@
+import pytest
+import pandas as pd
+import merge
+import storage
+
+def raw_text_day(date):
+    """A snapshot as older crawls wrote it: every number still in its display text."""
+    return pd.DataFrame({
+        "Name": ["Honda CB500", "Triumph Street Triple"],
+        "Price": ["£8,183", "£6,250"],
+        "Year": ["2019 (19 reg)", "2017 (67 reg)"],
+        "Mileage": ["4,932 miles", "12,000 miles"],
+        "Engine": ["471cc", "675cc"],
+        "Owner": ["1 owner", "2 owners"],
+        "Dealership Name": ["Fixture Motorcycles", "Fixture Motorcycles"],
+        "Body Type": ["Naked", "Naked"],
+        "Date Collected": [date, date],
+    })
+
+def typed_day(date):
+    """A snapshot written with parsed numbers and a Plate column."""
+    return pd.DataFrame({
+        "Name": ["Honda CB500", "Triumph Street Triple"],
+        "Price": [8183, 6250],
+        "Year": [2019, 2017],
+        "Plate": ["19", "67"],
+        "Mileage": [4932, 12000],
+        "Engine": [471, 675],
+        "Owner": [1, 2],
+        "Dealership Name": ["Fixture Motorcycles", "Fixture Motorcycles"],
+        "Body Type": ["Naked", "Naked"],
+        "Date Collected": [date, date],
+    })
+
+@pytest.mark.parametrize("raw_text_date, typed_date", [("2025-01-30", "2025-02-01"), ("2025-01-30", "2025-01-29")])
+def test_mixed_store_cleans_every_day(tmp_path, raw_text_date, typed_date):
+    # Days of one raw dataset read back with the columns of the first one: with a typed day first,
+    # raw-text days come back with an empty Plate column
+    root = str(tmp_path / "store")
+    storage.write_partitions(raw_text_day(raw_text_date), root, storage.RAW)
+    storage.write_partitions(typed_day(typed_date), root, storage.RAW)
+
+    cleaned = {}
+    for name, load, _ in merge.find_sources(str(tmp_path), root):
+        df = merge.process_snapshot(name, load)
+        cleaned[merge.snapshot_date(name)] = df.sort_values("Name").reset_index(drop=True)
+
+    assert set(cleaned) == {raw_text_date, typed_date}
+    for df in cleaned.values():
+        assert df["Price"].tolist() == [8183, 6250]
+        assert df["Year"].tolist() == [2019, 2017]
+        assert df["Mileage"].tolist() == [4932, 12000]
+        assert df["Engine"].tolist() == [471, 675]
+        assert df["Owner"].tolist() == [1, 2]
+
+def test_incremental_merge_only_appends_unseen_rows(tmp_path):
+    data_folder = tmp_path / "raw"
+    data_folder.mkdir()
+    output_file = str(tmp_path / "cleaned.csv")
+    raw_text_day("2025-01-30").to_csv(data_folder / "autotrader_data_2025-01-30.csv", sep="\t", index=False)
+    merge.merge_incremental(str(data_folder), output_file)
+
+    # The next day repeats one advert of the first and lists one new one, twice
+    next_day = raw_text_day("2025-01-31")
+    next_day.loc[1, "Name"] = "Honda CB650R"
+    pd.concat([raw_text_day("2025-01-30").iloc[:1], next_day, next_day.iloc[1:]]).to_csv(
+        data_folder / "autotrader_data_2025-01-31.csv", sep="\t", index=False)
+    merge.merge_incremental(str(data_folder), output_file)
+    merge.merge_incremental(str(data_folder), output_file)
+
+    cleaned = pd.read_csv(output_file)
+    assert len(cleaned) == 4
+    assert not cleaned.duplicated().any()
+    _, index_path = merge._incremental_state_paths(output_file)
+    assert len(merge.load_row_index(index_path)) == 4
@@ -1,12 +1,10 @@
 import plotly.express as px
-from data_processing import load_autotrader_data
-
-# Load the Autotrader data
-df_autotrader = load_autotrader_data()
+from data_processing import get_listings_db
+import listing_db  # found through the analysis folder data_processing adds to the path
 
 # Function to update Brand Count vs Date graph
 def update_brand_count_over_time():
-    df_grouped = df_autotrader.groupby(['Date', 'Make']).size().reset_index(name='Count')
+    df_grouped = listing_db.count_by_make(get_listings_db()).rename(columns={'Date Collected': 'Date', 'Bike Count': 'Count'})
 
     fig = px.scatter(
         df_grouped,
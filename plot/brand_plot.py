@@ -1,22 +1,13 @@
 # brand_plot.py
 import plotly.express as px
-from data_processing import load_autotrader_data
-
-# Load the processed Autotrader data
-df_autotrader_grouped = load_autotrader_data()
+from data_processing import get_listings_db
+import listing_db  # found through the analysis folder data_processing adds to the path
 
 
 # Function to update the brand graph
 def update_brand_graph(search_value):
-    # Filter the data based on the search input (if provided)
-    if search_value:
-        filtered_df = df_autotrader_grouped[df_autotrader_grouped['Make'].str.contains(search_value, case=False, na=False)]
-    else:
-        filtered_df = df_autotrader_grouped
-    
-    # Group the data by 'Make' and 'Date Collected', and calculate the count of bikes for each group
-    # This assumes that the 'Date Collected' column is already in datetime format.
-    filtered_df_grouped = filtered_df.groupby(['Make', 'Date Collected']).size().reset_index(name='Bike Count')
+    # Count the bikes of each make (matching the search input, if provided) per collection date
+    filtered_df_grouped = listing_db.count_by_make(get_listings_db(), search_value)
     
     # Print the grouped data to check
     print(filtered_df_grouped)
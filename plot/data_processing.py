@@ -1,41 +1,38 @@
 import os
-import pandas as pd
+import sys
 from glob import glob
 
+# The database code is shared with the analysis scripts that write the data
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis"))
+import listing_db
+
 # Define the path to the data folder
 data_folder = './data2plot/Dealerships/'
-
-# Load and process the dealership data
-def load_dealership_data():
-    file_paths = glob(os.path.join(data_folder, 'dealership_summary_*.csv'))
-    all_data = []
-
-    for file in file_paths:
-        date_str = os.path.basename(file).split('_')[-1].split('.')[0]
-        date = pd.to_datetime(date_str, format='%Y-%m-%d')
-
-        df = pd.read_csv(file)
-        df['Date'] = date
-        all_data.append(df)
-
-    df_combined = pd.concat(all_data, ignore_index=True)
-    df_combined['Bike Count'] = pd.to_numeric(df_combined['Bike Count'], errors='coerce')
-    df_combined = df_combined.drop_duplicates(subset=['Dealership', 'Date'])
-    df_combined = df_combined[df_combined['Bike Count'] <= 1100]
-    df_grouped = df_combined.groupby(['Dealership', 'Date'], as_index=False)['Bike Count'].sum()
-    return df_grouped
-
-# Load and process the Autotrader data
-# data_processing.py
-def load_autotrader_data():
-    autotrader_data_path = './data2plot/cleaned_autotrader_data.csv'
-    df_autotrader = pd.read_csv(autotrader_data_path)
-
-    # Debug: Check the columns to make sure 'Mileage' exists
-    print("Columns in Autotrader Data:", df_autotrader.columns)
-    
-    # Ensure proper data types
-    df_autotrader['Date Collected'] = pd.to_datetime(df_autotrader['Date Collected'], format='%Y-%m-%d')
-    
-    return df_autotrader  # Return the raw dataset, not the grouped one
-
+autotrader_data_path = './data2plot/cleaned_autotrader_data.csv'
+listings_db_path = './data2plot/listings.db'
+
+def _source_files():
+    """The merged outputs the listings database is built from."""
+    return [autotrader_data_path] + glob(os.path.join(data_folder, 'dealership_summary_*.csv'))
+
+# Indexed listings database the graph callbacks query (see analysis/listing_db.py). The analysis
+# pipeline keeps it up to date itself, writing it after the CSV files, so a database at least as
+# recent as every merged output is used as it is. It is (re)built from the CSV files when it is
+# missing or older than one of them, e.g. after a merge run without the database. The graphs call
+# this on every update, so a new run shows up without restarting the dashboard; a check costs one
+# stat per file.
+def get_listings_db():
+    sources = [path for path in _source_files() if os.path.exists(path)]
+    if os.path.exists(listings_db_path):
+        db_mtime = os.path.getmtime(listings_db_path)
+        if all(os.path.getmtime(path) <= db_mtime for path in sources):
+            return listings_db_path
+        print(f"⚠️ {listings_db_path} is older than the merged data; rebuilding it")
+
+    # Built next to it and renamed, so a callback never queries a half-built database
+    tmp_path = f"{listings_db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    listing_db.build_from_csv(tmp_path, autotrader_data_path, data_folder)
+    os.replace(tmp_path, listings_db_path)
+    return listings_db_path
@@ -1,16 +1,12 @@
 # dealership_plot.py
 import plotly.express as px
-from data_processing import load_dealership_data
-
-# Load the processed dealership data
-df_grouped = load_dealership_data()
+from data_processing import get_listings_db
+import listing_db  # found through the analysis folder data_processing adds to the path
 
 # Function to update dealership graph
 def update_dealership_graph(search_value):
-    if search_value:
-        filtered_df = df_grouped[df_grouped['Dealership'].str.contains(search_value, case=False, na=False)]
-    else:
-        filtered_df = df_grouped
+    # One count per dealership and day, implausible counts dropped
+    filtered_df = listing_db.dealership_counts(get_listings_db(), search_value, max_count=1100)
 
     fig = px.line(filtered_df, x='Date', y='Bike Count', color='Dealership', title="Motorbikes in Dealerships Over Time")
     fig.update_traces(mode='lines+markers')
@@ -1,18 +1,18 @@
 import plotly.express as px
-from data_processing import load_autotrader_data
-
-# Load the Autotrader data
-df_autotrader = load_autotrader_data()
+from data_processing import get_listings_db
+import listing_db  # found through the analysis folder data_processing adds to the path
 
 # Function to update Mileage vs Price graph
 def update_mileage_vs_price(selected_mileage_range):
     min_mileage, max_mileage = selected_mileage_range
-    filtered_df = df_autotrader[(df_autotrader['Mileage'] >= min_mileage) & (df_autotrader['Mileage'] <= max_mileage)]
+    filtered_df = listing_db.query_listings(
+        get_listings_db(), ['Make', 'Model', 'Year', 'Price', 'Mileage'], mileages=(min_mileage, max_mileage)
+    )
 
     # Create a custom hover text
     filtered_df['hover_text'] = (
-        "Make: " + filtered_df['Make'] + "<br>" +
-        "Model: " + filtered_df['Model'] + "<br>" +
+        "Make: " + filtered_df['Make'].astype(str) + "<br>" +
+        "Model: " + filtered_df['Model'].astype(str) + "<br>" +
         "Year: " + filtered_df['Year'].astype(str) + "<br>" +
         "Price: £" + filtered_df['Price'].astype(str) + "<br>" +
         "Mileage: " + filtered_df['Mileage'].astype(str) + " miles"
@@ -1,20 +1,18 @@
 import plotly.express as px
-from data_processing import load_autotrader_data
-
-# Load the Autotrader data
-df_autotrader = load_autotrader_data()
+from data_processing import get_listings_db
+import listing_db  # found through the analysis folder data_processing adds to the path
 
 # Function to update Year vs Price graph
 def update_year_vs_price(selected_year_range):
     min_year, max_year = selected_year_range
-    filtered_df = df_autotrader[
-        (df_autotrader['Year'] >= min_year) & (df_autotrader['Year'] <= max_year)
-    ]
+    filtered_df = listing_db.query_listings(
+        get_listings_db(), ['Make', 'Model', 'Year', 'Price', 'Mileage'], years=(min_year, max_year)
+    )
 
     # Create a custom hover text
     filtered_df['hover_text'] = (
-        "Make: " + filtered_df['Make'] + "<br>" +
-        "Model: " + filtered_df['Model'] + "<br>" +
+        "Make: " + filtered_df['Make'].astype(str) + "<br>" +
+        "Model: " + filtered_df['Model'].astype(str) + "<br>" +
         "Year: " + filtered_df['Year'].astype(str) + "<br>" +
         "Price: £" + filtered_df['Price'].astype(str) + "<br>" +
         "Mileage: " + filtered_df['Mileage'].astype(str) + " miles"  # Example for mileage
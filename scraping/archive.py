@@ -0,0 +1,87 @@
+import os
+import gzip
+import json
+import hashlib
+from glob import glob
+
+class PageArchive:
+    """
+    Compressed, content-addressed store of every fetched results page.
+
+    Pages live under objects/<first 2 hex chars>/<sha256>.html.gz, so a page that comes back
+    byte-for-byte identical is stored once. Each crawl date has an index, index/<date>.jsonl,
+    with one line per fetched page: its hash, partition, page number and URL.
+
+    Safe to use from several crawl processes at once: objects are written to a temporary
+    file and renamed into place, and each index line goes out in a single append.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def object_path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], f"{sha256}.html.gz")
+
+    def index_path(self, date):
+        return os.path.join(self.root, "index", f"{date}.jsonl")
+
+    def store(self, page_source, date, body_type, min_mileage, max_mileage, page_num, url):
+        """Save a page and record it in the date's index. Returns the page hash."""
+        data = page_source.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+
+        path = self.object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as page_file:
+                page_file.write(data)
+            os.replace(tmp_path, path)
+
+        entry = {
+            "sha256": sha256, "body_type": body_type, "min_mileage": min_mileage,
+            "max_mileage": max_mileage, "page": page_num, "url": url,
+        }
+        index_path = self.index_path(date)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(index_path, "a") as index_file:
+            index_file.write(json.dumps(entry) + "\n")
+        return sha256
+
+    def load(self, sha256):
+        with gzip.open(self.object_path(sha256), "rb") as page_file:
+            return page_file.read().decode("utf-8")
+
+    def dates(self):
+        """Every crawl date with an index, oldest first."""
+        paths = glob(os.path.join(self.root, "index", "*.jsonl"))
+        return sorted(os.path.splitext(os.path.basename(path))[0] for path in paths)
+
+    def entries(self, date):
+        """
+        Index entries for a date, in fetch order, without repeats of the same page.
+
+        Pages of a mileage range that also has narrower ranges of the same body type are left
+        out: the crawl planner split that range, so its listings are in the narrower ones.
+        """
+        entries = []
+        seen = set()
+        with open(self.index_path(date)) as index_file:
+            for line in index_file:
+                entry = json.loads(line)
+                key = (entry["body_type"], entry["min_mileage"], entry["max_mileage"], entry["page"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                entries.append(entry)
+
+        ranges = {}
+        for entry in entries:
+            ranges.setdefault(entry["body_type"], set()).add((entry["min_mileage"], entry["max_mileage"]))
+        split = {
+            (body_type, lo, hi)
+            for body_type, body_ranges in ranges.items()
+            for lo, hi in body_ranges
+            if any(lo <= other_lo and other_hi <= hi and (other_lo, other_hi) != (lo, hi) for other_lo, other_hi in body_ranges)
+        }
+        return [entry for entry in entries if (entry["body_type"], entry["min_mileage"], entry["max_mileage"]) not in split]
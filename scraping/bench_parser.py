@@ -0,0 +1,70 @@
+import os
+import gzip
+import time
+import argparse
+from glob import glob
+from listing_parser import PARSERS
+
+def load_corpus(corpus_dir):
+    """Read every saved results page (.html or .html.gz) in a folder."""
+    pages = []
+    for path in sorted(glob(os.path.join(corpus_dir, "**", "*.html*"), recursive=True)):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as page:
+            pages.append(page.read())
+    return pages
+
+def run_parser(parse, pages):
+    listings = 0
+    for page_source in pages:
+        listings += len(parse(page_source, "Benchmark", 0, 0, "1970-01-01"))
+    return listings
+
+def benchmark(pages, repeat=3):
+    """
+    Time every parser backend over the same pages.
+
+    Returns {backend: (listings parsed, best seconds over `repeat` runs)}.
+    """
+    results = {}
+    for name, parse in PARSERS.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            listings = run_parser(parse, pages)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (listings, best)
+    return results
+
+def check_agreement(pages):
+    """Return the pages (by index) where the backends disagree with the BeautifulSoup reference."""
+    reference = PARSERS["bs4"]
+    mismatches = []
+    for i, page_source in enumerate(pages):
+        expected = reference(page_source, "Benchmark", 0, 0, "1970-01-01")
+        for name, parse in PARSERS.items():
+            if parse(page_source, "Benchmark", 0, 0, "1970-01-01") != expected:
+                mismatches.append((i, name))
+    return mismatches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark listing parsers over saved result pages.")
+    parser.add_argument("corpus_dir", help="Folder of saved results pages (.html or .html.gz).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend; the best time is reported.")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir)
+    if not pages:
+        raise SystemExit(f"⚠️ No .html pages found in {args.corpus_dir}")
+    print(f"📚 {len(pages)} pages loaded")
+
+    mismatches = check_agreement(pages)
+    if mismatches:
+        print(f"❌ {len(mismatches)} page/backend pairs differ from the bs4 output: {mismatches[:10]}")
+
+    results = benchmark(pages, args.repeat)
+    baseline = results["bs4"][1]
+    for name, (listings, seconds) in results.items():
+        rate = listings / seconds if seconds else float("inf")
+        print(f"{name:>6}: {listings} listings in {seconds:.3f}s = {rate:,.0f} listings/s ({baseline / seconds:.1f}x bs4)")
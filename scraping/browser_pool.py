@@ -0,0 +1,124 @@
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+from output import log_error
+
+# Requests Chrome should never make: we only read the HTML
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*facebook.net*", "*hotjar.com*", "*tiktok.com*",
+]
+
+def lean_chrome_options(headless=True):
+    """Chrome options for scraping: no images, fonts or extensions, and get() returns at DOMContentLoaded."""
+    chrome_options = Options()
+    chrome_options.add_argument("_tt_enable_cookie=1")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--disable-remote-fonts")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    chrome_options.page_load_strategy = "eager"
+    return chrome_options
+
+def start_driver(headless=True, lean=True):
+    """Launch Chrome, blocking heavy and third-party resources when `lean`."""
+    if not lean:
+        chrome_options = Options()
+        chrome_options.add_argument("_tt_enable_cookie=1")
+        if headless:
+            chrome_options.add_argument("--headless=new")
+        return webdriver.Chrome(options=chrome_options)
+
+    driver = webdriver.Chrome(options=lean_chrome_options(headless))
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+def driver_rss_mb(driver):
+    """Resident memory of chromedriver and every Chrome process under it, in MB."""
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (psutil.Error, AttributeError):
+        return 0.0
+
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+class ManagedDriver:
+    """
+    One Chrome driver that is started lazily and replaced when it gets old, bloated or broken.
+
+    The driver is recycled after `max_pages` pages or once its process tree uses more than
+    `max_rss_mb`. It is health-checked every `check_every` pages, and replaced straight away
+    after a crash (see discard). Each crawl worker owns one, so the crawl's browsers form
+    a pool with one slot per worker.
+    """
+
+    def __init__(self, headless=True, lean=True, max_pages=200, max_rss_mb=1500, check_every=25):
+        self.headless = headless
+        self.lean = lean
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.check_every = check_every
+        self._driver = None
+        self.pages = 0
+        self.restarts = 0
+
+    def driver(self):
+        """Return a driver that is safe to use for the next page."""
+        if self._driver is not None and self.pages and self.pages % self.check_every == 0:
+            if not self.healthy():
+                log_error("Browser failed its health check; replacing it")
+                self.discard()
+            elif self.max_rss_mb and driver_rss_mb(self._driver) > self.max_rss_mb:
+                print(f"♻️ Browser above {self.max_rss_mb} MB after {self.pages} pages; restarting it")
+                self.discard()
+
+        if self._driver is not None and self.max_pages and self.pages >= self.max_pages:
+            print(f"♻️ Browser served {self.pages} pages; restarting it")
+            self.discard()
+
+        if self._driver is None:
+            self._driver = start_driver(self.headless, self.lean)
+            self.pages = 0
+        return self._driver
+
+    def healthy(self):
+        try:
+            return self._driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def page_done(self):
+        self.pages += 1
+
+    def discard(self):
+        """Throw the current driver away; the next driver() call starts a fresh one."""
+        if self._driver is not None:
+            self.quit()
+            self.restarts += 1
+
+    def quit(self):
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except Exception:
+            pass
+        self._driver = None
@@ -1,18 +1,28 @@
 import os
-import csv
+import sys
 import time
+import queue
+import argparse
+import multiprocessing
 import datetime
 from itertools import combinations
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-import random
+from urllib.parse import urlencode, quote
+from fetchers import make_fetcher
+from output import ListingWriter, Checkpoint, log_error
+from listing_parser import parse_listings, parse_result_count
+from planner import DEFAULT_PAGE_SIZE, Partition, SearchPlan, plan_body_type
+from seen_index import SeenIndex, record_crawl_mode
+from archive import PageArchive
+from crawl_metrics import PageMetrics, load, summarize, print_summary
+from rate_limiter import AdaptiveRateLimiter, RateLimiterManager
 
+# The Parquet store is shared with the analysis scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis"))
+import storage
 
 
+BASE_URL = "https://www.autotrader.co.uk/bike-search"
+
 # Search criteria
 criteria = {
     "postcode": "SO19 9QZ",
@@ -37,28 +47,217 @@ mileage_blocks = [
     [1000, 5000],
     [5000, 10000],
     [10000, 20000],
+    [20000, 30000],
     [30000, 40000],
+    [40000, 50000],
     [50000, 60000],
+    [60000, 70000],
     [70000, 80000],
+    [80000, 90000],
     [90000, 250000]
 ]
 
+# How long the parent waits for a worker message before checking that the workers are still alive
+WORKER_POLL_SECONDS = 5
+
 def create_directory(base_dir, subfolder_name):
     """Create a directory if it does not exist."""
     folder_path = os.path.join(base_dir, subfolder_name)
     os.makedirs(folder_path, exist_ok=True)
     return folder_path
 
-def log_error(message):
-    """Log errors to a file."""
-    with open("error_log.txt", "a") as log_file:
-        log_file.write(f"{datetime.datetime.now()} - {message}\n")
-
-def scrape_autotrader(criteria):
-    """Scrape AutoTrader and handle errors gracefully."""
-    chrome_options = Options()
-    chrome_options.add_argument("_tt_enable_cookie=1")
-    driver = webdriver.Chrome(options=chrome_options)
+def build_search_url(criteria, body_type, min_mileage, max_mileage, page_num):
+    """Build the AutoTrader search URL for one results page."""
+    base_url = criteria.get("base_url", BASE_URL)
+    params = {
+        "body-type": body_type,
+        "postcode": criteria["postcode"],
+        "price-from": criteria["price_from"],
+        "price-to": criteria["price_to"],
+        "radius": criteria["radius"],
+        "minimum-mileage": min_mileage,
+        "maximum-mileage": max_mileage,
+        "page": page_num,
+        "sort": "most-recent",
+    }
+    return f"{base_url}?{urlencode(params, quote_via=quote)}"
+
+def scrape_partition(fetcher, criteria, partition, today_date, start_page=1, seen=None, archive=None, metrics=None):
+    """
+    Scrape the results pages of one (body type, mileage range) partition.
+
+    Yields (page_num, rows) for every page that had listings, so callers can write each
+    page out as soon as it is parsed. Requests at most partition.pages pages and stops
+    at the first page without listings. Page 1 rows saved while planning are reused.
+
+    With a SeenIndex, paging also stops after a page whose listings were all seen before:
+    results are sorted most recent first, so everything after it is already known.
+    With a PageArchive, every page that had listings is stored before it is parsed.
+    With PageMetrics, every fetched page's timings and outcome are recorded.
+    """
+    body_type = partition.body_type
+    min_mileage, max_mileage = partition.mileage_range
+    print(f"📌 Searching: {body_type} | Mileage: {min_mileage}-{max_mileage}")
+
+    if start_page == 1 and partition.first_page is not None:
+        if partition.first_page:
+            all_known = seen is not None and seen.all_known(partition.first_page)
+            yield 1, partition.first_page
+            if all_known:
+                print(f"🛑 Page 1 only has listings we have seen before. Moving on...")
+                return
+        start_page = 2
+    last_page = partition.pages
+
+    # The fetcher decides how many pages it can usefully request at once
+    for batch_start in range(start_page, last_page + 1, fetcher.batch_size):
+        page_nums = list(range(batch_start, min(batch_start + fetcher.batch_size, last_page + 1)))
+        urls = [build_search_url(criteria, body_type, min_mileage, max_mileage, page_num) for page_num in page_nums]
+        pages = fetcher.fetch_pages(urls)
+
+        for page_num, url, page_source in zip(page_nums, urls, pages):
+            print(f"📄 Page {page_num}: {url}")
+            timing = fetcher.pop_timing(url)
+
+            def record(status, parse_seconds=0.0, rows=()):
+                if metrics:
+                    metrics.record("page", body_type, min_mileage, max_mileage, page_num, status, timing, parse_seconds, len(rows))
+
+            if isinstance(page_source, Exception):
+                record("error")
+                log_error(f"Error on page {page_num} for {body_type}, {min_mileage}-{max_mileage}: {page_source}")
+                continue
+
+            if page_source is None:
+                record("empty")
+                print(f"❌ No listings on page {page_num}. Moving on...")
+                return
+
+            try:
+                if archive:
+                    archive.store(page_source, today_date, body_type, min_mileage, max_mileage, page_num, url)
+
+                # Parse page
+                parse_start = time.perf_counter()
+                rows = parse_listings(page_source, body_type, min_mileage, max_mileage, today_date, criteria.get("keep_raw", False))
+                parse_seconds = time.perf_counter() - parse_start
+            except Exception as e:
+                record("error")
+                log_error(f"Error on page {page_num} for {body_type}, {min_mileage}-{max_mileage}: {e}")
+                continue
+
+            if not rows:
+                record("empty", parse_seconds)
+                print(f"⚠️ No results found for {body_type} in {min_mileage}-{max_mileage} miles.")
+                return
+
+            # Check before yielding: the caller adds these rows to the index
+            all_known = seen is not None and seen.all_known(rows)
+            record("known" if all_known else "ok", parse_seconds, rows)
+            yield page_num, rows
+            if all_known:
+                print(f"🛑 Page {page_num} only has listings we have seen before. Moving on...")
+                return
+
+def fixed_partitions(body_type):
+    """The body type's fixed mileage blocks, each crawled until a page comes back empty."""
+    return [Partition(body_type, min_mileage, max_mileage) for min_mileage, max_mileage in mileage_blocks]
+
+def plan_partitions(fetcher, criteria, body_type, today_date, previous=None, page_size=DEFAULT_PAGE_SIZE, archive=None, metrics=None):
+    """
+    Plan the body type's searches from the result counts on their first pages.
+
+    Returns (partitions, page size); see planner.plan_body_type. With an archive, the probed
+    first page of every final partition is stored; pages of ranges that were split are not,
+    since the partitions they were split into cover the same listings.
+    """
+    print(f"🧭 Planning searches for: {body_type}")
+    probed = {}
+
+    def probe(min_mileage, max_mileage):
+        url = build_search_url(criteria, body_type, min_mileage, max_mileage, 1)
+        page_source = fetcher.fetch_pages([url])[0]
+        timing = fetcher.pop_timing(url)
+
+        def record(status, parse_seconds=0.0, rows=()):
+            if metrics:
+                metrics.record("probe", body_type, min_mileage, max_mileage, 1, status, timing, parse_seconds, len(rows))
+
+        if isinstance(page_source, Exception):
+            record("error")
+            log_error(f"Planning error for {body_type}, {min_mileage}-{max_mileage}: {page_source}")
+            return None
+        if page_source is None:
+            record("empty")
+            return 0, []
+        probed[(min_mileage, max_mileage)] = (page_source, url)
+
+        parse_start = time.perf_counter()
+        rows = parse_listings(page_source, body_type, min_mileage, max_mileage, today_date, criteria.get("keep_raw", False))
+        count = parse_result_count(page_source) if rows else 0
+        parse_seconds = time.perf_counter() - parse_start
+        if not rows:
+            record("empty", parse_seconds)
+            return 0, []
+        if count is None:
+            # Without a count the range cannot be split and is crawled up to MAX_PAGES only:
+            # most likely the page layout changed and parse_result_count needs updating
+            record("no_count", parse_seconds, rows)
+            print(f"⚠️ No result count on the first page of {body_type} in {min_mileage}-{max_mileage} miles; "
+                  f"it is crawled up to the page limit.")
+            log_error(f"No result count for {body_type}, {min_mileage}-{max_mileage}: {url}")
+            return None, rows
+        record("ok", parse_seconds, rows)
+        return count, rows
+
+    partitions, page_size = plan_body_type(probe, body_type, mileage_blocks, previous, page_size)
+    if archive:
+        for partition in partitions:
+            if partition.mileage_range in probed:
+                page_source, url = probed[partition.mileage_range]
+                archive.store(page_source, today_date, body_type, partition.min_mileage, partition.max_mileage, 1, url)
+    return partitions, page_size
+
+def _saved_partitions(checkpoint, body_type):
+    """Partitions a resumed run already planned for the body type, or None."""
+    ranges = checkpoint.plan_for(body_type) if checkpoint else None
+    if ranges is None:
+        return None
+    return [Partition(body_type, min_mileage, max_mileage, pages, count) for min_mileage, max_mileage, pages, count in ranges]
+
+def _record_plan(checkpoint, search_plan, body_type, partitions, page_size):
+    if page_size is not None:
+        search_plan.update(body_type, partitions, page_size)
+        search_plan.save()
+    if checkpoint:
+        checkpoint.save_plan(body_type, [[p.min_mileage, p.max_mileage, p.pages, p.count] for p in partitions])
+
+def _start_page(checkpoint, partition):
+    """Page to start the partition from, or None if the checkpoint says it is finished."""
+    if not checkpoint:
+        return 1
+    if checkpoint.is_done(partition.body_type, partition.mileage_range):
+        print(f"⏭️ Already scraped: {partition.body_type} | Mileage: {partition.min_mileage}-{partition.max_mileage}")
+        return None
+    return checkpoint.next_page(partition.body_type, partition.mileage_range)
+
+def scrape_autotrader(criteria, fetcher_options=None, writer=None, checkpoint=None, search_plan=None,
+                      seen_index=None, incremental=False, archive=None, metrics=None):
+    """
+    Scrape AutoTrader and handle errors gracefully.
+
+    With a writer, rows are streamed to it page by page and nothing is kept in memory;
+    otherwise they are collected and returned. With a checkpoint, finished partitions
+    are skipped and unfinished ones pick up after their last completed page. With a
+    search plan, mileage ranges are planned from result counts instead of the fixed blocks.
+    Every scraped listing is added to seen_index; with incremental=True, each partition
+    also stops paging once it reaches listings the index already knows. With an archive,
+    every fetched results page is kept for offline re-parsing. With metrics, every fetched
+    page's timings are recorded.
+    """
+    fetcher_options = dict(fetcher_options or {})
+    limiter_options = fetcher_options.pop("limiter_options", {})
+    fetcher = make_fetcher(limiter=AdaptiveRateLimiter(**limiter_options), **fetcher_options)
     data = []
 
     today_date = datetime.datetime.now().strftime("%Y-%m-%d")
@@ -67,110 +266,281 @@ def scrape_autotrader(criteria):
         for body_type in body_types:
             print(f"🔎 Scraping listings for: {body_type}")
 
-            for mileage_range in mileage_blocks:
-                min_mileage, max_mileage = mileage_range
-                print(f"📌 Searching: {body_type} | Mileage: {min_mileage}-{max_mileage}")
-
-                for page_num in range(1, 100):
-                    try:
-                        url = f"https://www.autotrader.co.uk/bike-search?body-type={body_type}&postcode={criteria['postcode']}&price-from={criteria['price_from']}&price-to={criteria['price_to']}&radius={criteria['radius']}&minimum-mileage={min_mileage}&maximum-mileage={max_mileage}&page={page_num}&sort=most-recent"
-
-                        driver.get(url)
-                        print(f"📄 Page {page_num}: {url}")
-
-                        # Wait for elements to load
-                        try:
-                            WebDriverWait(driver, 10).until(
-                                EC.presence_of_all_elements_located((By.XPATH, '//*[@data-testid="advertCard"]'))
-                            )
-                        except:
-                            print(f"❌ No listings on page {page_num}. Moving on...")
-                            break  
-
-                        # Parse page
-                        soup = BeautifulSoup(driver.page_source, "html.parser")
-                        listings = soup.find_all('div', {'data-testid': 'trader-seller-listing'})
-
-                        if not listings:
-                            print(f"⚠️ No results found for {body_type} in {min_mileage}-{max_mileage} miles.")
-                            break  
-
-                        for listing in listings:
-                            details = {
-                                "name": None, "price": None, "year": None, "engine": None,
-                                "seller": None, "mileage": None, "owner": None,
-                                "dealership_name": None, "body_type": body_type,
-                                "min_mileage": min_mileage, "max_mileage": max_mileage,
-                                "date_collected": today_date
-                            }
-
-                            try:
-                                name_tag = listing.find('a', {'data-testid': 'search-listing-title'})
-                                if name_tag:
-                                    details["name"] = name_tag.find('h3').text.strip()
-
-                                price_tag = listing.find('span', class_='at__sc-1mc7cl3-7 icLPGk')
-                                if price_tag:
-                                    details["price"] = price_tag.text.strip()
-
-                                dealership_tag = listing.find('span', {'class': 'at__sc-1n64n0d-9 at__sc-1mc7cl3-15 kLylrw ideECV'})
-                                if dealership_tag:
-                                    details["dealership_name"] = dealership_tag.text.strip()
-
-                                specs = listing.find('ul', {'data-testid': 'search-listing-specs'})
-                                if specs:
-                                    spec_items = specs.find_all('li')
-                                    for spec in spec_items:
-                                        if "reg" in spec.text:
-                                            details["year"] = spec.text.strip()
-                                        elif "cc" in spec.text:
-                                            details["engine"] = spec.text.strip()
-                                        elif "miles" in spec.text.lower():
-                                            details["mileage"] = spec.text.strip()
-                                        elif "owner" in spec.text.lower():
-                                            details["owner"] = spec.text.strip()
-
-                                seller_tag = listing.find('p', {'data-testid': 'search-listing-seller'})
-                                if seller_tag:
-                                    details["seller"] = seller_tag.text.strip()
-
-                            except Exception as e:
-                                log_error(f"Data extraction error: {e}")
-
-                            data.append(details)
-
-                        time.sleep(random.uniform(1, 10))  
-
-                    except Exception as e:
-                        log_error(f"Error on page {page_num} for {body_type}, {min_mileage}-{max_mileage}: {e}")
+            partitions = _saved_partitions(checkpoint, body_type)
+            if partitions is None and search_plan is not None:
+                partitions, page_size = plan_partitions(fetcher, criteria, body_type, today_date, search_plan.previous(body_type), search_plan.page_size, archive, metrics)
+                _record_plan(checkpoint, search_plan, body_type, partitions, page_size)
+            elif partitions is None:
+                partitions = fixed_partitions(body_type)
+
+            for partition in partitions:
+                start_page = _start_page(checkpoint, partition)
+                if start_page is None:
+                    continue
+
+                seen = seen_index if incremental else None
+                for page_num, rows in scrape_partition(fetcher, criteria, partition, today_date, start_page, seen, archive, metrics):
+                    if writer:
+                        writer.write_rows(rows)
+                    else:
+                        data.extend(rows)
+                    if seen_index is not None:
+                        seen_index.add_rows(rows)
+                    if checkpoint:
+                        checkpoint.page_done(body_type, partition.mileage_range, page_num)
+
+                if checkpoint:
+                    checkpoint.partition_done(body_type, partition.mileage_range)
 
     except Exception as e:
         log_error(f"General scraping error: {e}")
 
     finally:
-        driver.quit()
-        return data  
+        fetcher.close()
+    return data
+
+def _crawl_worker(worker_id, criteria, fetcher_options, today_date, work_queue, result_queue, seen=None, archive=None,
+                  metrics=None):
+    """
+    Worker process: take jobs off the queue until the stop sentinel arrives.
+
+    Jobs are ("plan", body_type, previous, page_size) or ("crawl", partition, start_page).
+    Sends back ("plan", body_type, partitions, page_size), ("page", partition, page_num, rows)
+    for every parsed page and ("done", partition) once a partition is finished, so the
+    parent can write and checkpoint as pages arrive, and ("exit", worker_id) when it stops,
+    whatever the reason. `seen` is this worker's read-only copy of the index for incremental crawls.
+    """
+    fetcher = None
+    try:
+        fetcher = make_fetcher(**fetcher_options)
+        while True:
+            job = work_queue.get()
+            if job is None:
+                break
+
+            if job[0] == "plan":
+                _, body_type, previous, page_size = job
+                try:
+                    partitions, page_size = plan_partitions(fetcher, criteria, body_type, today_date, previous, page_size, archive, metrics)
+                except Exception as e:
+                    log_error(f"Planning error for {body_type}: {e}")
+                    partitions, page_size = fixed_partitions(body_type), None
+                result_queue.put(("plan", body_type, partitions, page_size))
+                continue
+
+            _, partition, start_page = job
+            try:
+                for page_num, rows in scrape_partition(fetcher, criteria, partition, today_date, start_page, seen, archive, metrics):
+                    result_queue.put(("page", partition, page_num, rows))
+                result_queue.put(("done", partition))
+            except Exception as e:
+                log_error(f"Worker error for {partition.body_type}, {partition.min_mileage}-{partition.max_mileage}: {e}")
+    except Exception as e:
+        log_error(f"Worker {worker_id} stopped: {e}")
+    finally:
+        if fetcher:
+            fetcher.close()
+        result_queue.put(("exit", worker_id))
+
+def scrape_autotrader_parallel(criteria, workers=4, fetcher_options=None, writer=None, checkpoint=None, search_plan=None,
+                               seen_index=None, incremental=False, archive=None, metrics=None):
+    """
+    Scrape AutoTrader with a pool of worker processes, each with its own fetcher (and browser).
+
+    Planning jobs (one per body type) and partitions are handed out through a shared queue,
+    so a slow body type does not hold up the others. Only this process writes output,
+    checkpoints, the search plan and the seen index. Without a writer, results are returned
+    in the same order as the sequential crawl.
+    """
+    today_date = datetime.datetime.now().strftime("%Y-%m-%d")
+
+    # One rate limiter, living in a manager process, paces the requests of every worker
+    manager = RateLimiterManager()
+    manager.start()
+    fetcher_options = dict(fetcher_options or {})
+    limiter_options = fetcher_options.pop("limiter_options", {})
+    fetcher_options["limiter"] = manager.AdaptiveRateLimiter(**limiter_options)
+
+    work_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+
+    def queue_partitions(partitions):
+        for partition in partitions:
+            start_page = _start_page(checkpoint, partition)
+            if start_page is not None:
+                work_queue.put(("crawl", partition, start_page))
+
+    pending_plans = 0
+    for body_type in body_types:
+        partitions = _saved_partitions(checkpoint, body_type)
+        if partitions is None and search_plan is not None:
+            work_queue.put(("plan", body_type, search_plan.previous(body_type), search_plan.page_size))
+            pending_plans += 1
+        else:
+            queue_partitions(partitions or fixed_partitions(body_type))
+
+    def stop_workers():
+        for _ in range(workers):
+            work_queue.put(None)
+
+    if not pending_plans:
+        stop_workers()
+
+    processes = [
+        multiprocessing.Process(target=_crawl_worker, args=(worker_id, criteria, fetcher_options, today_date, work_queue,
+                                                            result_queue, seen_index if incremental else None, archive, metrics))
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # Drain results before joining, otherwise a full queue can deadlock the workers
+    results = {}
+    exited, suspects = set(), set()
+    while len(exited) < workers:
+        try:
+            message = result_queue.get(timeout=WORKER_POLL_SECONDS)
+        except queue.Empty:
+            # A worker killed outright never says goodbye. Anything it sent before dying is readable
+            # by the next poll, so only give up on it when it is still silent after a second one
+            dead = {worker_id for worker_id, process in enumerate(processes) if not process.is_alive()} - exited
+            lost = dead & suspects
+            suspects = dead - lost
+            if lost:
+                log_error(f"Crawl worker(s) {sorted(lost)} died without finishing; their jobs are lost")
+                print(f"❌ {len(lost)} crawl worker(s) died; the rest of the crawl carries on without them")
+                exited |= lost
+                if pending_plans:
+                    # Plans the dead worker held will never come back: let the others stop after the queued jobs
+                    pending_plans = 0
+                    stop_workers()
+            continue
+
+        if message[0] == "exit":
+            exited.add(message[1])
+            continue
+
+        if message[0] == "plan":
+            _, body_type, partitions, page_size = message
+            _record_plan(checkpoint, search_plan, body_type, partitions, page_size)
+            queue_partitions(partitions)
+            pending_plans -= 1
+            if not pending_plans:
+                stop_workers()
+            continue
+
+        partition = message[1]
+        if message[0] == "done":
+            if checkpoint:
+                checkpoint.partition_done(partition.body_type, partition.mileage_range)
+            print(f"✅ Finished {partition.body_type} | {partition.min_mileage}-{partition.max_mileage}")
+            continue
+
+        _, partition, page_num, rows = message
+        if writer:
+            writer.write_rows(rows)
+        else:
+            key = (body_types.index(partition.body_type), partition.min_mileage, page_num)
+            results[key] = rows
+        if seen_index is not None:
+            seen_index.add_rows(rows)
+        if checkpoint:
+            checkpoint.page_done(partition.body_type, partition.mileage_range, page_num)
+
+    for process in processes:
+        process.join()
+    manager.shutdown()
 
-def create_csv(data):
-    """Save scraped data to a CSV file, even if the script fails midway."""
+    data = []
+    for key in sorted(results):
+        data.extend(results[key])
+    return data
+
+def store_snapshot(filename, storage_root):
+    """Copy a finished snapshot file into the Parquet store, replacing that day's partitions."""
+    storage.write_partitions(storage.read_snapshot_csv(filename), storage_root, storage.RAW)
+    print(f"✅ Snapshot stored in {storage.dataset_path(storage_root, storage.RAW)}")
+
+def create_csv(data, storage_root=None):
+    """Save scraped data to a CSV file, even if the script fails midway (and to the Parquet store if given)."""
     today_date = datetime.datetime.now().strftime("%Y-%m-%d")
     filename = os.path.join("autotrader_raw_data", f"autotrader_data_{today_date}.csv")
 
-    with open(filename, mode='w', newline='') as file:
-        writer = csv.writer(file, delimiter='\t')
-        header = ["Name", "Price", "Year", "Mileage", "Engine", "Owner", "Dealership Name", "Seller", "Body Type", "Min Mileage", "Max Mileage", "Date Collected"]
-        writer.writerow(header)
-
-        for row in data:
-            writer.writerow([
-                row.get("name", ""), row.get("price", ""), row.get("year", ""), row.get("mileage", ""),
-                row.get("engine", ""), row.get("owner", ""), row.get("dealership_name", ""),
-                row.get("seller", ""), row.get("body_type", ""), row.get("min_mileage", ""),
-                row.get("max_mileage", ""), row.get("date_collected", "")
-            ])
+    writer = ListingWriter(filename)
+    writer.write_rows(data)
+    writer.close()
 
     print(f"✅ Data saved to {filename}")
+    if storage_root:
+        store_snapshot(filename, storage_root)
 
 if __name__ == "__main__":
-    scraped_data = scrape_autotrader(criteria)
-    create_csv(scraped_data)
+    parser = argparse.ArgumentParser(description="Scrape AutoTrader bike listings.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of parallel browser processes (1 = sequential crawl).")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium", help="How pages are fetched.")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests per process with the http backend.")
+    parser.add_argument("--fallback", action="store_true", help="With the http backend, re-fetch pages without listings in Chrome.")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome without a window.")
+    parser.add_argument("--full-browser", action="store_true", help="Let Chrome load images, fonts and ads (lean profile is the default).")
+    parser.add_argument("--recycle-pages", type=int, default=200, help="Restart each Chrome after this many pages.")
+    parser.add_argument("--recycle-rss-mb", type=int, default=1500, help="Restart Chrome once its processes use more memory than this.")
+    parser.add_argument("--start-rate", type=float, default=0.5, help="Initial requests/second per host; adapts during the crawl.")
+    parser.add_argument("--max-rate", type=float, default=4.0, help="Upper bound on requests/second per host.")
+    parser.add_argument("--base-url", default=BASE_URL, help="Search endpoint, e.g. a local fixture server.")
+    parser.add_argument("--resume", action="store_true", help="Continue today's crawl from its checkpoint instead of starting over.")
+    parser.add_argument("--incremental", action="store_true", help="Stop paging each search once it reaches listings seen on earlier days.")
+    parser.add_argument("--full-sweep-days", type=int, default=7, help="With --incremental, still do a full crawl when the last one is this many days old.")
+    parser.add_argument("--no-archive", action="store_true", help="Do not keep compressed copies of the fetched pages.")
+    parser.add_argument("--fixed-blocks", action="store_true", help="Search the fixed mileage blocks instead of planning ranges from result counts.")
+    parser.add_argument("--keep-raw", action="store_true", help="Also write the raw price, year, mileage, engine and owner strings.")
+    parser.add_argument("--no-store", action="store_true", help="Do not copy the snapshot into the Parquet store.")
+    parser.add_argument("--storage-root", default=os.path.join("autotrader_raw_data", "store"), help="Parquet store shared with the analysis scripts.")
+    parser.add_argument("--no-metrics", action="store_true", help="Do not record per-page timings or print the run report.")
+    args = parser.parse_args()
+
+    run_criteria = dict(criteria, base_url=args.base_url, keep_raw=args.keep_raw)
+    fetcher_options = {
+        "backend": args.backend,
+        "headless": args.headless or args.workers > 1,
+        "concurrency": args.concurrency,
+        "fallback": args.fallback,
+        "lean": not args.full_browser,
+        "recycle_pages": args.recycle_pages,
+        "recycle_rss_mb": args.recycle_rss_mb,
+        "limiter_options": {"start_rate": args.start_rate, "max_rate": args.max_rate},
+    }
+
+    # Rows are streamed to today's file as they are parsed, with progress checkpointed next to it
+    today_date = datetime.datetime.now().strftime("%Y-%m-%d")
+    output_folder = create_directory(".", "autotrader_raw_data")
+    filename = os.path.join(output_folder, f"autotrader_data_{today_date}.csv")
+    checkpoint = Checkpoint(f"{filename}.checkpoint.json", resume=args.resume)
+    writer = ListingWriter(filename, append=args.resume, keep_raw=args.keep_raw)
+    search_plan = None if args.fixed_blocks else SearchPlan(os.path.join(output_folder, "search_plan.json"))
+    archive = None if args.no_archive else PageArchive(os.path.join(output_folder, "archive"))
+    metrics = None if args.no_metrics else PageMetrics(os.path.join(output_folder, f"crawl_metrics_{today_date}.jsonl"))
+
+    # Every crawl feeds the seen-listings index; full crawls rebuild it so sold bikes drop out
+    seen_index = SeenIndex(os.path.join(output_folder, "seen_listings.bin"))
+    incremental = args.incremental and not seen_index.needs_full_sweep(today_date, args.full_sweep_days)
+    if not incremental and not args.resume:
+        print("🧹 Full sweep: rebuilding the seen-listings index")
+        seen_index.start_full_sweep(today_date)
+    record_crawl_mode(os.path.join(output_folder, "crawl_modes.json"), today_date, not incremental)
+
+    try:
+        if args.workers > 1:
+            scrape_autotrader_parallel(run_criteria, workers=args.workers, fetcher_options=fetcher_options, writer=writer, checkpoint=checkpoint, search_plan=search_plan,
+                                       seen_index=seen_index, incremental=incremental, archive=archive, metrics=metrics)
+        else:
+            scrape_autotrader(run_criteria, fetcher_options=fetcher_options, writer=writer, checkpoint=checkpoint, search_plan=search_plan,
+                              seen_index=seen_index, incremental=incremental, archive=archive, metrics=metrics)
+    finally:
+        writer.close()
+        seen_index.save()
+    print(f"✅ {writer.rows_written} listings saved to {filename}")
+    if not args.no_store:
+        store_snapshot(filename, args.storage_root)
+
+    if metrics and os.path.exists(metrics.path):
+        print_summary(summarize(load(metrics.path)))
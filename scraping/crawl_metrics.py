@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import argparse
+from collections import defaultdict
+
+# Per-page timings, in seconds, recorded for every fetched page
+TIMINGS = ("sleep", "navigation", "wait", "parse")
+
+class PageMetrics:
+    """
+    Append one JSON line per fetched page: where its time went and what it returned.
+
+    Each line carries the partition (body type, mileage range), page number, stage
+    ("probe" while planning, "page" while crawling), status, row count and the sleep,
+    navigation, wait and parse times. Lines are written with a single append, so every
+    crawl worker can share the same file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, stage, body_type, min_mileage, max_mileage, page_num, status, timing=None, parse=0.0, rows=0):
+        timing = timing or {}
+        entry = {
+            "ts": round(time.time(), 3), "pid": os.getpid(), "stage": stage,
+            "body_type": body_type, "min_mileage": min_mileage, "max_mileage": max_mileage,
+            "page": page_num, "status": status, "rows": rows,
+            "sleep": round(timing.get("sleep", 0.0), 4),
+            "navigation": round(timing.get("navigation", 0.0), 4),
+            "wait": round(timing.get("wait", 0.0), 4),
+            "parse": round(parse, 4),
+        }
+        with open(self.path, "a") as metrics_file:
+            metrics_file.write(json.dumps(entry) + "\n")
+
+def load(path):
+    with open(path) as metrics_file:
+        return [json.loads(line) for line in metrics_file if line.strip()]
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def summarize(entries, slowest=10):
+    """
+    Summarise a crawl's page metrics.
+
+    Returns a dict with the page and row totals, pages per minute of wall-clock time,
+    p50/p90/p99 for each timing, pages per status and the `slowest` partitions by total time.
+    """
+    if not entries:
+        return {"pages": 0}
+
+    elapsed = max(e["ts"] for e in entries) - min(e["ts"] for e in entries)
+    totals = [sum(e[key] for key in TIMINGS) for e in entries]
+
+    latency = {}
+    for key, values in [(key, [e[key] for e in entries]) for key in TIMINGS] + [("total", totals)]:
+        latency[key] = {f"p{pct}": percentile(values, pct) for pct in (50, 90, 99)}
+
+    statuses = defaultdict(int)
+    partitions = defaultdict(lambda: {"pages": 0, "rows": 0, "seconds": 0.0})
+    for entry, total in zip(entries, totals):
+        statuses[entry["status"]] += 1
+        partition = partitions[(entry["body_type"], entry["min_mileage"], entry["max_mileage"])]
+        partition["pages"] += 1
+        partition["rows"] += entry["rows"]
+        partition["seconds"] += total
+
+    ranked = sorted(partitions.items(), key=lambda item: item[1]["seconds"], reverse=True)
+    return {
+        "pages": len(entries),
+        "rows": sum(e["rows"] for e in entries),
+        "elapsed_minutes": elapsed / 60,
+        "pages_per_minute": len(entries) / (elapsed / 60) if elapsed else float("inf"),
+        "latency": latency,
+        "statuses": dict(statuses),
+        "slowest_partitions": [(key, stats) for key, stats in ranked[:slowest]],
+    }
+
+def print_summary(summary):
+    if not summary["pages"]:
+        print("⚠️ No pages recorded.")
+        return
+
+    print(f"📄 {summary['pages']} pages, {summary['rows']} listings in {summary['elapsed_minutes']:.1f} min "
+          f"({summary['pages_per_minute']:.1f} pages/min)")
+    print(f"📊 Pages by status: {summary['statuses']}")
+    print()
+    print(f"{'seconds':>10} {'p50':>8} {'p90':>8} {'p99':>8}")
+    for key, stats in summary["latency"].items():
+        print(f"{key:>10} {stats['p50']:>8.2f} {stats['p90']:>8.2f} {stats['p99']:>8.2f}")
+    print()
+    print("🐢 Slowest partitions:")
+    for (body_type, min_mileage, max_mileage), stats in summary["slowest_partitions"]:
+        print(f"   {body_type} | {min_mileage}-{max_mileage}: {stats['seconds']:.1f}s over {stats['pages']} pages, {stats['rows']} listings")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise a crawl's per-page metrics.")
+    parser.add_argument("metrics_file", help="crawl_metrics_<date>.jsonl written by collect_all.py")
+    parser.add_argument("--slowest", type=int, default=10, help="How many of the slowest partitions to list.")
+    args = parser.parse_args()
+
+    print_summary(summarize(load(args.metrics_file), args.slowest))
@@ -0,0 +1,225 @@
+import time
+import asyncio
+import aiohttp
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from rate_limiter import AdaptiveRateLimiter, host_of, wait_for_slot
+from browser_pool import ManagedDriver
+
+# Marker present on every results page that has listings
+LISTING_MARKER = 'data-testid="advertCard"'
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-GB,en;q=0.9",
+}
+
+class Fetcher:
+    """
+    Common interface for page fetchers.
+
+    fetch_pages takes a list of URLs and returns one result per URL, in order:
+    the page HTML, None if the page never showed any listings, or the exception raised.
+    batch_size is how many pages a caller should hand over at once.
+    Every request is paced by the fetcher's rate limiter.
+
+    After a fetch, pop_timing(url) returns where that page's time went, in seconds:
+    "sleep" (rate limiter), "navigation" (request or page load) and "wait" (for listings
+    to appear, or the response body to arrive).
+    """
+    batch_size = 1
+    limiter = None
+
+    def fetch_pages(self, urls):
+        raise NotImplementedError
+
+    def pop_timing(self, url):
+        return self.timings.pop(url, {})
+
+    def close(self):
+        pass
+
+class SeleniumFetcher(Fetcher):
+    """
+    Render pages in Chrome, one at a time.
+
+    The browser is a ManagedDriver: lean profile, recycled after `recycle_pages` pages or
+    `recycle_rss_mb` of memory, and replaced (with one retry of the page) if it crashes.
+    """
+
+    def __init__(self, headless=False, wait_seconds=10, limiter=None, lean=True, recycle_pages=200, recycle_rss_mb=1500):
+        self.browser = ManagedDriver(headless=headless, lean=lean, max_pages=recycle_pages, max_rss_mb=recycle_rss_mb)
+        self.wait_seconds = wait_seconds
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter()
+        self.timings = {}
+
+    def fetch(self, url, retry=True):
+        timing = self.timings.setdefault(url, {"sleep": 0.0, "navigation": 0.0, "wait": 0.0})
+        timing["sleep"] += wait_for_slot(self.limiter, url)
+        start = time.monotonic()
+        try:
+            driver = self.browser.driver()
+            driver.get(url)
+        except WebDriverException:
+            timing["navigation"] += time.monotonic() - start
+            self.limiter.record(host_of(url), time.monotonic() - start, "error")
+            # Most likely a dead browser: start a new one and give the page one more go
+            self.browser.discard()
+            if retry:
+                return self.fetch(url, retry=False)
+            raise
+        self.browser.page_done()
+        loaded = time.monotonic()
+        timing["navigation"] += loaded - start
+
+        # Wait for elements to load
+        try:
+            WebDriverWait(driver, self.wait_seconds).until(
+                EC.presence_of_all_elements_located((By.XPATH, '//*[@data-testid="advertCard"]'))
+            )
+        except Exception:
+            timing["wait"] += time.monotonic() - loaded
+            self.limiter.record(host_of(url), time.monotonic() - start, "empty")
+            return None
+
+        timing["wait"] += time.monotonic() - loaded
+        self.limiter.record(host_of(url), time.monotonic() - start, "ok")
+        return driver.page_source
+
+    def fetch_pages(self, urls):
+        results = []
+        for url in urls:
+            try:
+                results.append(self.fetch(url))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self.browser.quit()
+
+class HttpFetcher(Fetcher):
+    """
+    Fetch raw HTML over plain HTTP with asyncio.
+
+    One keep-alive connection pool is reused for the fetcher's lifetime and at most
+    `concurrency` requests are in flight at once. Pages are not rendered, so anything
+    that only appears after JavaScript runs will be missing (see FallbackFetcher).
+    """
+
+    def __init__(self, concurrency=8, timeout=30, headers=None, limiter=None):
+        self.batch_size = concurrency
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter()
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = headers or HTTP_HEADERS
+        self.timings = {}
+        self._loop = asyncio.new_event_loop()
+        self._session = self._loop.run_until_complete(self._open_session())
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def _fetch(self, semaphore, url):
+        host = host_of(url)
+        timing = self.timings[url] = {"sleep": 0.0, "navigation": 0.0, "wait": 0.0}
+        async with semaphore:
+            delay = self.limiter.reserve(host)
+            if delay > 0:
+                timing["sleep"] = delay
+                await asyncio.sleep(delay)
+
+            start = time.monotonic()
+            headers_at = None
+            try:
+                async with self._session.get(url) as response:
+                    headers_at = time.monotonic()
+                    response.raise_for_status()
+                    html = await response.text()
+            except Exception:
+                timing["navigation"] = (headers_at or time.monotonic()) - start
+                if headers_at:
+                    timing["wait"] = time.monotonic() - headers_at
+                self.limiter.record(host, time.monotonic() - start, "error")
+                raise
+
+            timing["navigation"] = headers_at - start
+            timing["wait"] = time.monotonic() - headers_at
+
+            if LISTING_MARKER not in html:
+                self.limiter.record(host, time.monotonic() - start, "empty")
+                return None
+            self.limiter.record(host, time.monotonic() - start, "ok")
+            return html
+
+    async def _fetch_all(self, urls):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._fetch(semaphore, url) for url in urls), return_exceptions=True)
+
+    def fetch_pages(self, urls):
+        return self._loop.run_until_complete(self._fetch_all(urls))
+
+    def close(self):
+        self._loop.run_until_complete(self._session.close())
+        self._loop.close()
+
+class FallbackFetcher(Fetcher):
+    """Use a fast primary fetcher and re-fetch pages it could not get listings from with a fallback."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.batch_size = primary.batch_size
+
+    def fetch_pages(self, urls):
+        results = self.primary.fetch_pages(urls)
+        retry = [i for i, html in enumerate(results) if not isinstance(html, str)]
+        if retry:
+            retried = self.fallback.fetch_pages([urls[i] for i in retry])
+            for i, html in zip(retry, retried):
+                results[i] = html
+        return results
+
+    def pop_timing(self, url):
+        timing = self.primary.pop_timing(url)
+        for key, seconds in self.fallback.pop_timing(url).items():
+            timing[key] = timing.get(key, 0.0) + seconds
+        return timing
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+def make_fetcher(backend="selenium", headless=False, concurrency=8, fallback=False, limiter=None,
+                 lean=True, recycle_pages=200, recycle_rss_mb=1500):
+    """
+    Build a fetcher by name.
+
+    :param backend: "selenium" (render in Chrome) or "http" (plain asyncio HTTP).
+    :param headless: Run Chrome without a window.
+    :param concurrency: Maximum in-flight requests for the HTTP backend.
+    :param fallback: With the HTTP backend, re-fetch pages without listings in Chrome.
+    :param limiter: Rate limiter shared by every request (a new one is made if omitted).
+    :param lean: Block images, fonts and ad/tracking requests in Chrome.
+    :param recycle_pages: Restart Chrome after this many pages.
+    :param recycle_rss_mb: Restart Chrome once it uses more memory than this.
+    """
+    browser_options = {"headless": headless, "lean": lean, "recycle_pages": recycle_pages, "recycle_rss_mb": recycle_rss_mb}
+    if limiter is None:
+        limiter = AdaptiveRateLimiter()
+    if backend == "selenium":
+        return SeleniumFetcher(limiter=limiter, **browser_options)
+    if backend == "http":
+        fetcher = HttpFetcher(concurrency=concurrency, limiter=limiter)
+        if fallback:
+            return FallbackFetcher(fetcher, SeleniumFetcher(limiter=limiter, **browser_options))
+        return fetcher
+    raise ValueError(f"Unknown fetch backend: {backend}")
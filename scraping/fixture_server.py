@@ -0,0 +1,58 @@
+import os
+import re
+import argparse
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Served for any partition/page without a saved file, so crawls stop paging like on the live site
+EMPTY_PAGE = "<html><body><p>No results</p></body></html>"
+
+def fixture_name(body_type, min_mileage, max_mileage, page_num):
+    """File name a saved results page is stored under, e.g. Adventure_0_1000_1.html."""
+    safe_body_type = re.sub(r'[^A-Za-z0-9]+', '-', body_type).strip('-')
+    return f"{safe_body_type}_{min_mileage}_{max_mileage}_{page_num}.html"
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Answer bike-search requests with saved result pages from a folder."""
+
+    def __init__(self, *args, fixture_dir=".", **kwargs):
+        self.fixture_dir = fixture_dir
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        first = lambda key, default="": query.get(key, [default])[0]
+
+        name = fixture_name(first("body-type"), first("minimum-mileage"), first("maximum-mileage"), first("page", "1"))
+        path = os.path.join(self.fixture_dir, name)
+
+        if os.path.exists(path):
+            with open(path, "rb") as page:
+                body = page.read()
+        else:
+            body = EMPTY_PAGE.encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(fixture_dir, host="127.0.0.1", port=0):
+    """Create (but do not start) a fixture server; port 0 picks a free port."""
+    handler = partial(FixtureHandler, fixture_dir=fixture_dir)
+    return ThreadingHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved AutoTrader result pages for local crawls.")
+    parser.add_argument("fixture_dir", help="Folder of saved pages named <body-type>_<min>_<max>_<page>.html")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = make_server(args.fixture_dir, port=args.port)
+    print(f"🧪 Serving fixtures from {args.fixture_dir} at http://127.0.0.1:{args.port}/bike-search")
+    server.serve_forever()
@@ -0,0 +1,153 @@
+import re
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from output import log_error
+from listing_record import Listing
+
+# Hashed class names AutoTrader currently renders for the price and dealership spans
+PRICE_CLASS = "at__sc-1mc7cl3-7 icLPGk"
+DEALERSHIP_CLASS = "at__sc-1n64n0d-9 at__sc-1mc7cl3-15 kLylrw ideECV"
+
+# Selectors for the lxml backend, compiled once at import
+_LISTINGS = etree.XPath('//div[@data-testid="trader-seller-listing"]')
+_NAME = etree.XPath('(.//a[@data-testid="search-listing-title"])[1]//h3')
+_PRICE = etree.XPath(f'(.//span[@class="{PRICE_CLASS}"])[1]')
+_DEALERSHIP = etree.XPath(f'(.//span[@class="{DEALERSHIP_CLASS}"])[1]')
+_SPECS = etree.XPath('(.//ul[@data-testid="search-listing-specs"])[1]//li')
+_SELLER = etree.XPath('(.//p[@data-testid="search-listing-seller"])[1]')
+_RESULT_COUNT = etree.XPath('(//*[contains(@data-testid, "result-count")])[1]')
+
+# "1,204 bikes found" / "1 result"
+_COUNT_PATTERN = re.compile(r'(\d[\d,]*)\s+(?:bikes?|results?)\b', re.IGNORECASE)
+
+def empty_listing(body_type, min_mileage, max_mileage, today_date):
+    return {
+        "name": None, "price": None, "year": None, "engine": None,
+        "seller": None, "mileage": None, "owner": None,
+        "dealership_name": None, "body_type": body_type,
+        "min_mileage": min_mileage, "max_mileage": max_mileage,
+        "date_collected": today_date
+    }
+
+def classify_spec(text):
+    """Return the listing field a spec bullet belongs to, or None."""
+    if "reg" in text:
+        return "year"
+    if "cc" in text:
+        return "engine"
+    lowered = text.lower()
+    if "miles" in lowered:
+        return "mileage"
+    if "owner" in lowered:
+        return "owner"
+    return None
+
+def parse_listings_bs4(page_source, body_type, min_mileage, max_mileage, today_date):
+    """Extract the listing dicts from one results page with BeautifulSoup (reference implementation)."""
+    soup = BeautifulSoup(page_source, "html.parser")
+    listings = soup.find_all('div', {'data-testid': 'trader-seller-listing'})
+
+    rows = []
+    for listing in listings:
+        details = empty_listing(body_type, min_mileage, max_mileage, today_date)
+
+        try:
+            name_tag = listing.find('a', {'data-testid': 'search-listing-title'})
+            if name_tag:
+                details["name"] = name_tag.find('h3').text.strip()
+
+            price_tag = listing.find('span', class_=PRICE_CLASS)
+            if price_tag:
+                details["price"] = price_tag.text.strip()
+
+            dealership_tag = listing.find('span', {'class': DEALERSHIP_CLASS})
+            if dealership_tag:
+                details["dealership_name"] = dealership_tag.text.strip()
+
+            specs = listing.find('ul', {'data-testid': 'search-listing-specs'})
+            if specs:
+                spec_items = specs.find_all('li')
+                for spec in spec_items:
+                    text = spec.text
+                    field = classify_spec(text)
+                    if field:
+                        details[field] = text.strip()
+
+            seller_tag = listing.find('p', {'data-testid': 'search-listing-seller'})
+            if seller_tag:
+                details["seller"] = seller_tag.text.strip()
+
+        except Exception as e:
+            log_error(f"Data extraction error: {e}")
+
+        rows.append(details)
+
+    return rows
+
+def parse_listings_lxml(page_source, body_type, min_mileage, max_mileage, today_date):
+    """
+    Extract the listing dicts from one results page with lxml.
+
+    The page is parsed by libxml2 and every field is read with a precompiled XPath
+    evaluated inside each listing card only, so the rest of the page is never walked
+    from Python. Produces the same rows as parse_listings_bs4.
+    """
+    if not page_source:
+        return []
+    document = lxml_html.fromstring(page_source)
+
+    rows = []
+    for listing in _LISTINGS(document):
+        details = empty_listing(body_type, min_mileage, max_mileage, today_date)
+
+        try:
+            name_tag = _NAME(listing)
+            if name_tag:
+                details["name"] = name_tag[0].text_content().strip()
+
+            price_tag = _PRICE(listing)
+            if price_tag:
+                details["price"] = price_tag[0].text_content().strip()
+
+            dealership_tag = _DEALERSHIP(listing)
+            if dealership_tag:
+                details["dealership_name"] = dealership_tag[0].text_content().strip()
+
+            for spec in _SPECS(listing):
+                text = spec.text_content()
+                field = classify_spec(text)
+                if field:
+                    details[field] = text.strip()
+
+            seller_tag = _SELLER(listing)
+            if seller_tag:
+                details["seller"] = seller_tag[0].text_content().strip()
+
+        except Exception as e:
+            log_error(f"Data extraction error: {e}")
+
+        rows.append(details)
+
+    return rows
+
+def parse_result_count(page_source):
+    """Total number of results the search reports on a results page, or None if it is not shown."""
+    if not page_source:
+        return None
+    document = lxml_html.fromstring(page_source)
+
+    # Only trust the dedicated counter: listing cards also say things like "See all 32 bikes"
+    counter = _RESULT_COUNT(document)
+    match = _COUNT_PATTERN.search(counter[0].text_content()) if counter else None
+    if not match:
+        return None
+    return int(match.group(1).replace(",", ""))
+
+PARSERS = {
+    "bs4": parse_listings_bs4,
+    "lxml": parse_listings_lxml,
+}
+
+def parse_listings(page_source, body_type, min_mileage, max_mileage, today_date, keep_raw=False, parser=parse_listings_lxml):
+    """Parse a results page straight into typed Listing records; this is what the crawler stores."""
+    return [Listing.from_details(details, keep_raw) for details in parser(page_source, body_type, min_mileage, max_mileage, today_date)]
@@ -0,0 +1,89 @@
+import re
+
+# Patterns for the raw spec strings, compiled once at import
+_PRICE = re.compile(r'(\d[\d,]*)')                                  # "£8,183"
+_YEAR = re.compile(r'((?:19|20)\d{2})(?:\s*\(\s*(\w+)\s+reg\))?')   # "2017 (67 reg)"
+_MILEAGE = re.compile(r'(\d[\d,]*)\s*miles', re.IGNORECASE)         # "4,932 miles"
+_ENGINE = re.compile(r'(\d[\d,]*)\s*cc', re.IGNORECASE)             # "1301cc"
+_OWNER = re.compile(r'(\d+)')                                       # "2 owners"
+
+# Columns of a typed snapshot file; only typed files have values in "Plate", which is how merge tells them apart
+HEADER = ["Name", "Price", "Year", "Plate", "Mileage", "Engine", "Owner", "Dealership Name", "Seller", "Body Type", "Min Mileage", "Max Mileage", "Date Collected"]
+
+# Optional columns holding the strings the numbers were parsed from
+RAW_HEADER = ["Raw Price", "Raw Year", "Raw Mileage", "Raw Engine", "Raw Owner"]
+
+def _integer(pattern, text):
+    """First number the pattern finds in text, as an int (None if there is none)."""
+    if not text:
+        return None
+    match = pattern.search(text)
+    if not match:
+        return None
+    return int(match.group(1).replace(",", ""))
+
+class Listing:
+    """
+    One scraped listing with its numbers already parsed.
+
+    Price, year, mileage, engine size (cc) and owner count are ints (None when the card
+    does not show them) and plate is the registration identifier from the year, e.g. "67".
+    The strings they were parsed from are kept in `raw` only when asked for.
+    """
+
+    __slots__ = ("name", "price", "year", "plate", "mileage", "engine_cc", "owners", "dealership_name",
+                 "seller", "body_type", "min_mileage", "max_mileage", "date_collected", "raw")
+
+    def __init__(self, name, price, year, plate, mileage, engine_cc, owners, dealership_name,
+                 seller, body_type, min_mileage, max_mileage, date_collected, raw=None):
+        self.name = name
+        self.price = price
+        self.year = year
+        self.plate = plate
+        self.mileage = mileage
+        self.engine_cc = engine_cc
+        self.owners = owners
+        self.dealership_name = dealership_name
+        self.seller = seller
+        self.body_type = body_type
+        self.min_mileage = min_mileage
+        self.max_mileage = max_mileage
+        self.date_collected = date_collected
+        self.raw = raw
+
+    @classmethod
+    def from_details(cls, details, keep_raw=False):
+        """Build a record from a parser's dict of raw strings."""
+        year_match = _YEAR.search(details["year"]) if details.get("year") else None
+        raw = None
+        if keep_raw:
+            raw = (details.get("price"), details.get("year"), details.get("mileage"), details.get("engine"), details.get("owner"))
+        return cls(
+            details.get("name"),
+            _integer(_PRICE, details.get("price")),
+            int(year_match.group(1)) if year_match else None,
+            year_match.group(2) if year_match else None,
+            _integer(_MILEAGE, details.get("mileage")),
+            _integer(_ENGINE, details.get("engine")),
+            _integer(_OWNER, details.get("owner")),
+            details.get("dealership_name"),
+            details.get("seller"),
+            details.get("body_type"),
+            details.get("min_mileage"),
+            details.get("max_mileage"),
+            details.get("date_collected"),
+            raw,
+        )
+
+    def as_row(self, keep_raw=False):
+        """CSV row in HEADER order, followed by the RAW_HEADER columns when keep_raw."""
+        row = [
+            self.name, self.price, self.year, self.plate, self.mileage, self.engine_cc, self.owners,
+            self.dealership_name, self.seller, self.body_type, self.min_mileage, self.max_mileage, self.date_collected,
+        ]
+        if keep_raw:
+            row.extend(self.raw or (None,) * len(RAW_HEADER))
+        return row
+
+    def __repr__(self):
+        return f"Listing({self.name!r}, price={self.price}, year={self.year}, mileage={self.mileage})"
@@ -0,0 +1,95 @@
+import os
+import csv
+import json
+import datetime
+from listing_record import HEADER, RAW_HEADER
+
+def log_error(message):
+    """Log errors to a file."""
+    with open("error_log.txt", "a") as log_file:
+        log_file.write(f"{datetime.datetime.now()} - {message}\n")
+
+class ListingWriter:
+    """
+    Append listings to a tab-separated CSV as they are scraped.
+
+    Every batch is flushed straight away, so a crash loses at most the page being parsed.
+    Rows are Listing records, written as typed columns; with keep_raw, the strings their
+    numbers were parsed from are written too (the records must have been built with keep_raw).
+    """
+
+    def __init__(self, filename, append=False, keep_raw=False):
+        self.filename = filename
+        self.keep_raw = keep_raw
+        write_header = not (append and os.path.exists(filename) and os.path.getsize(filename) > 0)
+        self.file = open(filename, mode='a' if append else 'w', newline='')
+        self.writer = csv.writer(self.file, delimiter='\t')
+        self.rows_written = 0
+        if write_header:
+            self.writer.writerow(HEADER + RAW_HEADER if keep_raw else HEADER)
+            self.file.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.writer.writerow(row.as_row(self.keep_raw))
+        self.file.flush()
+        self.rows_written += len(rows)
+
+    def close(self):
+        self.file.close()
+
+class Checkpoint:
+    """
+    Record crawl progress per (body type, mileage block) partition in a JSON file.
+
+    Each partition stores the last page whose rows reached the output file and whether
+    the partition is finished. Rows are written before the checkpoint is saved, so a crash
+    in between can only repeat a page on resume (duplicates are dropped downstream), never skip one.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.partitions = {}
+        self.plans = {}
+        if resume and os.path.exists(path):
+            with open(path) as checkpoint_file:
+                saved = json.load(checkpoint_file)
+            self.partitions = saved.get("partitions", {})
+            self.plans = saved.get("plans", {})
+
+    @staticmethod
+    def key(body_type, mileage_range):
+        min_mileage, max_mileage = mileage_range
+        return f"{body_type}|{min_mileage}|{max_mileage}"
+
+    def is_done(self, body_type, mileage_range):
+        return self.partitions.get(self.key(body_type, mileage_range), {}).get("done", False)
+
+    def next_page(self, body_type, mileage_range):
+        """First page that still needs fetching for this partition."""
+        return self.partitions.get(self.key(body_type, mileage_range), {}).get("page", 0) + 1
+
+    def page_done(self, body_type, mileage_range, page_num):
+        self.partitions[self.key(body_type, mileage_range)] = {"page": page_num, "done": False}
+        self.save()
+
+    def partition_done(self, body_type, mileage_range):
+        state = self.partitions.setdefault(self.key(body_type, mileage_range), {"page": 0})
+        state["done"] = True
+        self.save()
+
+    def plan_for(self, body_type):
+        """[min, max, pages, count] ranges this run planned for the body type, or None."""
+        return self.plans.get(body_type)
+
+    def save_plan(self, body_type, ranges):
+        """Keep the run's plan so a resumed crawl searches exactly the same ranges."""
+        self.plans[body_type] = ranges
+        self.save()
+
+    def save(self):
+        # Write to a temporary file and swap it in, so the checkpoint is never half-written
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as checkpoint_file:
+            json.dump({"partitions": self.partitions, "plans": self.plans}, checkpoint_file, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,121 @@
+import os
+import json
+import math
+from collections import namedtuple
+
+# AutoTrader stops serving results after this many pages
+MAX_PAGES = 99
+
+# Listings per results page, until a full first page tells us otherwise
+DEFAULT_PAGE_SIZE = 10
+
+# Merge sparse neighbours only up to this share of what paging can reach, leaving room for growth
+MERGE_FILL = 0.8
+
+class Partition(namedtuple("Partition", ["body_type", "min_mileage", "max_mileage", "pages", "count", "first_page"],
+                           defaults=(MAX_PAGES, None, None))):
+    """
+    One search to crawl: a body type over a mileage range.
+
+    pages is how many results pages to request, count the total the site reported
+    (None if unknown) and first_page the rows already parsed from page 1 while planning.
+    """
+    __slots__ = ()
+
+    @property
+    def mileage_range(self):
+        return (self.min_mileage, self.max_mileage)
+
+def pages_for(count, page_size, max_pages=MAX_PAGES):
+    """Exact number of pages needed to see `count` results."""
+    return min(max_pages, math.ceil(count / page_size))
+
+def merge_sparse(ranges, capacity):
+    """
+    Join neighbouring (min, max, count) ranges while their combined count fits in `capacity`.
+
+    Ranges without a count are never merged.
+    """
+    merged = []
+    for lo, hi, count in ranges:
+        if merged:
+            prev_lo, prev_hi, prev_count = merged[-1]
+            if prev_count is not None and count is not None and prev_hi == lo and prev_count + count <= capacity:
+                merged[-1] = (prev_lo, hi, prev_count + count)
+                continue
+        merged.append((lo, hi, count))
+    return merged
+
+def plan_body_type(probe, body_type, blocks, previous=None, page_size=DEFAULT_PAGE_SIZE, max_pages=MAX_PAGES):
+    """
+    Work out which mileage ranges to search for one body type, and how many pages each needs.
+
+    :param probe: Callable (min_mileage, max_mileage) -> (count, rows) for page 1 of a range,
+                  or None if the page could not be fetched.
+    :param blocks: Contiguous [min, max] mileage blocks to start from.
+    :param previous: (min, max, count) ranges from the last plan. Sparse neighbours are merged
+                     before probing, so fewer first pages are requested.
+    :returns: (partitions in mileage order, page size seen).
+
+    Any range whose count is more than paging can reach is split in half and probed again.
+    Page 1 of every final range is kept on the partition, so it is never fetched twice.
+    """
+    if previous:
+        ranges = merge_sparse(previous, max_pages * page_size * MERGE_FILL)
+    else:
+        ranges = [(lo, hi, None) for lo, hi in blocks]
+
+    partitions = []
+    pending = [(lo, hi) for lo, hi, _ in reversed(ranges)]
+    while pending:
+        lo, hi = pending.pop()
+        result = probe(lo, hi)
+        if result is None:
+            # Unknown size: crawl it the old way, until a page comes back empty
+            partitions.append(Partition(body_type, lo, hi))
+            continue
+
+        count, rows = result
+        if count is not None and count > len(rows) and rows:
+            page_size = len(rows)
+
+        if count is None:
+            partitions.append(Partition(body_type, lo, hi, max_pages, None, rows))
+        elif count > max_pages * page_size and hi - lo > 1:
+            mid = (lo + hi) // 2
+            pending.append((mid, hi))
+            pending.append((lo, mid))
+        else:
+            partitions.append(Partition(body_type, lo, hi, pages_for(count, page_size, max_pages), count, rows))
+
+    return partitions, page_size
+
+class SearchPlan:
+    """
+    Last crawl's per-body-type ranges and counts, kept in a JSON file between runs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.body_types = {}
+        if os.path.exists(path):
+            with open(path) as plan_file:
+                saved = json.load(plan_file)
+            self.page_size = saved.get("page_size", DEFAULT_PAGE_SIZE)
+            self.body_types = saved.get("body_types", {})
+
+    def previous(self, body_type):
+        """(min, max, count) ranges planned for this body type last time, or None."""
+        ranges = self.body_types.get(body_type)
+        return [tuple(r) for r in ranges] if ranges else None
+
+    def update(self, body_type, partitions, page_size):
+        self.body_types[body_type] = [[p.min_mileage, p.max_mileage, p.count] for p in partitions]
+        self.page_size = page_size
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as plan_file:
+            json.dump({"page_size": self.page_size, "body_types": self.body_types}, plan_file, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,111 @@
+import time
+import threading
+from urllib.parse import urlparse
+from multiprocessing.managers import BaseManager
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket per host whose refill rate adapts to how the site is responding (AIMD).
+
+    Every request takes a token. Fast, successful responses add `increase` requests/second
+    to the host's rate. Errors multiply it by `error_backoff`, and slow responses (above both
+    `slow_factor` times the running average latency and `slow_floor` seconds) by `slow_backoff`.
+    Pages without listings never speed the crawl up. Some are expected at the end of every
+    partition, but a run of `empty_streak` in a row looks like soft blocking and backs off too.
+    The rate always stays between `min_rate` and `max_rate`.
+
+    Call reserve() before a request and sleep for the delay it returns, then report the
+    outcome with record(). Both are thread-safe; to share one limiter between worker
+    processes, create it through RateLimiterManager.
+    """
+
+    def __init__(self, start_rate=0.5, min_rate=0.1, max_rate=4.0, burst=1,
+                 increase=0.05, error_backoff=0.5, slow_backoff=0.8, slow_factor=2.0, slow_floor=1.0, empty_streak=25):
+        self.start_rate = start_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.error_backoff = error_backoff
+        self.slow_backoff = slow_backoff
+        self.slow_factor = slow_factor
+        self.slow_floor = slow_floor
+        self.empty_streak = empty_streak
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _state(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {
+                "rate": self.start_rate,
+                "tokens": float(self.burst),
+                "updated": time.monotonic(),
+                "latency": None,
+                "requests": 0,
+                "empty_streak": 0,
+                "errors": 0,
+            }
+        return self.hosts[host]
+
+    def reserve(self, host):
+        """Take a token for `host` and return how many seconds to wait before using it."""
+        with self.lock:
+            state = self._state(host)
+            now = time.monotonic()
+            state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * state["rate"])
+            state["updated"] = now
+            state["requests"] += 1
+
+            # Tokens may go negative: each caller queues behind the ones already waiting
+            state["tokens"] -= 1
+            if state["tokens"] >= 0:
+                return 0.0
+            return -state["tokens"] / state["rate"]
+
+    def record(self, host, latency, outcome="ok"):
+        """
+        Adjust the host's rate after a request.
+
+        :param latency: Seconds the request took.
+        :param outcome: "ok", "empty" (page without listings) or "error".
+        """
+        with self.lock:
+            state = self._state(host)
+            average = state["latency"]
+            state["latency"] = latency if average is None else 0.8 * average + 0.2 * latency
+
+            if outcome == "empty":
+                state["empty_streak"] += 1
+                if state["empty_streak"] >= self.empty_streak:
+                    state["empty_streak"] = 0
+                    state["rate"] *= self.slow_backoff
+            else:
+                state["empty_streak"] = 0
+                if outcome == "error":
+                    state["errors"] += 1
+                    state["rate"] *= self.error_backoff
+                elif average is not None and latency > max(self.slow_floor, self.slow_factor * average):
+                    state["rate"] *= self.slow_backoff
+                else:
+                    state["rate"] += self.increase
+            state["rate"] = min(self.max_rate, max(self.min_rate, state["rate"]))
+
+    def snapshot(self):
+        """Current per-host rate and counters, for progress reports."""
+        with self.lock:
+            return {host: dict(state) for host, state in self.hosts.items()}
+
+class RateLimiterManager(BaseManager):
+    """Manager process that hosts one AdaptiveRateLimiter shared by every crawl worker."""
+
+RateLimiterManager.register("AdaptiveRateLimiter", AdaptiveRateLimiter)
+
+def host_of(url):
+    return urlparse(url).netloc
+
+def wait_for_slot(limiter, url):
+    """Block until the limiter lets a request to `url` go out. Returns the seconds slept."""
+    delay = limiter.reserve(host_of(url))
+    if delay > 0:
+        time.sleep(delay)
+    return max(delay, 0.0)
@@ -0,0 +1,55 @@
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from archive import PageArchive
+from listing_parser import PARSERS, parse_listings
+from output import ListingWriter, log_error
+
+def _parse_entry(job):
+    """Load one archived page and extract its listings (runs in a worker process)."""
+    root, date, entry, parser_name, keep_raw = job
+    try:
+        page_source = PageArchive(root).load(entry["sha256"])
+        return parse_listings(page_source, entry["body_type"], entry["min_mileage"], entry["max_mileage"], date,
+                              keep_raw, PARSERS[parser_name])
+    except Exception as e:
+        log_error(f"Reparse error for {entry['sha256']} ({entry['url']}): {e}")
+        return []
+
+def reparse_date(archive, date, output_folder, workers=None, parser_name="lxml", keep_raw=False):
+    """
+    Rebuild autotrader_data_<date>.csv from the pages archived on that date.
+
+    Pages are parsed across `workers` processes (all cores by default) and written
+    in the order they were originally fetched.
+    """
+    entries = archive.entries(date)
+    filename = os.path.join(output_folder, f"autotrader_data_{date}.csv")
+    print(f"🔁 Re-parsing {len(entries)} pages from {date}")
+
+    jobs = [(archive.root, date, entry, parser_name, keep_raw) for entry in entries]
+    writer = ListingWriter(filename, keep_raw=keep_raw)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for rows in executor.map(_parse_entry, jobs, chunksize=16):
+                writer.write_rows(rows)
+    finally:
+        writer.close()
+
+    print(f"✅ {writer.rows_written} listings saved to {filename}")
+    return filename
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate raw CSVs from archived result pages, without touching the network.")
+    parser.add_argument("--archive", default=os.path.join("autotrader_raw_data", "archive"), help="Archive folder written by collect_all.py.")
+    parser.add_argument("--output-folder", default="autotrader_raw_data", help="Where to write autotrader_data_<date>.csv.")
+    parser.add_argument("--date", action="append", help="Crawl date to re-parse (repeatable). Defaults to every archived date.")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (defaults to the number of cores).")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default="lxml", help="Listing parser backend.")
+    parser.add_argument("--keep-raw", action="store_true", help="Also write the raw price, year, mileage, engine and owner strings.")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.archive)
+    os.makedirs(args.output_folder, exist_ok=True)
+    for date in args.date or archive.dates():
+        reparse_date(archive, date, args.output_folder, args.workers, args.parser, args.keep_raw)
@@ -0,0 +1,86 @@
+import os
+import json
+import hashlib
+import datetime
+from array import array
+
+# Fields that identify a listing; a price change makes it a new listing
+FINGERPRINT_FIELDS = ("name", "price", "mileage", "dealership_name")
+
+def fingerprint(listing):
+    """64-bit digest of a listing's name, price, mileage and dealership."""
+    key = "\x1f".join(str(getattr(listing, field) or "") for field in FINGERPRINT_FIELDS)
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def record_crawl_mode(path, date, full_sweep):
+    """
+    Note in a JSON file ({date: true/false}) whether the date's crawl was a full sweep.
+
+    Incremental crawls stop paging early, so a listing missing from them may still be for sale:
+    the analysis only counts listings as gone on full-sweep days. A date stays a full sweep only
+    if every run that day (e.g. a resumed crawl) was one.
+    """
+    modes = {}
+    if os.path.exists(path):
+        with open(path) as modes_file:
+            modes = json.load(modes_file)
+    modes[date] = modes.get(date, True) and full_sweep
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as modes_file:
+        json.dump(modes, modes_file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+class SeenIndex:
+    """
+    Fingerprints of every listing seen by previous crawls, kept on disk between runs.
+
+    Fingerprints are stored as a flat array of unsigned 64-bit ints (8 bytes per listing)
+    in `path`, with the date of the last full sweep in a JSON file next to it. A full sweep
+    rebuilds the index from scratch, which is how sold listings drop out of it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = f"{os.path.splitext(path)[0]}.json"
+        self.fingerprints = set()
+        self.last_full_sweep = None
+
+        if os.path.exists(path):
+            digests = array("Q")
+            with open(path, "rb") as index_file:
+                digests.frombytes(index_file.read())
+            self.fingerprints = set(digests)
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as meta_file:
+                self.last_full_sweep = json.load(meta_file).get("last_full_sweep")
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def all_known(self, rows):
+        """True if every listing on a page was seen before (and the page is not empty)."""
+        return bool(rows) and all(fingerprint(row) in self.fingerprints for row in rows)
+
+    def add_rows(self, rows):
+        self.fingerprints.update(fingerprint(row) for row in rows)
+
+    def needs_full_sweep(self, today_date, every_days):
+        """True if no full sweep has run in the last `every_days` days."""
+        if self.last_full_sweep is None:
+            return True
+        last = datetime.date.fromisoformat(self.last_full_sweep)
+        return (datetime.date.fromisoformat(today_date) - last).days >= every_days
+
+    def start_full_sweep(self, today_date):
+        """Forget everything: the index is rebuilt from what this crawl sees."""
+        self.fingerprints = set()
+        self.last_full_sweep = today_date
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as index_file:
+            array("Q", self.fingerprints).tofile(index_file)
+        os.replace(tmp_path, self.path)
+
+        with open(self.meta_path, "w") as meta_file:
+            json.dump({"last_full_sweep": self.last_full_sweep, "listings": len(self.fingerprints)}, meta_file)
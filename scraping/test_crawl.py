@@ -0,0 +1,224 @@
+import threading
+import pytest
+import collect_all
+import reparse
+from archive import PageArchive
+from crawl_metrics import PageMetrics, load
+from fetchers import Fetcher, HttpFetcher, FallbackFetcher
+from fixture_server import fixture_name, make_server
+from listing_parser import PRICE_CLASS, DEALERSHIP_CLASS
+from output import Checkpoint
+from planner import MAX_PAGES, Partition, SearchPlan
+
+# A rate limiter that never holds the tests back
+FAST = {"start_rate": 1000.0, "max_rate": 1000.0}
+
+BODY_TYPES = ["Adventure", "Naked"]
+BLOCKS = [[0, 1000], [1000, 5000]]
+PAGES = 3
+LISTINGS_PER_PAGE = 4
+
+def listing_card(name, price, mileage):
+    return f"""
+    <div data-testid="trader-seller-listing">
+      <a data-testid="search-listing-title"><h3>{name}</h3></a>
+      <span class="{PRICE_CLASS}">£{price:,}</span>
+      <span class="{DEALERSHIP_CLASS}">Fixture Motorcycles - See all 12 bikes</span>
+      <ul data-testid="search-listing-specs">
+        <li>2019 (19 reg)</li><li>{mileage:,} miles</li><li>649cc</li><li>1 owner</li>
+      </ul>
+      <p data-testid="search-listing-seller">Fixture MotorcyclesSeller reviews4.8 (120 reviews)</p>
+      <div data-testid="advertCard"></div>
+    </div>"""
+
+def results_page(body_type, min_mileage, page_num, count=PAGES * LISTINGS_PER_PAGE):
+    cards = "".join(
+        listing_card(f"Honda {body_type} {page_num}-{i}", 5000 + 100 * i + page_num, min_mileage + 10 * i + page_num)
+        for i in range(LISTINGS_PER_PAGE))
+    return f'<html><body><p data-testid="result-count">{count} bikes found</p>{cards}</body></html>'
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    """Saved results pages: PAGES full pages for every body type and mileage block."""
+    folder = tmp_path / "pages"
+    folder.mkdir()
+    for body_type in BODY_TYPES:
+        for min_mileage, max_mileage in BLOCKS:
+            for page_num in range(1, PAGES + 1):
+                (folder / fixture_name(body_type, min_mileage, max_mileage, page_num)).write_text(
+                    results_page(body_type, min_mileage, page_num), encoding="utf-8")
+    return folder
+
+@pytest.fixture
+def base_url(fixture_dir):
+    server = make_server(str(fixture_dir))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/bike-search"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def crawl(monkeypatch, tmp_path, base_url):
+    """Search criteria pointing at the fixture server, over a small search grid."""
+    monkeypatch.chdir(tmp_path)  # log_error writes error_log.txt to the working directory
+    monkeypatch.setattr(collect_all, "body_types", BODY_TYPES)
+    monkeypatch.setattr(collect_all, "mileage_blocks", BLOCKS)
+    return dict(collect_all.criteria, base_url=base_url)
+
+def http_fetcher(concurrency=4):
+    return HttpFetcher(concurrency=concurrency, limiter=collect_all.AdaptiveRateLimiter(**FAST))
+
+def rows_of(listings):
+    return [listing.as_row() for listing in listings]
+
+def test_http_fetcher_returns_pages_in_order(crawl):
+    urls = [collect_all.build_search_url(crawl, "Adventure", 0, 1000, page_num) for page_num in (2, 1, PAGES + 1)]
+    fetcher = http_fetcher()
+    try:
+        pages = fetcher.fetch_pages(urls)
+    finally:
+        fetcher.close()
+
+    assert "Honda Adventure 2-0" in pages[0]
+    assert "Honda Adventure 1-0" in pages[1]
+    assert pages[2] is None  # no listings on the page past the last one
+    assert set(fetcher.pop_timing(urls[0])) == {"sleep", "navigation", "wait"}
+
+def test_http_fetcher_reports_connection_errors():
+    fetcher = http_fetcher()
+    try:
+        page, = fetcher.fetch_pages(["http://127.0.0.1:9/bike-search"])
+    finally:
+        fetcher.close()
+    assert isinstance(page, Exception)
+
+class SavedPageFetcher(Fetcher):
+    """Stands in for a rendering browser: answers from the saved pages whatever the URL."""
+
+    def __init__(self, page):
+        self.page = page
+        self.requested = []
+        self.timings = {}
+
+    def fetch_pages(self, urls):
+        self.requested.extend(urls)
+        return [self.page for _ in urls]
+
+def test_fallback_fetcher_only_refetches_pages_without_listings(crawl):
+    urls = [collect_all.build_search_url(crawl, "Naked", 0, 1000, page_num) for page_num in (1, PAGES + 1)]
+    rendered = results_page("Naked", 0, PAGES + 1)
+    fallback = SavedPageFetcher(rendered)
+    fetcher = FallbackFetcher(http_fetcher(), fallback)
+    try:
+        pages = fetcher.fetch_pages(urls)
+    finally:
+        fetcher.close()
+
+    assert fallback.requested == [urls[1]]
+    assert "Honda Naked 1-0" in pages[0]
+    assert pages[1] == rendered
+
+def test_scrape_partition_reads_every_page(crawl):
+    fetcher = http_fetcher(concurrency=2)
+    try:
+        pages = list(collect_all.scrape_partition(fetcher, crawl, Partition("Adventure", 1000, 5000), "2025-01-30"))
+    finally:
+        fetcher.close()
+
+    assert [page_num for page_num, _ in pages] == list(range(1, PAGES + 1))
+    listings = [listing for _, rows in pages for listing in rows]
+    assert len(listings) == PAGES * LISTINGS_PER_PAGE
+    assert listings[0].name == "Honda Adventure 1-0"
+    assert (listings[0].price, listings[0].year, listings[0].mileage, listings[0].engine_cc) == (5001, 2019, 1001, 649)
+
+def test_parallel_crawl_matches_sequential(crawl):
+    fetcher_options = {"backend": "http", "concurrency": 2, "limiter_options": FAST}
+    sequential = collect_all.scrape_autotrader(crawl, fetcher_options=fetcher_options)
+    parallel = collect_all.scrape_autotrader_parallel(crawl, workers=2, fetcher_options=fetcher_options)
+
+    assert len(sequential) == len(BODY_TYPES) * len(BLOCKS) * PAGES * LISTINGS_PER_PAGE
+    assert rows_of(parallel) == rows_of(sequential)
+
+class InterruptedFetcher(Fetcher):
+    """Stops the crawl the way Ctrl-C does, on the first request."""
+
+    def __init__(self):
+        self.closed = False
+        self.timings = {}
+
+    def fetch_pages(self, urls):
+        raise KeyboardInterrupt
+
+    def close(self):
+        self.closed = True
+
+def test_interrupted_crawl_is_not_reported_as_finished(crawl, monkeypatch):
+    fetcher = InterruptedFetcher()
+    monkeypatch.setattr(collect_all, "make_fetcher", lambda **options: fetcher)
+    with pytest.raises(KeyboardInterrupt):
+        collect_all.scrape_autotrader(crawl, fetcher_options={"backend": "http"})
+    assert fetcher.closed
+
+def test_parallel_crawl_returns_when_workers_cannot_start(crawl):
+    assert collect_all.scrape_autotrader_parallel(crawl, workers=2, fetcher_options={"backend": "missing"}) == []
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resume_skips_finished_partitions(crawl, tmp_path, workers):
+    # A crawl that stopped after finishing one partition and the first page of another
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.partition_done("Adventure", (0, 1000))
+    checkpoint.page_done("Naked", (1000, 5000), 1)
+
+    resumed = Checkpoint(str(tmp_path / "checkpoint.json"), resume=True)
+    fetcher_options = {"backend": "http", "concurrency": 2, "limiter_options": FAST}
+    if workers > 1:
+        listings = collect_all.scrape_autotrader_parallel(crawl, workers, fetcher_options, checkpoint=resumed)
+    else:
+        listings = collect_all.scrape_autotrader(crawl, fetcher_options, checkpoint=resumed)
+
+    crawled = {(listing.body_type, listing.min_mileage, listing.name.rsplit(" ", 1)[1].split("-")[0]) for listing in listings}
+    assert not any(body_type == "Adventure" and min_mileage == 0 for body_type, min_mileage, _ in crawled)
+    assert ("Naked", 1000, "1") not in crawled
+    assert ("Naked", 1000, "2") in crawled
+    assert len(listings) == (len(BODY_TYPES) * len(BLOCKS) * PAGES - PAGES - 1) * LISTINGS_PER_PAGE
+    assert all(Checkpoint(str(tmp_path / "checkpoint.json"), resume=True).is_done(body_type, tuple(block))
+               for body_type in BODY_TYPES for block in BLOCKS)
+
+def test_reparse_matches_a_planned_crawl_with_splits(crawl, fixture_dir, tmp_path, monkeypatch):
+    # Too many results for paging to reach: the planner splits 0-1000 in half
+    monkeypatch.setattr(collect_all, "body_types", ["Adventure"])
+    (fixture_dir / fixture_name("Adventure", 0, 1000, 1)).write_text(
+        results_page("Adventure", 0, 1, count=MAX_PAGES * LISTINGS_PER_PAGE + 1), encoding="utf-8")
+    for min_mileage, max_mileage in ((0, 500), (500, 1000)):
+        (fixture_dir / fixture_name("Adventure", min_mileage, max_mileage, 1)).write_text(
+            results_page("Adventure", min_mileage, 1, count=LISTINGS_PER_PAGE), encoding="utf-8")
+
+    archive = PageArchive(str(tmp_path / "archive"))
+    fetcher_options = {"backend": "http", "concurrency": 2, "limiter_options": FAST}
+    listings = collect_all.scrape_autotrader(crawl, fetcher_options, search_plan=SearchPlan(str(tmp_path / "plan.json")),
+                                             archive=archive)
+    assert {(listing.min_mileage, listing.max_mileage) for listing in listings} == {(0, 500), (500, 1000), (1000, 5000)}
+
+    date, = archive.dates()
+    filename = reparse.reparse_date(archive, date, str(tmp_path), workers=1)
+    with open(filename) as reparsed:
+        assert sum(1 for _ in reparsed) - 1 == len(listings)
+
+def test_probe_without_result_count_is_recorded(crawl, fixture_dir, tmp_path, monkeypatch):
+    # A first page whose counter is gone: the range is still crawled, and the missing count is reported
+    monkeypatch.setattr(collect_all, "body_types", ["Adventure"])
+    page = results_page("Adventure", 0, 1).replace('data-testid="result-count"', "")
+    (fixture_dir / fixture_name("Adventure", 0, 1000, 1)).write_text(page, encoding="utf-8")
+
+    metrics = PageMetrics(str(tmp_path / "metrics.jsonl"))
+    fetcher_options = {"backend": "http", "concurrency": 2, "limiter_options": FAST}
+    listings = collect_all.scrape_autotrader(crawl, fetcher_options, search_plan=SearchPlan(str(tmp_path / "plan.json")),
+                                             metrics=metrics)
+    assert len(listings) == len(BLOCKS) * PAGES * LISTINGS_PER_PAGE
+
+    probes = {(entry["min_mileage"], entry["max_mileage"]): entry["status"]
+              for entry in load(metrics.path) if entry["stage"] == "probe"}
+    assert probes == {(0, 1000): "no_count", (1000, 5000): "ok"}
+    with open(tmp_path / "error_log.txt") as error_log:
+        assert "No result count for Adventure, 0-1000" in error_log.read()